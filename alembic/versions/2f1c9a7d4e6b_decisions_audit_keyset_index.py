@@ -0,0 +1,25 @@
+from typing import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '2f1c9a7d4e6b'
+down_revision: Union[str, Sequence[str], None] = '846ada6bc84d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_decisions_user_id_created_at_id',
+        'decisions',
+        ['user_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_decisions_user_id_created_at_id', table_name='decisions')
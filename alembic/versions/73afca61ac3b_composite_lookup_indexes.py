@@ -0,0 +1,32 @@
+from typing import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '73afca61ac3b'
+down_revision: Union[str, Sequence[str], None] = '5155b4a39322'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_events_user_id_event_type_event_timestamp',
+        'events',
+        ['user_id', 'event_type', 'event_timestamp'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_send_requests_user_id_template_name_event_timestamp',
+        'send_requests',
+        ['user_id', 'template_name', 'event_timestamp'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_send_requests_user_id_template_name_event_timestamp', table_name='send_requests')
+    op.drop_index('ix_events_user_id_event_type_event_timestamp', table_name='events')
@@ -0,0 +1,50 @@
+from typing import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '846ada6bc84d'
+down_revision: Union[str, Sequence[str], None] = '73afca61ac3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('send_requests', sa.Column('send_message_success', sa.Boolean(), nullable=True))
+    op.create_table(
+        'outbox_messages',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('send_request_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(length=64), nullable=False),
+        sa.Column('template_name', sa.String(length=64), nullable=False),
+        sa.Column('channel', sa.String(length=32), nullable=False),
+        sa.Column('reason', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['send_request_id'], ['send_requests.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_outbox_messages_status_next_attempt_at',
+        'outbox_messages',
+        ['status', 'next_attempt_at'],
+        unique=False,
+    )
+    op.create_index(op.f('ix_outbox_messages_send_request_id'), 'outbox_messages', ['send_request_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_outbox_messages_send_request_id'), table_name='outbox_messages')
+    op.drop_index('ix_outbox_messages_status_next_attempt_at', table_name='outbox_messages')
+    op.drop_table('outbox_messages')
+    with op.batch_alter_table('send_requests') as batch_op:
+        batch_op.drop_column('send_message_success')
@@ -0,0 +1,34 @@
+from typing import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e5b8d1c742'
+down_revision: Union[str, Sequence[str], None] = 'f2a7d9c4b816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_events_user_id_created_at_id', 'events', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_send_requests_user_id_decided_at_id',
+        'send_requests',
+        ['user_id', 'decided_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_suppressions_user_id_decided_at_id',
+        'suppressions',
+        ['user_id', 'decided_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_suppressions_user_id_decided_at_id', table_name='suppressions')
+    op.drop_index('ix_send_requests_user_id_decided_at_id', table_name='send_requests')
+    op.drop_index('ix_events_user_id_created_at_id', table_name='events')
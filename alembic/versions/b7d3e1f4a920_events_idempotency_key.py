@@ -0,0 +1,25 @@
+from typing import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e1f4a920'
+down_revision: Union[str, Sequence[str], None] = '9c4e2b7a1d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('idempotency_key', sa.String(length=128), nullable=True))
+    op.create_index('ux_events_idempotency_key', 'events', ['idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_events_idempotency_key', table_name='events')
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.drop_column('idempotency_key')
@@ -0,0 +1,25 @@
+from typing import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f2a6e4b913'
+down_revision: Union[str, Sequence[str], None] = 'a3e5b8d1c742'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_events_user_id_event_timestamp_id',
+        'events',
+        ['user_id', 'event_timestamp', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_user_id_event_timestamp_id', table_name='events')
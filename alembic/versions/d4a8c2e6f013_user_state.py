@@ -0,0 +1,39 @@
+from typing import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c2e6f013'
+down_revision: Union[str, Sequence[str], None] = 'b7d3e1f4a920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_state',
+        sa.Column('user_id', sa.String(length=64), nullable=False),
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('last_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('user_id', 'kind', 'name'),
+    )
+    # Same as commands/rebuild_user_state, so existing history is covered from the start.
+    op.execute(
+        "INSERT INTO user_state (user_id, kind, name, last_at) "
+        "SELECT user_id, 'event', event_type, MAX(event_timestamp) FROM events GROUP BY user_id, event_type"
+    )
+    op.execute(
+        "INSERT INTO user_state (user_id, kind, name, last_at) "
+        "SELECT user_id, 'send', template_name, MAX(event_timestamp) FROM send_requests "
+        "GROUP BY user_id, template_name"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_state')
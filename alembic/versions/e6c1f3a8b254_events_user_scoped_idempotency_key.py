@@ -0,0 +1,22 @@
+from typing import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c1f3a8b254'
+down_revision: Union[str, Sequence[str], None] = 'd4a8c2e6f013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ux_events_idempotency_key', table_name='events')
+    op.create_index('ux_events_user_id_idempotency_key', 'events', ['user_id', 'idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_events_user_id_idempotency_key', table_name='events')
+    op.create_index('ux_events_idempotency_key', 'events', ['idempotency_key'], unique=True)
@@ -0,0 +1,123 @@
+"""
+Compare POST /events throughput and latency in DATABASE_MODE=sync vs async under the same load.
+
+Each mode runs in its own process (the mode is read at import time) against a fresh
+temporary SQLite database, driving the ASGI app in-process through httpx.
+
+    python -m benchmarks.async_mode --requests 2000 --concurrency 1 16 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from pathlib import Path
+
+MODES = ["sync", "async"]
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def build_payloads(count: int) -> list[dict]:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    event_types = ["signup_completed", "link_bank_success", "payment_failed"]
+    return [
+        {
+            "user_id": f"user_{i % 500}",
+            "event_type": event_types[i % len(event_types)],
+            "event_timestamp": (start + timedelta(minutes=i)).isoformat(),
+            "properties": {"failure_reason": "INSUFFICIENT_FUNDS", "attempt_number": i % 4},
+            "user_traits": {"marketing_opt_in": True},
+        }
+        for i in range(count)
+    ]
+
+
+async def drive(requests: int, concurrency: int) -> dict:
+    import httpx
+
+    from src.marketing_messaging_service import models  # noqa: F401  (registers tables)
+    from src.marketing_messaging_service.controllers.endpoints import app
+    from src.marketing_messaging_service.infrastructure.database import Base
+    from src.marketing_messaging_service.infrastructure.database import engine
+
+    Base.metadata.create_all(engine)
+    payloads = build_payloads(requests)
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def post(payload: dict) -> None:
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post("/events/", json=payload)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(post(p) for p in payloads))
+            elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "events_per_sec": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def run_child(mode: str, requests: int, concurrency: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_MODE": mode,
+            "DATABASE_URL": f"sqlite:///{Path(tmp) / 'bench.db'}",
+            "FAKE_PROVIDER_ECHO": "false",
+            "PYTHONPATH": str(REPO_ROOT),
+        }
+        out = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.async_mode", "--child",
+                "--requests", str(requests), "--concurrency", str(concurrency),
+            ],
+            env=env,
+            cwd=tmp,  # keeps the fake provider's messages.txt out of the repo
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(drive(args.requests, args.concurrency[0]))))
+        return
+
+    print(f"{'mode':>6} {'concurrency':>12} {'events/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for concurrency in args.concurrency:
+        for mode in MODES:
+            result = run_child(mode, args.requests, concurrency)
+            print(
+                f"{mode:>6} {concurrency:>12} {result['events_per_sec']:>10.1f} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
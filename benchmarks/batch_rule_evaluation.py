@@ -0,0 +1,89 @@
+"""
+RuleEvaluationService.evaluate_batch (NumPy, column-wise field conditions) vs the
+per-event evaluate loop, over a large event stream.
+
+Events are generated and evaluated in batches of --batch-size; only evaluation is timed.
+Every batch's decisions are compared between both paths.
+
+    python -m benchmarks.batch_rule_evaluation --events 1000000 --rule-counts 4 100 1000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from benchmarks.rule_evaluation import build_events
+from benchmarks.rule_evaluation import build_rules
+from src.marketing_messaging_service.services.batch_context import BatchContext
+from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
+from src.marketing_messaging_service.services.vectorized_rules import numpy_available
+
+
+def run(rule_count: int, events: int, batch_size: int, seed: int, min_rules: int) -> dict:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        rules_path = Path(tmp) / "rules.yaml"
+        rules_path.write_text(yaml.safe_dump(build_rules(rule_count, rng)), encoding="utf-8")
+        # Field conditions only: prior_event lookups would measure the database instead.
+        service = RuleEvaluationService(
+            event_repository=None, rules_path=str(rules_path), vectorize_min_batch=1, vectorize_min_rules=min_rules
+        )
+        service.get_ruleset()
+
+        scalar_seconds = batch_seconds = 0.0
+        mismatches = 0
+        for start in range(0, events, batch_size):
+            batch_events = []
+            for event, user_traits in build_events(min(batch_size, events - start), rng):
+                event.user_traits = user_traits
+                batch_events.append(event)
+
+            started = time.perf_counter()
+            context = BatchContext()
+            scalar = []
+            for event in batch_events:
+                context.add_event(event)
+                scalar.append(service.evaluate(db=None, event=event, user_traits=event.user_traits, batch=context))
+            scalar_seconds += time.perf_counter() - started
+
+            started = time.perf_counter()
+            vectorized = service.evaluate_batch(db=None, events=batch_events, batch=BatchContext())
+            batch_seconds += time.perf_counter() - started
+
+            mismatches += sum(a.matched_rule != b.matched_rule for a, b in zip(scalar, vectorized))
+
+    return {
+        "scalar_us": scalar_seconds / events * 1_000_000,
+        "batch_us": batch_seconds / events * 1_000_000,
+        "mismatches": mismatches,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--rule-counts", type=int, nargs="+", default=[4, 100, 1000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--vectorize-min-rules", type=int, default=8, help="rules of one event type that enable the column path"
+    )
+    args = parser.parse_args()
+
+    if not numpy_available():
+        raise SystemExit("NumPy is not installed; evaluate_batch would use the per-event path")
+
+    print(f"{'rules':>8} {'scalar us/event':>16} {'batch us/event':>15} {'speedup':>8} {'mismatches':>11}")
+    for rule_count in args.rule_counts:
+        result = run(rule_count, args.events, args.batch_size, args.seed, args.vectorize_min_rules)
+        print(
+            f"{rule_count:>8} {result['scalar_us']:>16.2f} {result['batch_us']:>15.2f} "
+            f"{result['scalar_us'] / result['batch_us']:>7.1f}x {result['mismatches']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
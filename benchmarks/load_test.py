@@ -0,0 +1,383 @@
+"""
+Replay-based load test of the ingestion pipeline.
+
+Generates (or replays from NDJSON) an EventIn stream with a configurable event-type mix
+and user cardinality, and drives it against a fresh temporary SQLite database:
+
+- inprocess: EventProcessingService.process_event, one transaction per event, with
+  per-stage timings (rule evaluation, suppression, provider send, persist, commit)
+- http: POST /events against a uvicorn server started for the run
+
+Results are written as JSON and can be compared against a stored baseline:
+
+    python -m benchmarks.load_test --events 5000 --users 1000 --output run.json
+    python -m benchmarks.load_test --events 5000 --users 1000 --baseline run.json --max-regression 0.15
+    python -m benchmarks.load_test --replay events.ndjson --modes inprocess
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from pathlib import Path
+from typing import Callable
+from typing import Iterator
+
+MODES = ["inprocess", "http"]
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_MIX = {
+    "signup_completed": 2,
+    "link_bank_success": 3,
+    "payment_failed": 4,
+    "page_view": 1,
+}
+FAILURE_REASONS = ["INSUFFICIENT_FUNDS", "CARD_EXPIRED", "DO_NOT_HONOR"]
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """`signup_completed=2,payment_failed=5` -> relative weights per event type."""
+    mix = {}
+    for part in value.split(","):
+        event_type, _, weight = part.partition("=")
+        mix[event_type.strip()] = float(weight or 1)
+    return mix
+
+
+def generate_events(
+    count: int,
+    users: int,
+    mix: dict[str, float] | None = None,
+    seed: int = 42,
+    start: datetime = START,
+) -> Iterator[dict]:
+    """Yield EventIn-shaped dicts with non-decreasing timestamps, a few seconds apart."""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    event_types = list(mix)
+    weights = list(mix.values())
+    ts = start
+
+    for _ in range(count):
+        ts += timedelta(seconds=rng.randint(1, 30))
+        event_type = rng.choices(event_types, weights)[0]
+        event = {
+            "user_id": f"user_{rng.randint(1, users)}",
+            "event_type": event_type,
+            "event_timestamp": ts.isoformat(),
+        }
+        if event_type == "payment_failed":
+            event["properties"] = {
+                "failure_reason": rng.choice(FAILURE_REASONS),
+                "attempt_number": rng.randint(1, 4),
+            }
+        if event_type == "signup_completed" or rng.random() < 0.2:
+            event["user_traits"] = {
+                "marketing_opt_in": rng.random() < 0.8,
+                "country": rng.choice(["US", "DE", "FR", "GB"]),
+                "risk_segment": rng.choice(["LOW", "LOW", "MEDIUM", "HIGH"]),
+            }
+        yield event
+
+
+def read_events(path: Path) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_events(path: Path, events: list[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+def _timed(fn: Callable, samples: list[float]) -> Callable:
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - started)
+
+    return wrapper
+
+
+def run_inprocess(events: list[dict], workdir: Path) -> dict:
+    from sqlalchemy.orm import sessionmaker
+
+    from src.marketing_messaging_service import models  # noqa: F401  (registers tables)
+    from src.marketing_messaging_service.infrastructure.database import Base
+    from src.marketing_messaging_service.infrastructure.database import create_db_engine
+    from src.marketing_messaging_service.providers.fake_providers import FakeMessagingProvider
+    from src.marketing_messaging_service.repositories import EventRepository
+    from src.marketing_messaging_service.repositories import SendRequestRepository
+    from src.marketing_messaging_service.repositories import SuppressionRepository
+    from src.marketing_messaging_service.repositories.decision_repository import DecisionRepository
+    from src.marketing_messaging_service.schemas.event import EventIn
+    from src.marketing_messaging_service.services.event_processing_service import EventProcessingService
+    from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
+    from src.marketing_messaging_service.services.suppression_ledger import SuppressionLedger
+    from src.marketing_messaging_service.services.suppression_service import SuppressionService
+
+    engine = create_db_engine(f"sqlite:///{workdir / 'inprocess.db'}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    event_repository = EventRepository()
+    send_request_repository = SendRequestRepository()
+    suppression_repository = SuppressionRepository()
+    provider = FakeMessagingProvider(log_file=str(workdir / "messages.txt"), buffered=True)
+    rule_evaluation_service = RuleEvaluationService(event_repository=event_repository)
+    suppression_service = SuppressionService(
+        send_request_repository=send_request_repository,
+        suppression_repository=suppression_repository,
+        suppression_ledger=SuppressionLedger(send_request_repository),
+    )
+    service = EventProcessingService(
+        event_repository=event_repository,
+        send_request_repository=send_request_repository,
+        suppression_repository=suppression_repository,
+        rule_evaluation_service=rule_evaluation_service,
+        suppression_service=suppression_service,
+        messaging_provider=provider,
+        decision_repository=DecisionRepository(),
+    )
+
+    stages: dict[str, list[float]] = defaultdict(list)
+    timed_stages = ("rule_evaluation", "suppression", "provider_send")
+    rule_evaluation_service.evaluate = _timed(rule_evaluation_service.evaluate, stages["rule_evaluation"])
+    suppression_service.evaluate = _timed(suppression_service.evaluate, stages["suppression"])
+    provider.send_message = _timed(provider.send_message, stages["provider_send"])
+
+    payloads = [EventIn(**event) for event in events]
+    rule_evaluation_service.get_ruleset()  # compile rules before the clock starts
+
+    started = time.perf_counter()
+    for payload in payloads:
+        marks = {name: len(stages[name]) for name in timed_stages}
+        event_started = time.perf_counter()
+
+        with session_factory() as db:
+            service.process_event(db, payload)
+            processed = time.perf_counter()
+            db.commit()
+        committed = time.perf_counter()
+
+        # Whatever process_event spent outside the timed stages: building rows and the flush.
+        in_stages = sum(sum(stages[name][marks[name]:]) for name in timed_stages)
+        stages["persist"].append(processed - event_started - in_stages)
+        stages["commit"].append(committed - processed)
+        stages["total"].append(committed - event_started)
+    elapsed = time.perf_counter() - started
+
+    provider.close()
+    engine.dispose()
+
+    return {
+        "events": len(payloads),
+        "elapsed_s": elapsed,
+        "events_per_sec": len(payloads) / elapsed,
+        "stages": {name: summarize(samples) for name, samples in sorted(stages.items()) if samples},
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_http(events: list[dict], workdir: Path, concurrency: int) -> dict:
+    import httpx
+    from sqlalchemy import create_engine
+
+    from src.marketing_messaging_service import models  # noqa: F401  (registers tables)
+    from src.marketing_messaging_service.infrastructure.database import Base
+
+    database_url = f"sqlite:///{workdir / 'http.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": database_url, "FAKE_PROVIDER_ECHO": "false", "PYTHONPATH": str(REPO_ROOT)}
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "src.marketing_messaging_service.controllers.endpoints:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        env=env,
+        cwd=workdir,  # keeps the fake provider's messages.txt out of the repo
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{base_url}/health").raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError("uvicorn did not start")
+                time.sleep(0.1)
+
+        latencies, elapsed = asyncio.run(_drive_http(base_url, events, concurrency))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    return {
+        "events": len(events),
+        "elapsed_s": elapsed,
+        "events_per_sec": len(events) / elapsed,
+        "concurrency": concurrency,
+        "stages": {"request": summarize(latencies)},
+    }
+
+
+async def _drive_http(base_url: str, events: list[dict], concurrency: int) -> tuple[list[float], float]:
+    import httpx
+
+    # Events of one user are sent in order by a single task, so per-user ordering is kept.
+    per_user: dict[str, list[dict]] = defaultdict(list)
+    for event in events:
+        per_user[event["user_id"]].append(event)
+    queue: asyncio.Queue[list[dict]] = asyncio.Queue()
+    for user_events in per_user.values():
+        queue.put_nowait(user_events)
+
+    latencies: list[float] = []
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+
+        async def worker() -> None:
+            while not queue.empty():
+                for event in queue.get_nowait():
+                    started = time.perf_counter()
+                    response = await client.post("/events/", json=event)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, elapsed
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    """Print the change against `baseline`; returns False if throughput regressed past `max_regression`."""
+    ok = True
+    for mode, current in results["results"].items():
+        previous = baseline.get("results", {}).get(mode)
+        if previous is None:
+            continue
+
+        change = current["events_per_sec"] / previous["events_per_sec"] - 1
+        regressed = change < -max_regression
+        ok &= not regressed
+        print(
+            f"{mode:<10} events/s {previous['events_per_sec']:>9.1f} -> {current['events_per_sec']:>9.1f} "
+            f"({change:+.1%}){'  REGRESSION' if regressed else ''}"
+        )
+        for stage, summary in current["stages"].items():
+            before = previous["stages"].get(stage)
+            if before:
+                print(f"  {stage:<16} p95 {before['p95_ms']:>8.3f}ms -> {summary['p95_ms']:>8.3f}ms")
+    return ok
+
+
+def print_results(results: dict) -> None:
+    for mode, result in results["results"].items():
+        print(
+            f"{mode}: {result['events']} events in {result['elapsed_s']:.2f}s, "
+            f"{result['events_per_sec']:.1f} events/s"
+        )
+        print(f"  {'stage':<16} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for stage, s in result["stages"].items():
+            print(f"  {stage:<16} {s['mean_ms']:>9.3f} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['p99_ms']:>9.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--events", type=int, default=5_000)
+    parser.add_argument("--users", type=int, default=1_000, help="distinct user_ids in the generated stream")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="e.g. signup_completed=2,payment_failed=5")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--replay", type=Path, help="NDJSON file of EventIn payloads to replay instead")
+    parser.add_argument("--save-stream", type=Path, help="write the generated stream as NDJSON")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent HTTP clients")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="results JSON of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="allowed events/s drop vs baseline")
+    args = parser.parse_args()
+
+    if args.replay:
+        events = read_events(args.replay)
+    else:
+        events = list(generate_events(args.events, args.users, args.mix, args.seed))
+    if args.save_stream:
+        write_events(args.save_stream, events)
+
+    results = {
+        "config": {
+            "events": len(events),
+            "users": len({event["user_id"] for event in events}),
+            "source": str(args.replay) if args.replay else "generated",
+            "mix": args.mix or DEFAULT_MIX,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        if "inprocess" in args.modes:
+            results["results"]["inprocess"] = run_inprocess(events, workdir)
+        if "http" in args.modes:
+            results["results"]["http"] = run_http(events, workdir, args.concurrency)
+
+    print_results(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if not compare(results, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Latency of the suppression and prior-event lookups with and without the
+composite (user_id, event_type, event_timestamp) / (user_id, template_name, event_timestamp) indexes.
+
+    python -m benchmarks.lookup_indexes --rows 2000000 --users 20000
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy import insert
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.marketing_messaging_service import models  # noqa: F401  (registers tables)
+from src.marketing_messaging_service.infrastructure.database import Base
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.send_request import SendRequest
+from src.marketing_messaging_service.repositories.event_repository import EventRepository
+from src.marketing_messaging_service.repositories.send_request_repository import SendRequestRepository
+
+EVENT_TYPES = ["signup_completed", "link_bank_success", "payment_failed", "page_view"]
+TEMPLATES = ["WELCOME_EMAIL", "BANK_LINK_NUDGE_SMS", "INSUFFICIENT_FUNDS_EMAIL", "HIGH_RISK_ALERT"]
+COMPOSITE_INDEXES = {
+    "ix_events_user_id_event_type_event_timestamp": "events (user_id, event_type, event_timestamp)",
+    "ix_send_requests_user_id_template_name_event_timestamp": "send_requests (user_id, template_name, event_timestamp)",
+}
+START = datetime(2024, 1, 1)
+CHUNK = 50_000
+
+
+def load(engine, rows: int, users: int, rng: random.Random) -> None:
+    with engine.begin() as conn:
+        for offset in range(0, rows, CHUNK):
+            size = min(CHUNK, rows - offset)
+            timestamps = [START + timedelta(minutes=rng.randint(0, 525_600)) for _ in range(size)]
+            user_ids = [f"user_{rng.randint(1, users)}" for _ in range(size)]
+            conn.execute(
+                insert(Event.__table__),
+                [
+                    {"user_id": u, "event_type": rng.choice(EVENT_TYPES), "event_timestamp": ts, "properties": None}
+                    for u, ts in zip(user_ids, timestamps)
+                ],
+            )
+            conn.execute(
+                insert(SendRequest.__table__),
+                [
+                    {
+                        "user_id": u,
+                        "template_name": rng.choice(TEMPLATES),
+                        "event_timestamp": ts,
+                        "channel": "email",
+                        "reason": "benchmark",
+                    }
+                    for u, ts in zip(user_ids, timestamps)
+                ],
+            )
+
+
+def measure(engine, lookups: int, users: int, rng: random.Random) -> dict[str, list[float]]:
+    event_repository = EventRepository()
+    send_request_repository = SendRequestRepository()
+    timings: dict[str, list[float]] = {"prior_event": [], "once_ever": [], "once_per_calendar_day": []}
+
+    with Session(engine) as db:
+        for _ in range(lookups):
+            user_id = f"user_{rng.randint(1, users)}"
+            ts = START + timedelta(minutes=rng.randint(0, 525_600))
+
+            started = time.perf_counter()
+            event_repository.exists_by_user_and_type_in_window(
+                db, user_id, rng.choice(EVENT_TYPES), ts - timedelta(hours=24), ts
+            )
+            timings["prior_event"].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            send_request_repository.exists_for_user_and_template(db, user_id, rng.choice(TEMPLATES))
+            timings["once_ever"].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            send_request_repository.exists_for_user_and_template_in_day_so_far(db, user_id, rng.choice(TEMPLATES), ts)
+            timings["once_per_calendar_day"].append(time.perf_counter() - started)
+
+    return timings
+
+
+def report(label: str, timings: dict[str, list[float]]) -> None:
+    print(f"\n{label}")
+    print(f"  {'query':<24} {'mean us':>10} {'p95 us':>10}")
+    for name, values in timings.items():
+        values = sorted(values)
+        p95 = values[int(len(values) * 0.95) - 1]
+        print(f"  {name:<24} {statistics.mean(values) * 1e6:>10.1f} {p95 * 1e6:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows per table")
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(engine)
+
+        print(f"loading {args.rows:,} events and {args.rows:,} send_requests ...")
+        load(engine, args.rows, args.users, rng)
+
+        with engine.begin() as conn:
+            for name in COMPOSITE_INDEXES:
+                conn.execute(text(f"DROP INDEX {name}"))
+            conn.execute(text("ANALYZE"))
+        report("single-column indexes (before)", measure(engine, args.lookups, args.users, random.Random(args.seed)))
+
+        with engine.begin() as conn:
+            for name, target in COMPOSITE_INDEXES.items():
+                conn.execute(text(f"CREATE INDEX {name} ON {target}"))
+            conn.execute(text("ANALYZE"))
+        report("composite indexes (after)", measure(engine, args.lookups, args.users, random.Random(args.seed)))
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
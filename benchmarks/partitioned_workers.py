@@ -0,0 +1,75 @@
+"""
+Ingest throughput of PartitionedEventProcessor per worker count.
+
+Submits a generated event stream (see load_test) to N partition worker processes
+against a fresh temporary SQLite database per run, waits for every result, and
+checks that each user's events were committed in submission order.
+
+    python -m benchmarks.partitioned_workers --events 20000 --users 2000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from benchmarks.load_test import generate_events
+from src.marketing_messaging_service import models  # noqa: F401  (registers tables)
+from src.marketing_messaging_service.infrastructure.database import Base
+from src.marketing_messaging_service.schemas.event import EventIn
+from src.marketing_messaging_service.services.partitioned_processor import PartitionedEventProcessor
+
+
+def run(events: list[EventIn], workers: int, batch_size: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+        # Spawned workers read their settings from the environment.
+        os.environ.update({"DATABASE_URL": database_url, "SQLITE_PROFILE": "performance", "OUTBOX_ENABLED": "false"})
+        cwd = os.getcwd()
+        os.chdir(tmp)  # keeps the fake provider's messages.txt out of the repo
+        processor = PartitionedEventProcessor(workers=workers, batch_size=batch_size, enqueue_timeout_seconds=60)
+        try:
+            processor.start()
+            started = time.perf_counter()
+            futures = [processor.submit(event) for event in events]
+            results = [future.result() for future in futures]
+            elapsed = time.perf_counter() - started
+        finally:
+            processor.stop()
+            os.chdir(cwd)
+
+    event_ids = defaultdict(list)
+    for result in results:
+        event_ids[result.user_id].append(result.event_id)
+
+    return {
+        "events_per_sec": len(events) / elapsed,
+        "ordered": all(ids == sorted(ids) for ids in event_ids.values()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    events = [EventIn(**event) for event in generate_events(args.events, args.users)]
+
+    print(f"{'workers':>7} {'events/s':>9} {'per-user order':>15}")
+    for workers in args.workers:
+        result = run(events, workers, args.batch_size)
+        print(f"{workers:>7} {result['events_per_sec']:>9.0f} {'ok' if result['ordered'] else 'VIOLATED':>15}")
+
+
+if __name__ == "__main__":
+    main()
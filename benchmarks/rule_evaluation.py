@@ -0,0 +1,90 @@
+"""
+Per-event cost of RuleEvaluationService.evaluate as the rule count grows.
+
+    python -m benchmarks.rule_evaluation --rule-counts 10 100 500 1000 --events 20000
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+
+import yaml
+
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.user_traits import UserTraits
+from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
+
+EVENT_TYPES = [f"event_type_{i}" for i in range(20)]
+
+
+def build_rules(count: int, rng: random.Random) -> dict:
+    rules = []
+    for i in range(count):
+        rules.append(
+            {
+                "name": f"rule_{i}",
+                "enabled": rng.random() > 0.1,
+                "trigger": {"event_type": rng.choice(EVENT_TYPES)},
+                "conditions": {
+                    "all": [
+                        {"field": "user_traits.country", "operator": "equals", "value": rng.choice(["US", "DE"])},
+                        {"field": "properties.attempt_number", "operator": "gte", "value": rng.randint(2, 10)},
+                    ]
+                },
+                "action": {"type": "send", "template_name": f"TEMPLATE_{i}", "delivery_method": "email"},
+                "suppression": {"mode": "none"},
+            }
+        )
+    return {"rules": rules}
+
+
+def build_events(count: int, rng: random.Random) -> list[tuple[Event, UserTraits]]:
+    now = datetime.now(timezone.utc)
+    events = []
+    for i in range(count):
+        event = Event(
+            user_id=f"user_{i % 1000}",
+            event_type=rng.choice(EVENT_TYPES),
+            event_timestamp=now,
+            properties={"attempt_number": rng.randint(0, 5)},
+        )
+        events.append((event, UserTraits(country=rng.choice(["US", "DE", "FR"]))))
+    return events
+
+
+def run(rule_count: int, events: list[tuple[Event, UserTraits]], rng: random.Random) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        rules_path = Path(tmp) / "rules.yaml"
+        rules_path.write_text(yaml.safe_dump(build_rules(rule_count, rng)), encoding="utf-8")
+
+        service = RuleEvaluationService(event_repository=None, rules_path=str(rules_path))
+        service.get_ruleset()
+
+        started = time.perf_counter()
+        for event, user_traits in events:
+            service.evaluate(db=None, event=event, user_traits=user_traits)
+        elapsed = time.perf_counter() - started
+
+    return elapsed / len(events) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rule-counts", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    events = build_events(args.events, rng)
+
+    print(f"{'rules':>8} {'us/event':>10}")
+    for rule_count in args.rule_counts:
+        print(f"{rule_count:>8} {run(rule_count, events, rng):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Ingest throughput with concurrent audit readers under each SQLITE_PROFILE.
+
+Writer threads ingest events one transaction per event (like POST /events) while
+reader threads load audit logs, for a fixed duration, against a fresh temporary
+SQLite file per profile.
+
+    python -m benchmarks.sqlite_profile --seconds 10 --writers 4 --readers 4
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from src.marketing_messaging_service import models  # noqa: F401  (registers tables)
+from src.marketing_messaging_service.config.settings import SQLITE_PROFILES
+from src.marketing_messaging_service.infrastructure.database import Base
+from src.marketing_messaging_service.infrastructure.database import create_db_engine
+from src.marketing_messaging_service.providers.fake_providers import FakeMessagingProvider
+from src.marketing_messaging_service.repositories import EventRepository
+from src.marketing_messaging_service.repositories import SendRequestRepository
+from src.marketing_messaging_service.repositories import SuppressionRepository
+from src.marketing_messaging_service.repositories.decision_repository import DecisionRepository
+from src.marketing_messaging_service.schemas.event import EventIn
+from src.marketing_messaging_service.services.audit_service import AuditService
+from src.marketing_messaging_service.services.event_processing_service import EventProcessingService
+from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
+from src.marketing_messaging_service.services.suppression_service import SuppressionService
+
+EVENT_TYPES = ["signup_completed", "link_bank_success", "payment_failed", "page_view"]
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def build_service(provider: FakeMessagingProvider) -> EventProcessingService:
+    event_repository = EventRepository()
+    send_request_repository = SendRequestRepository()
+    suppression_repository = SuppressionRepository()
+    return EventProcessingService(
+        event_repository=event_repository,
+        send_request_repository=send_request_repository,
+        suppression_repository=suppression_repository,
+        rule_evaluation_service=RuleEvaluationService(event_repository=event_repository),
+        suppression_service=SuppressionService(
+            send_request_repository=send_request_repository,
+            suppression_repository=suppression_repository,
+        ),
+        messaging_provider=provider,
+        decision_repository=DecisionRepository(),
+    )
+
+
+def random_event(rng: random.Random, users: int) -> EventIn:
+    return EventIn(
+        user_id=f"user_{rng.randint(1, users)}",
+        event_type=rng.choice(EVENT_TYPES),
+        event_timestamp=START + timedelta(minutes=rng.randint(0, 100_000)),
+        properties={"failure_reason": "INSUFFICIENT_FUNDS", "attempt_number": rng.randint(1, 4)},
+        user_traits={"marketing_opt_in": True},
+    )
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run_profile(profile: str, seconds: float, writers: int, readers: int, users: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{Path(tmp) / 'bench.db'}", SQLITE_PROFILES[profile])
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+
+        provider = FakeMessagingProvider(log_file=str(Path(tmp) / "messages.txt"), buffered=True)
+        service = build_service(provider)
+        audit_service = AuditService(decision_repository=DecisionRepository())
+
+        write_latencies: list[float] = []
+        read_latencies: list[float] = []
+        errors = {"write": 0, "read": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def write_loop(seed: int) -> None:
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                payload = random_event(rng, users)
+                started = time.perf_counter()
+                try:
+                    with session_factory() as db:
+                        service.process_event(db, payload)
+                        db.commit()
+                except OperationalError:
+                    with lock:
+                        errors["write"] += 1
+                    continue
+                with lock:
+                    write_latencies.append(time.perf_counter() - started)
+
+        def read_loop(seed: int) -> None:
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    with session_factory() as db:
+                        audit_service.get_audit_log(db, f"user_{rng.randint(1, users)}")
+                except OperationalError:
+                    with lock:
+                        errors["read"] += 1
+                    continue
+                with lock:
+                    read_latencies.append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=write_loop, args=(i,)) for i in range(writers)]
+        threads += [threading.Thread(target=read_loop, args=(1_000 + i,)) for i in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        provider.close()
+        engine.dispose()
+
+    return {
+        "events_per_sec": len(write_latencies) / seconds,
+        "reads_per_sec": len(read_latencies) / seconds,
+        "write_p50_ms": statistics.median(write_latencies) * 1000 if write_latencies else 0.0,
+        "write_p95_ms": percentile(write_latencies, 0.95) * 1000,
+        "read_p95_ms": percentile(read_latencies, 0.95) * 1000,
+        "write_errors": errors["write"],
+        "read_errors": errors["read"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=list(SQLITE_PROFILES), choices=list(SQLITE_PROFILES))
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--users", type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(
+        f"{'profile':<12} {'events/s':>9} {'reads/s':>9} {'write p50':>10} {'write p95':>10} "
+        f"{'read p95':>10} {'errors':>7}"
+    )
+    for profile in args.profiles:
+        result = run_profile(profile, args.seconds, args.writers, args.readers, args.users)
+        print(
+            f"{profile:<12} {result['events_per_sec']:>9.0f} {result['reads_per_sec']:>9.0f} "
+            f"{result['write_p50_ms']:>8.2f}ms {result['write_p95_ms']:>8.2f}ms {result['read_p95_ms']:>8.2f}ms "
+            f"{result['write_errors'] + result['read_errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
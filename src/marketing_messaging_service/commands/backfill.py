@@ -0,0 +1,335 @@
+"""
+Offline backfill / replay of historical events through EventProcessingService.
+
+    python -m src.marketing_messaging_service.commands.backfill events/*.ndjson --workers 8
+    python -m src.marketing_messaging_service.commands.backfill history.csv --no-sends --work-dir .backfill
+
+1. Partition: the input files (NDJSON, or CSV for *.csv) are split by a hash of user_id
+   into --partitions files under --work-dir. Invalid lines go to rejected.ndjson.
+2. Process: a pool of --workers processes takes one partition at a time, sorts it by
+   event_timestamp and processes it --chunk-size events per transaction, so each user's
+   events are processed in time order by a single process.
+
+After every commit, checkpoints/part-NNNN.json records how many events of the partition
+are done. Rerunning the same command with the same --work-dir skips the partitioning and
+resumes each partition after its checkpoint. A crash between a commit and its checkpoint
+replays that one chunk, whose events are then recognised by their fingerprint and skipped.
+
+A chunk that hits a database error such as "database is locked" is retried with backoff;
+if it keeps failing the partition stops without advancing its checkpoint, so a rerun
+picks it up again. Other errors are retried event by event, and events that still fail
+go to failed.ndjson.
+
+CSV files need user_id, event_type and event_timestamp columns. properties and
+user_traits are optional JSON columns; email, country, marketing_opt_in and risk_segment
+columns are used as traits when there is no user_traits column.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from pathlib import Path
+from typing import Iterator
+
+from pydantic import ValidationError
+from sqlalchemy.exc import OperationalError
+
+from src.marketing_messaging_service.config.settings import settings
+from src.marketing_messaging_service.infrastructure.database import create_session
+from src.marketing_messaging_service.infrastructure.database import to_naive_utc
+from src.marketing_messaging_service.providers.fake_providers import FakeMessagingProvider
+from src.marketing_messaging_service.providers.fake_providers import NullMessagingProvider
+from src.marketing_messaging_service.providers.interfaces import IMessagingProvider
+from src.marketing_messaging_service.repositories import EventRepository
+from src.marketing_messaging_service.repositories import SendRequestRepository
+from src.marketing_messaging_service.repositories import SuppressionRepository
+from src.marketing_messaging_service.repositories import UserStateRepository
+from src.marketing_messaging_service.repositories.decision_repository import DecisionRepository
+from src.marketing_messaging_service.schemas.event import EventIn
+from src.marketing_messaging_service.services.event_processing_service import EventProcessingService
+from src.marketing_messaging_service.services.event_stream import NDJSONEventParser
+from src.marketing_messaging_service.services.event_stream import StreamLine
+from src.marketing_messaging_service.services.event_stream import format_validation_error
+from src.marketing_messaging_service.services.idempotency import IdempotencyKeys
+from src.marketing_messaging_service.services.idempotency import RecentKeyFilter
+from src.marketing_messaging_service.services.partitioned_processor import partition_for
+from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
+from src.marketing_messaging_service.services.suppression_ledger import SuppressionLedger
+from src.marketing_messaging_service.services.suppression_service import SuppressionService
+from src.marketing_messaging_service.services.user_state import UserStateService
+
+READ_CHUNK_BYTES = 1_048_576
+TRAIT_COLUMNS = ("email", "country", "marketing_opt_in", "risk_segment")
+# Attempts after the first for a chunk that fails with an OperationalError, backing off 0.1s, 0.2s, ...
+LOCKED_RETRIES = 6
+LOCKED_BACKOFF_SECONDS = 0.1
+
+_service: EventProcessingService | None = None
+
+
+def read_events(path: Path) -> Iterator[StreamLine]:
+    if path.suffix.lower() == ".csv":
+        yield from _read_csv(path)
+        return
+
+    parser = NDJSONEventParser()
+    with open(path, "rb") as f:
+        while data := f.read(READ_CHUNK_BYTES):
+            yield from parser.feed(data)
+    yield from parser.close()
+
+
+def _read_csv(path: Path) -> Iterator[StreamLine]:
+    with open(path, newline="", encoding="utf-8") as f:
+        # Line 1 is the header.
+        for number, row in enumerate(csv.DictReader(f), start=2):
+            try:
+                yield StreamLine(number, event=EventIn.model_validate(_csv_row_to_event(row)))
+            except ValidationError as exc:
+                yield StreamLine(number, error=format_validation_error(exc))
+            except ValueError as exc:
+                yield StreamLine(number, error=str(exc))
+
+
+def _csv_row_to_event(row: dict[str, str]) -> dict:
+    event = {
+        "user_id": row.get("user_id"),
+        "event_type": row.get("event_type"),
+        "event_timestamp": row.get("event_timestamp"),
+    }
+    if row.get("properties"):
+        event["properties"] = json.loads(row["properties"])
+    if row.get("user_traits"):
+        event["user_traits"] = json.loads(row["user_traits"])
+    else:
+        traits = {column: row[column] for column in TRAIT_COLUMNS if row.get(column)}
+        if traits:
+            event["user_traits"] = traits
+    return event
+
+
+def partition_inputs(paths: list[Path], work_dir: Path, partitions: int) -> dict:
+    """Split the inputs into per-partition NDJSON files of validated events."""
+    partition_dir = work_dir / "partitions"
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    files = [open(_partition_path(work_dir, i), "w", encoding="utf-8") for i in range(partitions)]
+    counts = Counter()
+    try:
+        with open(work_dir / "rejected.ndjson", "w", encoding="utf-8") as rejected:
+            for path in paths:
+                for line in read_events(path):
+                    if line.event is None:
+                        rejected.write(json.dumps({"file": str(path), "line": line.number, "error": line.error}) + "\n")
+                        counts["rejected"] += 1
+                        continue
+                    files[partition_for(line.event.user_id, partitions)].write(line.event.model_dump_json() + "\n")
+                    counts["events"] += 1
+    finally:
+        for f in files:
+            f.close()
+    return dict(counts)
+
+
+def _partition_path(work_dir: Path, index: int) -> Path:
+    return work_dir / "partitions" / f"part-{index:04d}.ndjson"
+
+
+def _checkpoint_path(work_dir: Path, index: int) -> Path:
+    return work_dir / "checkpoints" / f"part-{index:04d}.json"
+
+
+def read_checkpoint(work_dir: Path, index: int) -> int:
+    path = _checkpoint_path(work_dir, index)
+    if not path.exists():
+        return 0
+    return json.loads(path.read_text())["committed"]
+
+
+def write_checkpoint(work_dir: Path, index: int, committed: int) -> None:
+    path = _checkpoint_path(work_dir, index)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"committed": committed}))
+    os.replace(tmp, path)
+
+
+def build_service(messaging_provider: IMessagingProvider) -> EventProcessingService:
+    # Provider calls are made inline: a backfill does not go through the outbox.
+    event_repository = EventRepository()
+    send_request_repository = SendRequestRepository()
+    suppression_repository = SuppressionRepository()
+    decision_repository = DecisionRepository()
+    user_state_service = UserStateService(UserStateRepository()) if settings.user_state_enabled else None
+    return EventProcessingService(
+        event_repository=event_repository,
+        send_request_repository=send_request_repository,
+        suppression_repository=suppression_repository,
+        rule_evaluation_service=RuleEvaluationService(
+            event_repository=event_repository,
+            user_state_service=user_state_service,
+        ),
+        suppression_service=SuppressionService(
+            suppression_repository=suppression_repository,
+            send_request_repository=send_request_repository,
+            suppression_ledger=SuppressionLedger(
+                send_request_repository=send_request_repository,
+                user_state_service=user_state_service,
+            ),
+            user_state_service=user_state_service,
+        ),
+        messaging_provider=messaging_provider,
+        decision_repository=decision_repository,
+        # Events are skipped when their idempotency key, or without one their fingerprint, is
+        # already stored, so replaying a chunk after a crash does not duplicate it.
+        idempotency_keys=IdempotencyKeys(
+            event_repository=event_repository,
+            decision_repository=decision_repository,
+            fingerprint_events=True,
+            recent_keys=RecentKeyFilter(capacity=settings.idempotency_filter_capacity),
+        ),
+        user_state_service=user_state_service,
+    )
+
+
+def _init_worker(no_sends: bool) -> None:
+    global _service
+    provider = NullMessagingProvider() if no_sends else FakeMessagingProvider(buffered=False)
+    _service = build_service(provider)
+
+
+def process_partition(work_dir: Path, index: int, chunk_size: int) -> dict:
+    """Runs in a pool worker: process one partition from its checkpoint on."""
+    started = time.perf_counter()
+    with open(_partition_path(work_dir, index), encoding="utf-8") as f:
+        events = [EventIn.model_validate_json(line) for line in f]
+    # Stable sort: events with equal timestamps keep their input order.
+    events.sort(key=lambda event: to_naive_utc(event.event_timestamp))
+
+    committed = read_checkpoint(work_dir, index)
+    outcomes = Counter()
+    failed = 0
+    for start in range(committed, len(events), chunk_size):
+        chunk = events[start:start + chunk_size]
+        for outcome in _process_chunk(chunk, work_dir, index):
+            outcomes[outcome] += 1
+        failed += outcomes.pop("failed", 0)
+        write_checkpoint(work_dir, index, start + len(chunk))
+
+    return {
+        "partition": index,
+        "events": len(events),
+        "skipped": committed,
+        "processed": len(events) - committed,
+        "failed": failed,
+        "outcomes": dict(outcomes),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _process_chunk(chunk: list[EventIn], work_dir: Path, index: int) -> list[str]:
+    try:
+        return _commit_chunk(chunk)
+    except OperationalError:
+        # The database, not the events, is the problem: stop before the checkpoint moves.
+        raise
+    except Exception as exc:
+        if len(chunk) > 1:
+            # Retry one by one so a single bad event does not fail the rest of the chunk.
+            return [outcome for event in chunk for outcome in _process_chunk([event], work_dir, index)]
+        failure = {"partition": index, "error": str(exc), "event": chunk[0].model_dump(mode="json")}
+        with open(work_dir / "failed.ndjson", "a", encoding="utf-8") as f:
+            f.write(json.dumps(failure) + "\n")
+        return ["failed"]
+
+
+def _commit_chunk(chunk: list[EventIn]) -> list[str]:
+    for attempt in range(LOCKED_RETRIES + 1):
+        try:
+            with create_session() as db:
+                return [outcome for _, _, outcome, _, _ in _service.process_own_batch(db, chunk)]
+        except OperationalError:
+            if attempt == LOCKED_RETRIES:
+                raise
+            time.sleep(LOCKED_BACKOFF_SECONDS * 2 ** attempt)
+
+
+def _load_manifest(work_dir: Path, inputs: list[str], partitions: int) -> dict | None:
+    path = work_dir / "manifest.json"
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_text())
+    if manifest["inputs"] != inputs or manifest["partitions"] != partitions:
+        raise SystemExit(
+            f"{work_dir} belongs to a backfill of {manifest['inputs']} ({manifest['partitions']} partitions); "
+            "use another --work-dir or remove it"
+        )
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", type=Path, help="NDJSON or CSV event files")
+    parser.add_argument("--work-dir", type=Path, default=Path(".backfill"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--partitions", type=int, default=64, help="each partition must fit in a worker's memory")
+    parser.add_argument("--chunk-size", type=int, default=1_000, help="events per transaction")
+    parser.add_argument("--no-sends", action="store_true", help="record decisions and sends, call no provider")
+    args = parser.parse_args()
+
+    inputs = [str(path.resolve()) for path in args.inputs]
+    manifest = _load_manifest(args.work_dir, inputs, args.partitions)
+
+    started = time.perf_counter()
+    if manifest is None:
+        counts = partition_inputs(args.inputs, args.work_dir, args.partitions)
+        manifest = {"inputs": inputs, "partitions": args.partitions, **counts}
+        (args.work_dir / "checkpoints").mkdir(exist_ok=True)
+        (args.work_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        print(
+            f"partitioned {manifest.get('events', 0)} events ({manifest.get('rejected', 0)} rejected lines) "
+            f"in {time.perf_counter() - started:.1f}s",
+            file=sys.stderr,
+        )
+    else:
+        print(f"resuming from {args.work_dir}", file=sys.stderr)
+
+    processing_started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.no_sends,)) as pool:
+        futures = [
+            pool.submit(process_partition, args.work_dir, index, args.chunk_size)
+            for index in range(args.partitions)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(
+                f"partition {result['partition']:>4}: {result['processed']} events in {result['seconds']:.1f}s "
+                f"({len(results)}/{args.partitions})",
+                file=sys.stderr,
+            )
+    processing_seconds = time.perf_counter() - processing_started
+
+    processed = sum(r["processed"] for r in results)
+    outcomes = sum((Counter(r["outcomes"]) for r in results), Counter())
+    report = {
+        "events": manifest.get("events", 0),
+        "rejected_lines": manifest.get("rejected", 0),
+        "resumed_past": sum(r["skipped"] for r in results),
+        "processed": processed,
+        "failed": sum(r["failed"] for r in results),
+        "outcomes": dict(outcomes),
+        "workers": args.workers,
+        "processing_seconds": round(processing_seconds, 2),
+        "events_per_sec": round(processed / processing_seconds, 1) if processing_seconds else 0.0,
+        "total_seconds": round(time.perf_counter() - started, 2),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Regenerate the user_state table from events and send_requests.
+
+    python -m src.marketing_messaging_service.commands.rebuild_user_state
+
+Runs in one transaction: concurrent readers see either the old or the rebuilt table.
+Needed after events or send_requests were changed outside EventProcessingService (manual
+fixes, restores); the migration that creates the table fills it the same way.
+"""
+import argparse
+import json
+import time
+
+from src.marketing_messaging_service.infrastructure.database import create_session
+from src.marketing_messaging_service.repositories import UserStateRepository
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    started = time.perf_counter()
+    with create_session() as db:
+        rows = UserStateRepository().rebuild(db)
+    print(json.dumps({"rows": rows, "seconds": round(time.perf_counter() - started, 2)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Archive and delete rows that no rule can look at anymore.
+
+    python -m src.marketing_messaging_service.commands.retention --dry-run
+    python -m src.marketing_messaging_service.commands.retention --archive-dir /backups/mms --vacuum
+
+The horizon is derived from the active rules: the longest prior_event window (at least a
+day with a once_per_calendar_day rule) plus --grace-hours, and never less than --min-days.
+Events recorded and timestamped before now - horizon are moved, with their user_traits,
+decisions and suppressions, to gzip NDJSON files under --archive-dir/<run time>/, and so are
+older sends except the latest one per (user, template). Each chunk of --chunk-size rows is
+its own short transaction.
+
+Deleted rows only free pages inside the SQLite file; --vacuum rewrites the file to return
+them to the OS, under an exclusive lock for the duration of the rewrite.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import yaml
+
+from src.marketing_messaging_service.infrastructure.database import engine
+from src.marketing_messaging_service.infrastructure.database import to_naive_utc
+from src.marketing_messaging_service.infrastructure.database import utc_now
+from src.marketing_messaging_service.repositories.retention_repository import RetentionRepository
+from src.marketing_messaging_service.services.retention import ArchiveWriter
+from src.marketing_messaging_service.services.retention import RetentionService
+from src.marketing_messaging_service.services.retention import retention_horizon
+from src.marketing_messaging_service.services.retention import sqlite_space
+from src.marketing_messaging_service.services.retention import vacuum
+from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", help="rules file the horizon is derived from (default: the service's rules file)")
+    parser.add_argument("--archive-dir", type=Path, default=Path(".archive"))
+    parser.add_argument("--grace-hours", type=float, default=24.0, help="allowance for events that arrive late")
+    parser.add_argument("--min-days", type=float, default=30.0, help="keep at least this much history for audits")
+    parser.add_argument("--chunk-size", type=int, default=1_000, help="rows per transaction")
+    parser.add_argument("--pause-ms", type=float, default=50.0, help="pause between chunks, for concurrent writers")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards to shrink the SQLite file")
+    parser.add_argument("--dry-run", action="store_true", help="print the horizon and cutoff, change nothing")
+    args = parser.parse_args()
+
+    try:
+        ruleset = RuleEvaluationService(event_repository=None, rules_path=args.rules).get_ruleset()
+    except (OSError, ValueError, yaml.YAMLError) as exc:
+        sys.exit(f"Rules not loaded: {exc}")
+
+    started_at = utc_now()
+    horizon = retention_horizon(
+        ruleset, grace=timedelta(hours=args.grace_hours), minimum=timedelta(days=args.min_days)
+    )
+    cutoff = to_naive_utc(started_at - horizon)
+    report = {
+        "ruleset_version": ruleset.version,
+        "horizon_hours": horizon.total_seconds() / 3600,
+        "cutoff": cutoff.isoformat(),
+    }
+    if args.dry_run:
+        print(json.dumps(report, indent=2))
+        return
+
+    space_before = sqlite_space(engine)
+    archive = ArchiveWriter(args.archive_dir / started_at.strftime("%Y%m%dT%H%M%SZ"))
+    service = RetentionService(RetentionRepository(), chunk_size=args.chunk_size, pause_seconds=args.pause_ms / 1000)
+    started = time.perf_counter()
+    try:
+        report["rows"] = service.archive(cutoff, archive)
+    finally:
+        archive.close()
+    report["archive_dir"] = str(archive.directory)
+    report["archive_bytes"] = archive.size_bytes() if archive.directory.exists() else 0
+    report["seconds"] = round(time.perf_counter() - started, 2)
+
+    if space_before is not None:
+        space_after = sqlite_space(engine)
+        if args.vacuum:
+            vacuum(engine)
+            space_vacuumed = sqlite_space(engine)
+            report["vacuum_seconds"] = round(time.perf_counter() - started - report["seconds"], 2)
+        report["space"] = {
+            "database_bytes_before": space_before["database_bytes"],
+            # Pages freed by this run; reused by new rows, or returned to the OS by --vacuum.
+            "freed_bytes": space_after["free_bytes"] - space_before["free_bytes"],
+            "database_bytes_after": (space_vacuumed if args.vacuum else space_after)["database_bytes"],
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
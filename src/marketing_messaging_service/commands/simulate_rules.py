@@ -0,0 +1,80 @@
+"""
+Dry-run a candidate rules file over the stored events and compare it with the active rules.
+
+    python -m src.marketing_messaging_service.commands.simulate_rules candidate_rules.yaml
+    python -m src.marketing_messaging_service.commands.simulate_rules candidate_rules.yaml --json
+
+Prints, per rule, how many events it matches and how many of those it would allow, alert
+on or suppress (by suppression reason) under each ruleset, followed by the most common
+decision changes. Both rulesets are replayed from the first stored event with in-memory
+send histories; nothing is written to the database.
+"""
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from dataclasses import replace
+
+import yaml
+
+from src.marketing_messaging_service.repositories import EventRepository
+from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
+from src.marketing_messaging_service.services.rule_simulation import RuleCounts
+from src.marketing_messaging_service.services.rule_simulation import RuleSimulationService
+from src.marketing_messaging_service.services.rule_simulation import SimulationReport
+
+
+def print_report(report: SimulationReport, top: int) -> None:
+    print(
+        f"{report.events} events, {report.users} users; "
+        f"active {report.active.ruleset_version} vs candidate {report.candidate.ruleset_version}\n"
+    )
+    print(f"{'rule':<32} {'':>9} {'matched':>9} {'allow':>9} {'alert':>9} {'suppress':>9}  suppressed by")
+    for rule in sorted(set(report.active.rules) | set(report.candidate.rules)):
+        for label, run in (("active", report.active), ("candidate", report.candidate)):
+            counts = run.rules.get(rule, RuleCounts())
+            reasons = ", ".join(f"{reason}={n}" for reason, n in sorted(counts.suppressed.items()))
+            print(
+                f"{rule if label == 'active' else '':<32} {label:>9} {counts.matched:>9} {counts.allowed:>9} "
+                f"{counts.alerted:>9} {sum(counts.suppressed.values()):>9}  {reasons}"
+            )
+
+    print(f"\n{report.changed} decisions change")
+    for (before, after), n in report.transitions.most_common(top):
+        print(f"{n:>9}  {before} -> {after}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("candidate", help="candidate rules file")
+    parser.add_argument("--active", help="rules file to compare against (default: the service's rules file)")
+    parser.add_argument("--chunk-size", type=int, default=1_000, help="events read per transaction")
+    parser.add_argument("--top", type=int, default=20, help="decision changes to list")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    event_repository = EventRepository()
+    candidate = RuleEvaluationService(event_repository=event_repository, rules_path=args.candidate)
+    active = RuleEvaluationService(event_repository=event_repository, rules_path=args.active)
+    try:
+        candidate.get_ruleset()
+        active.get_ruleset()
+    except (OSError, ValueError, yaml.YAMLError) as exc:
+        sys.exit(f"Rules not loaded: {exc}")
+
+    service = RuleSimulationService(event_repository, candidate=candidate, active=active, chunk_size=args.chunk_size)
+    report = service.simulate()
+
+    if args.json:
+        data = asdict(replace(report, transitions=None))
+        data["transitions"] = [
+            {"active": before, "candidate": after, "events": n}
+            for (before, after), n in report.transitions.most_common()
+        ]
+        print(json.dumps(data, indent=2))
+    else:
+        print_report(report, args.top)
+
+
+if __name__ == "__main__":
+    main()
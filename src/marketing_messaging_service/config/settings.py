@@ -6,11 +6,133 @@ from pydantic_settings import BaseSettings
 
 load_dotenv()
 
+# PRAGMAs applied to every new SQLite connection, per SQLITE_PROFILE.
+SQLITE_PROFILES: dict[str, dict[str, str | int]] = {
+    # SQLite's own defaults: rollback journal, synchronous=FULL, no mmap.
+    "default": {},
+    # WAL lets readers run alongside the single writer; synchronous=NORMAL is durable
+    # against application crashes and only risks the last commits on power loss.
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268_435_456,
+        "cache_size": -65_536,
+        "busy_timeout": 5_000,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def _optional_int(name: str) -> int | None:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
 
 class Settings(BaseSettings):
     api_host: str = os.environ.get("API_HOST", "127.0.0.1")
     api_port: int = int(os.environ.get("API_PORT", 8000))
 
+    # "sync": Session in the threadpool, "async": AsyncSession on the async driver (aiosqlite for SQLite).
+    database_mode: str = os.environ.get("DATABASE_MODE", "sync")
+
+    # SQLite connection tuning: a named profile from SQLITE_PROFILES, with per-PRAGMA overrides.
+    sqlite_profile: str = os.environ.get("SQLITE_PROFILE", "default")
+    sqlite_journal_mode: str | None = os.environ.get("SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str | None = os.environ.get("SQLITE_SYNCHRONOUS")
+    sqlite_mmap_size: int | None = _optional_int("SQLITE_MMAP_SIZE")
+    sqlite_cache_size: int | None = _optional_int("SQLITE_CACHE_SIZE")
+    sqlite_busy_timeout_ms: int | None = _optional_int("SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_temp_store: str | None = os.environ.get("SQLITE_TEMP_STORE")
+
+    # Connection pool for server databases (PostgreSQL); SQLite keeps SQLAlchemy's default pool.
+    db_pool_size: int = int(os.environ.get("DB_POOL_SIZE", 5))
+    db_max_overflow: int = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+    db_pool_recycle_seconds: int = int(os.environ.get("DB_POOL_RECYCLE_SECONDS", 1800))
+
+    # "inline": events are processed in the request. "partitioned": PROCESSING_WORKERS processes, each owning
+    # a hash partition of user_ids; PROCESSING_ACK=wait returns the result, "queued" answers 202 once enqueued.
+    processing_mode: str = os.environ.get("PROCESSING_MODE", "inline")
+    processing_workers: int = int(os.environ.get("PROCESSING_WORKERS", os.cpu_count() or 1))
+    processing_queue_size: int = int(os.environ.get("PROCESSING_QUEUE_SIZE", 1000))
+    processing_batch_size: int = int(os.environ.get("PROCESSING_BATCH_SIZE", 100))
+    processing_ack: str = os.environ.get("PROCESSING_ACK", "wait")
+    processing_enqueue_timeout_seconds: float = float(os.environ.get("PROCESSING_ENQUEUE_TIMEOUT_SECONDS", 5.0))
+    # PROCESSING_ACK=wait: longest wait for the workers' results before answering 504.
+    processing_result_timeout_seconds: float = float(os.environ.get("PROCESSING_RESULT_TIMEOUT_SECONDS", 30.0))
+
+    # POST /events/stream: events committed per transaction, and the longest accepted NDJSON line.
+    event_stream_chunk_size: int = int(os.environ.get("EVENT_STREAM_CHUNK_SIZE", 500))
+    event_stream_max_line_bytes: int = int(os.environ.get("EVENT_STREAM_MAX_LINE_BYTES", 1_048_576))
+
+    # prior_event / suppression probes answered from the user_state table (latest timestamps per user) instead
+    # of scanning events and send_requests. Off by default: it needs the user_state table (alembic upgrade head).
+    user_state_enabled: bool = os.environ.get("USER_STATE_ENABLED", "false").lower() == "true"
+
+    # In-process LRU of per (user, template) send history used by suppression checks.
+    suppression_ledger_enabled: bool = os.environ.get("SUPPRESSION_LEDGER_ENABLED", "false").lower() == "true"
+    suppression_ledger_max_entries: int = int(os.environ.get("SUPPRESSION_LEDGER_MAX_ENTRIES", 100_000))
+
+    # Deduplication by EventIn.idempotency_key (or, with IDEMPOTENCY_FINGERPRINT_EVENTS, a hash of the event
+    # content). A per-process Bloom filter of recently written keys skips the DB lookup for keys that are new.
+    idempotency_fingerprint_events: bool = os.environ.get("IDEMPOTENCY_FINGERPRINT_EVENTS", "false").lower() == "true"
+    idempotency_filter_enabled: bool = os.environ.get("IDEMPOTENCY_FILTER_ENABLED", "true").lower() == "true"
+    idempotency_filter_capacity: int = int(os.environ.get("IDEMPOTENCY_FILTER_CAPACITY", 1_000_000))
+
+    # Per-request SQL statement count and DB time: logged at DEBUG, with a warning above the budget.
+    query_stats_header: bool = os.environ.get("QUERY_STATS_HEADER", "false").lower() == "true"
+    query_budget_warn_statements: int = int(os.environ.get("QUERY_BUDGET_WARN_STATEMENTS", 50))
+
+    # Reload rules.yaml when its mtime changes (also available on demand via POST /admin/rules/reload).
+    rules_hot_reload: bool = os.environ.get("RULES_HOT_RELOAD", "false").lower() == "true"
+    rules_reload_interval_seconds: float = float(os.environ.get("RULES_RELOAD_INTERVAL_SECONDS", 2.0))
+
+    # Serialized GET /audit responses per user, dropped when new decisions for the user commit.
+    audit_cache_enabled: bool = os.environ.get("AUDIT_CACHE_ENABLED", "true").lower() == "true"
+    audit_cache_max_users: int = int(os.environ.get("AUDIT_CACHE_MAX_USERS", 10_000))
+    audit_cache_ttl_seconds: float = float(os.environ.get("AUDIT_CACHE_TTL_SECONDS", 30.0))
+    audit_cache_max_body_bytes: int = int(os.environ.get("AUDIT_CACHE_MAX_BODY_BYTES", 1_048_576))
+
+    # Transactional outbox: provider calls are delivered by a background worker pool after commit.
+    # Off by default: it needs the outbox_messages table (alembic upgrade head).
+    outbox_enabled: bool = os.environ.get("OUTBOX_ENABLED", "false").lower() == "true"
+    outbox_workers: int = int(os.environ.get("OUTBOX_WORKERS", 4))
+    outbox_max_attempts: int = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 5))
+    outbox_retry_backoff_seconds: float = float(os.environ.get("OUTBOX_RETRY_BACKOFF_SECONDS", 2.0))
+    outbox_poll_interval_seconds: float = float(os.environ.get("OUTBOX_POLL_INTERVAL_SECONDS", 1.0))
+
+    # FakeMessagingProvider: batched background writes to messages.txt, bounded in-memory history.
+    fake_provider_buffered: bool = os.environ.get("FAKE_PROVIDER_BUFFERED", "true").lower() == "true"
+    fake_provider_flush_max_lines: int = int(os.environ.get("FAKE_PROVIDER_FLUSH_MAX_LINES", 500))
+    fake_provider_flush_interval_seconds: float = float(os.environ.get("FAKE_PROVIDER_FLUSH_INTERVAL_SECONDS", 0.5))
+    fake_provider_max_pending_lines: int = int(os.environ.get("FAKE_PROVIDER_MAX_PENDING_LINES", 10_000))
+    fake_provider_max_sent_messages: int = int(os.environ.get("FAKE_PROVIDER_MAX_SENT_MESSAGES", 1000))
+    fake_provider_echo: bool = os.environ.get("FAKE_PROVIDER_ECHO", "false").lower() == "true"
+
+    @property
+    def sqlite_pragmas(self) -> dict[str, str | int]:
+        if self.sqlite_profile not in SQLITE_PROFILES:
+            raise ValueError(f"Unknown SQLITE_PROFILE {self.sqlite_profile!r}; expected one of {list(SQLITE_PROFILES)}")
+
+        pragmas = dict(SQLITE_PROFILES[self.sqlite_profile])
+        overrides = {
+            "journal_mode": self.sqlite_journal_mode,
+            "synchronous": self.sqlite_synchronous,
+            "mmap_size": self.sqlite_mmap_size,
+            "cache_size": self.sqlite_cache_size,
+            "busy_timeout": self.sqlite_busy_timeout_ms,
+            "temp_store": self.sqlite_temp_store,
+        }
+        pragmas.update({name: value for name, value in overrides.items() if value is not None})
+        return pragmas
+
+    @property
+    def pool_options(self) -> dict[str, int]:
+        return {
+            "pool_size": self.db_pool_size,
+            "max_overflow": self.db_max_overflow,
+            "pool_recycle": self.db_pool_recycle_seconds,
+        }
+
     @property
     def database_url(self) -> str:
         # `settings.py` is at: `.../src/marketing_messaging_service/config/settings.py`
@@ -0,0 +1,92 @@
+import yaml
+from fastapi import APIRouter
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from src.marketing_messaging_service.controllers.event_controller import partitioned_processor
+from src.marketing_messaging_service.controllers.event_controller import rule_evaluation_service
+from src.marketing_messaging_service.schemas.rules import ConditionStatsInfo
+from src.marketing_messaging_service.schemas.rules import RulesetInfo
+from src.marketing_messaging_service.schemas.rules import RulesetStatsInfo
+from src.marketing_messaging_service.schemas.rules import RuleStatsInfo
+from src.marketing_messaging_service.services.rule_compiler import CompiledCondition
+from src.marketing_messaging_service.services.rule_compiler import CompiledRule
+from src.marketing_messaging_service.services.rule_compiler import CompiledRuleset
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/rules", response_model=RulesetInfo)
+async def get_active_rules():
+    ruleset = await run_in_threadpool(rule_evaluation_service.get_ruleset)
+    return _to_info(ruleset)
+
+
+@router.get("/rules/stats", response_model=RulesetStatsInfo)
+async def get_rule_stats():
+    """
+    How often each condition was checked and rejected in the sampled checks since the ruleset
+    was loaded, and the order conditions are currently checked in. Counts come from this process only: with
+    partitioned workers the events are evaluated, and counted, in the workers.
+    """
+    ruleset = await run_in_threadpool(rule_evaluation_service.get_ruleset)
+    return RulesetStatsInfo(
+        version=ruleset.version,
+        rules=[
+            _to_rule_stats(event_type, compiled_rule)
+            for event_type, compiled_rules in ruleset.rules_by_event_type.items()
+            for compiled_rule in compiled_rules
+        ],
+    )
+
+
+@router.post("/rules/reload", response_model=RulesetInfo)
+async def reload_rules():
+    """Validate and compile the rules file, then swap it in; the active ruleset is kept on error."""
+    try:
+        ruleset = await run_in_threadpool(rule_evaluation_service.reload_rules)
+    except (OSError, ValueError, yaml.YAMLError) as exc:
+        raise HTTPException(status_code=400, detail=f"Rules not reloaded: {exc}")
+    if partitioned_processor is not None:
+        # Partition workers evaluate with their own copy; they reload after the events already queued.
+        await run_in_threadpool(partitioned_processor.reload_rules)
+    return _to_info(ruleset)
+
+
+def _to_info(ruleset: CompiledRuleset) -> RulesetInfo:
+    return RulesetInfo(
+        version=ruleset.version,
+        rule_count=ruleset.rule_count,
+        rules_path=rule_evaluation_service.rules_path,
+    )
+
+
+def _to_rule_stats(event_type: str, compiled_rule: CompiledRule) -> RuleStatsInfo:
+    stats = compiled_rule.stats
+    order = stats.order
+    return RuleStatsInfo(
+        rule=compiled_rule.rule.name,
+        event_type=event_type,
+        adaptive=stats.adaptive,
+        sampled_checks=stats.samples,
+        conditions=[
+            ConditionStatsInfo(
+                index=index,
+                condition=_describe(condition),
+                cost_class=stats.cost_classes[index],
+                check_order=order.index(index),
+                evaluated=stats.evaluated[index],
+                rejected=stats.rejected[index],
+                rejection_rate=round(stats.rejection_rate(index), 4),
+            )
+            for index, condition in enumerate(compiled_rule.conditions)
+        ],
+    )
+
+
+def _describe(condition: CompiledCondition) -> str:
+    if condition.kind == "field":
+        return f"{condition.field} {condition.operator} {condition.value!r}"
+    if condition.kind == "prior_event":
+        return f"prior_event {condition.event_type} within {condition.window.total_seconds() / 3600:g}h"
+    return "invalid"
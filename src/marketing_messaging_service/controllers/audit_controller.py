@@ -1,24 +1,189 @@
+import json
+from datetime import datetime
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import Iterator
+
 from fastapi import APIRouter
-from fastapi import Depends
-from sqlalchemy.orm import Session
+from fastapi import Header
+from fastapi import HTTPException
+from fastapi import Query
+from fastapi import Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
+from src.marketing_messaging_service.config.settings import settings
+from src.marketing_messaging_service.infrastructure.database import create_async_session
 from src.marketing_messaging_service.infrastructure.database import create_session
+from src.marketing_messaging_service.infrastructure.database import run_in_session
+from src.marketing_messaging_service.repositories import EventRepository
+from src.marketing_messaging_service.repositories import SendRequestRepository
+from src.marketing_messaging_service.repositories import SuppressionRepository
 from src.marketing_messaging_service.repositories.decision_repository import DecisionRepository
 from src.marketing_messaging_service.schemas.audit import AuditLog
+from src.marketing_messaging_service.schemas.audit import AuditLogItem
+from src.marketing_messaging_service.services.audit_cache import AuditCache
+from src.marketing_messaging_service.services.audit_cache import etag_for
+from src.marketing_messaging_service.services.audit_cache import etag_matches
+from src.marketing_messaging_service.services.audit_cache import version_etag
+from src.marketing_messaging_service.services.audit_service import AuditCursor
 from src.marketing_messaging_service.services.audit_service import AuditService
+from src.marketing_messaging_service.services.audit_service import decode_cursor
+from src.marketing_messaging_service.services.timeline_service import TimelineService
 
 router = APIRouter(prefix="/audit", tags=["audit"])
 
-
-def get_db():
-    with create_session() as session:
-        yield session
+# Items serialized per chunk of a streamed export.
+EXPORT_CHUNK_ITEMS = 500
 
 
 decision_repository = DecisionRepository()
+audit_cache = (
+    AuditCache(
+        max_users=settings.audit_cache_max_users,
+        ttl_seconds=settings.audit_cache_ttl_seconds,
+        max_body_bytes=settings.audit_cache_max_body_bytes,
+    )
+    if settings.audit_cache_enabled
+    else None
+)
 audit_service = AuditService(decision_repository=decision_repository)
+timeline_service = TimelineService(
+    event_repository=EventRepository(),
+    send_request_repository=SendRequestRepository(),
+    suppression_repository=SuppressionRepository(),
+    decision_repository=decision_repository,
+)
 
 
 @router.get("/{user_id}", response_model=AuditLog)
-def get_audit(user_id: str, db: Session = Depends(get_db)):
-    return audit_service.get_audit_log(db=db, user_id=user_id)
+async def get_audit(
+    user_id: str,
+    limit: int | None = Query(default=None, ge=1, le=1000, description="Page size; omit to stream the full log"),
+    before: str | None = Query(default=None, description="`next_cursor` of the previous page"),
+    since: datetime | None = Query(default=None, description="Only decisions created at or after this time"),
+    until: datetime | None = Query(default=None, description="Only decisions created before this time"),
+    if_none_match: str | None = Header(default=None),
+):
+    try:
+        cursor = decode_cursor(before) if before is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    variant = (limit, before, since, until)
+    if limit is None:
+        return await _stream_audit_response(user_id, variant, cursor, since, until, if_none_match)
+
+    generation = 0
+    if audit_cache is not None:
+        cached = audit_cache.get(user_id, variant)
+        if cached is not None:
+            return _etag_response(cached.body, cached.etag, if_none_match)
+        # Read before querying, so a commit that lands meanwhile keeps this result out of the cache.
+        generation = audit_cache.generation(user_id)
+
+    audit_log = await _read(
+        audit_service.get_audit_log, user_id=user_id, limit=limit, before=cursor, since=since, until=until
+    )
+    body = audit_log.model_dump_json().encode()
+    etag = etag_for(body)
+    if audit_cache is not None:
+        audit_cache.put(user_id, variant, generation, etag, body)
+    return _etag_response(body, etag, if_none_match)
+
+
+@router.get("/{user_id}/timeline", response_model=AuditLog)
+async def get_timeline(
+    user_id: str,
+    since: datetime | None = Query(default=None, description="Only records created at or after this time"),
+    until: datetime | None = Query(default=None, description="Only records created before this time"),
+):
+    """Events, send requests, suppressions and decisions for the user, newest first, streamed."""
+    items = timeline_service.iter_timeline(user_id, since=since, until=until)
+    return StreamingResponse(_stream_audit_log(user_id, items), media_type="application/json")
+
+
+async def _stream_audit_response(
+    user_id: str,
+    variant: Hashable,
+    cursor: AuditCursor | None,
+    since: datetime | None,
+    until: datetime | None,
+    if_none_match: str | None,
+) -> Response:
+    # The body is not known up front: the ETag names the stored decisions, read before the stream
+    # starts, so it never claims more than the body holds and changes with writes of any process.
+    generation = audit_cache.generation(user_id) if audit_cache is not None else 0
+    version = await _read(audit_service.get_log_version, user_id=user_id, before=cursor, since=since, until=until)
+    etag = version_etag(user_id, variant, version)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    if audit_cache is not None:
+        cached = audit_cache.get(user_id, variant)
+        if cached is not None and cached.etag == etag:
+            return Response(content=cached.body, media_type="application/json", headers={"ETag": etag})
+
+    items = audit_service.iter_audit_items(user_id, before=cursor, since=since, until=until)
+    chunks = _stream_audit_log(user_id, items)
+    if audit_cache is not None:
+        chunks = _cache_when_complete(chunks, user_id, variant, generation, etag)
+    return StreamingResponse(chunks, media_type="application/json", headers={"ETag": etag})
+
+
+async def _read(method: Callable[..., Any], **query: Any) -> Any:
+    # Runs `method(db, **query)` in a short session; a streamed export opens its own in the generator.
+    if settings.database_mode == "async":
+        async with create_async_session() as db:
+            return await run_in_session(db, method, **query)
+    return await run_in_threadpool(_read_sync, method, query)
+
+
+def _read_sync(method: Callable[..., Any], query: dict) -> Any:
+    with create_session() as db:
+        return method(db, **query)
+
+
+def _etag_response(body: bytes, etag: str, if_none_match: str | None) -> Response:
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def _cache_when_complete(
+    chunks: Iterator[str], user_id: str, variant: Hashable, generation: int, etag: str
+) -> Iterator[str]:
+    # Cached if it fits, under the ETag it was sent with.
+    parts: list[bytes] | None = []
+    size = 0
+    for chunk in chunks:
+        yield chunk
+        if parts is not None:
+            encoded = chunk.encode()
+            size += len(encoded)
+            parts.append(encoded)
+            if size > audit_cache.max_body_bytes:
+                parts = None
+
+    if parts is not None:
+        body = b"".join(parts)
+        audit_cache.put(user_id, variant, generation, etag, body)
+
+
+def _stream_audit_log(user_id: str, items: Iterator[AuditLogItem]) -> Iterator[str]:
+    # Same body as AuditLog, written incrementally so the full history is never held in memory.
+    yield f'{{"user_id":{json.dumps(user_id)},"items":['
+
+    chunk: list[str] = []
+    first = True
+    for item in items:
+        chunk.append(item.model_dump_json())
+        if len(chunk) >= EXPORT_CHUNK_ITEMS:
+            yield ("" if first else ",") + ",".join(chunk)
+            chunk.clear()
+            first = False
+    if chunk:
+        yield ("" if first else ",") + ",".join(chunk)
+
+    yield '],"next_cursor":null}'
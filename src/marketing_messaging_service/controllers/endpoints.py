@@ -1,15 +1,120 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
 
+from src.marketing_messaging_service.config.settings import settings
+from src.marketing_messaging_service.controllers.admin_controller import router as admin_router
 from src.marketing_messaging_service.controllers.audit_controller import router as audit_router
+from src.marketing_messaging_service.controllers.event_controller import messaging_provider
+from src.marketing_messaging_service.controllers.event_controller import outbox_dispatcher
+from src.marketing_messaging_service.controllers.event_controller import partitioned_processor
 from src.marketing_messaging_service.controllers.event_controller import router as event_router
+from src.marketing_messaging_service.controllers.event_controller import rule_evaluation_service
+from src.marketing_messaging_service.infrastructure.database import active_engines
+from src.marketing_messaging_service.infrastructure.metrics import HTTP_REQUEST_SECONDS
+from src.marketing_messaging_service.infrastructure.metrics import HTTP_REQUESTS
+from src.marketing_messaging_service.infrastructure.metrics import registry
+from src.marketing_messaging_service.infrastructure.query_stats import track_queries
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.rules_hot_reload:
+        rule_evaluation_service.start_watching(settings.rules_reload_interval_seconds)
+    if outbox_dispatcher is not None:
+        outbox_dispatcher.start()
+    if partitioned_processor is not None:
+        partitioned_processor.start()
+    yield
+    rule_evaluation_service.stop_watching()
+    # Workers finish their queued events before the outbox stops.
+    if partitioned_processor is not None:
+        partitioned_processor.stop()
+    # Stop the dispatcher first so its last deliveries reach the provider before it flushes.
+    if outbox_dispatcher is not None:
+        outbox_dispatcher.stop()
+    messaging_provider.close()
+
 
-app = FastAPI(title="Marketing Messaging Service")
+app = FastAPI(title="Marketing Messaging Service", lifespan=lifespan)
 
 # include routers
 app.include_router(event_router)
 app.include_router(audit_router)
+app.include_router(admin_router)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+
+    # Label by route template (/audit/{user_id}) so user ids do not create new series.
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, path)
+    HTTP_REQUESTS.inc(request.method, path, str(response.status_code))
+    return response
+
+
+@app.middleware("http")
+async def track_request_queries(request: Request, call_next):
+    # Statements run while a streamed body is being sent are not included.
+    with track_queries() as stats:
+        response = await call_next(request)
+
+    db_ms = stats.seconds * 1000
+    if settings.query_stats_header:
+        response.headers["X-DB-Statements"] = str(stats.statements)
+        response.headers["X-DB-Time-Ms"] = f"{db_ms:.2f}"
+
+    if stats.statements > settings.query_budget_warn_statements:
+        logger.warning(
+            "%s %s ran %s SQL statements (%.2f ms), budget %s",
+            request.method, request.url.path, stats.statements, db_ms, settings.query_budget_warn_statements,
+        )
+    else:
+        logger.debug("%s %s ran %s SQL statements (%.2f ms)", request.method, request.url.path, stats.statements, db_ms)
+    return response
+
+
+def _pool_connections() -> dict[tuple[str, str], float]:
+    stats = {}
+    for mode, db_engine in active_engines().items():
+        pool = db_engine.pool
+        for state, method in (("size", "size"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+            if hasattr(pool, method):
+                stats[(mode, state)] = getattr(pool, method)()
+    return stats
+
+
+if partitioned_processor is not None:
+    registry.gauge_callback(
+        "mms_partition_queue_depth",
+        "Events waiting in each partition worker's inbox.",
+        ("partition",),
+        lambda: {(str(i),): depth for i, depth in enumerate(partitioned_processor.queue_depths())},
+    )
+
+registry.gauge_callback(
+    "mms_db_pool_connections",
+    "Connection pool state per engine (size, checked_out, overflow).",
+    ("engine", "state"),
+    _pool_connections,
+)
 
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,18 +1,51 @@
+import asyncio
+import logging
+import queue
+from concurrent.futures import Future
+from typing import AsyncIterator
+
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import HTTPException
+from fastapi import Request
+from fastapi import Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.marketing_messaging_service.config.settings import settings
+from src.marketing_messaging_service.controllers.audit_controller import audit_cache
+from src.marketing_messaging_service.infrastructure.database import create_async_session
 from src.marketing_messaging_service.infrastructure.database import create_session
+from src.marketing_messaging_service.infrastructure.database import run_in_session
 from src.marketing_messaging_service.providers.fake_providers import FakeMessagingProvider
 from src.marketing_messaging_service.repositories import EventRepository
+from src.marketing_messaging_service.repositories import OutboxRepository
 from src.marketing_messaging_service.repositories import SendRequestRepository
 from src.marketing_messaging_service.repositories import SuppressionRepository
+from src.marketing_messaging_service.repositories import UserStateRepository
 from src.marketing_messaging_service.repositories.decision_repository import DecisionRepository
+from src.marketing_messaging_service.schemas.event import EventAccepted
 from src.marketing_messaging_service.schemas.event import EventIn
 from src.marketing_messaging_service.schemas.event import EventProcessingResult
+from src.marketing_messaging_service.schemas.event import EventStreamError
 from src.marketing_messaging_service.services.event_processing_service import EventProcessingService
+from src.marketing_messaging_service.services.event_stream import NDJSONEventParser
+from src.marketing_messaging_service.services.event_stream import StreamLine
+from src.marketing_messaging_service.services.idempotency import IdempotencyKeyConflict
+from src.marketing_messaging_service.services.idempotency import IdempotencyKeys
+from src.marketing_messaging_service.services.idempotency import RecentKeyFilter
+from src.marketing_messaging_service.services.outbox_dispatcher import OutboxDispatcher
+from src.marketing_messaging_service.services.partitioned_processor import PartitionedEventProcessor
+from src.marketing_messaging_service.services.partitioned_processor import PartitionProcessingError
+from src.marketing_messaging_service.services.partitioned_processor import PartitionWorkerExited
 from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
+from src.marketing_messaging_service.services.suppression_ledger import SuppressionLedger
 from src.marketing_messaging_service.services.suppression_service import SuppressionService
+from src.marketing_messaging_service.services.user_state import UserStateService
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/events", tags=["events"])
 
@@ -22,18 +55,70 @@ def get_db():
         yield session
 
 
+async def get_async_db():
+    async with create_async_session() as session:
+        yield session
+
+
+db_dependency = get_async_db if settings.database_mode == "async" else get_db
+
+
 event_repository = EventRepository()
 send_request_repository = SendRequestRepository()
 suppression_repository = SuppressionRepository()
 decision_repository = DecisionRepository()
+user_state_service = UserStateService(UserStateRepository()) if settings.user_state_enabled else None
 
 
-rule_evaluation_service = RuleEvaluationService(event_repository=event_repository)
+rule_evaluation_service = RuleEvaluationService(
+    event_repository=event_repository,
+    user_state_service=user_state_service,
+)
+suppression_ledger = (
+    SuppressionLedger(
+        send_request_repository=send_request_repository,
+        max_entries=settings.suppression_ledger_max_entries,
+        user_state_service=user_state_service,
+    )
+    if settings.suppression_ledger_enabled
+    else None
+)
 suppression_service = SuppressionService(
     suppression_repository=suppression_repository,
-    send_request_repository=send_request_repository
+    send_request_repository=send_request_repository,
+    suppression_ledger=suppression_ledger,
+    user_state_service=user_state_service,
+)
+messaging_provider = FakeMessagingProvider(
+    buffered=settings.fake_provider_buffered,
+    flush_max_lines=settings.fake_provider_flush_max_lines,
+    flush_interval_seconds=settings.fake_provider_flush_interval_seconds,
+    max_pending_lines=settings.fake_provider_max_pending_lines,
+    max_sent_messages=settings.fake_provider_max_sent_messages,
+    echo=settings.fake_provider_echo,
+)
+outbox_dispatcher = (
+    OutboxDispatcher(
+        outbox_repository=OutboxRepository(),
+        messaging_provider=messaging_provider,
+        workers=settings.outbox_workers,
+        max_attempts=settings.outbox_max_attempts,
+        retry_backoff_seconds=settings.outbox_retry_backoff_seconds,
+        poll_interval_seconds=settings.outbox_poll_interval_seconds,
+    )
+    if settings.outbox_enabled
+    else None
+)
+idempotency_keys = IdempotencyKeys(
+    event_repository=event_repository,
+    decision_repository=decision_repository,
+    fingerprint_events=settings.idempotency_fingerprint_events,
+    recent_keys=(
+        RecentKeyFilter(capacity=settings.idempotency_filter_capacity)
+        if settings.idempotency_filter_enabled
+        else None
+    ),
 )
-messaging_provider = FakeMessagingProvider()
 
 event_processing_service = EventProcessingService(
     event_repository=event_repository,
@@ -43,13 +128,214 @@ event_processing_service = EventProcessingService(
     suppression_service=suppression_service,
     decision_repository=decision_repository,
     messaging_provider=messaging_provider,
+    outbox_dispatcher=outbox_dispatcher,
+    audit_cache=audit_cache,
+    idempotency_keys=idempotency_keys,
+    user_state_service=user_state_service,
 )
 
 
-@router.post("/", response_model=EventProcessingResult)
-def ingest_event(payload: EventIn, db: Session = Depends(get_db)):
-    saved_event, decision, outcome, channel, reason = event_processing_service.process_event(db, payload)
+def _on_partition_result(user_id: str) -> None:
+    # Workers commit in their own processes: refresh this process's audit cache and wake the outbox here.
+    if audit_cache is not None:
+        audit_cache.invalidate([user_id])
+    if outbox_dispatcher is not None:
+        outbox_dispatcher.notify()
+
+
+partitioned_processor = (
+    PartitionedEventProcessor(
+        workers=settings.processing_workers,
+        queue_size=settings.processing_queue_size,
+        batch_size=settings.processing_batch_size,
+        enqueue_timeout_seconds=settings.processing_enqueue_timeout_seconds,
+        on_result=_on_partition_result,
+    )
+    if settings.processing_mode == "partitioned"
+    else None
+)
+
+
+@router.post("/", response_model=EventProcessingResult | EventAccepted)
+async def ingest_event(
+    payload: EventIn,
+    response: Response,
+    db: Session | AsyncSession = Depends(db_dependency),
+):
+    if partitioned_processor is not None:
+        results = await _submit_to_partitions([payload], response)
+        return results[0] if isinstance(results, list) else results
+
+    try:
+        [(saved_event, decision, outcome, channel, reason)] = await run_in_session(
+            db, event_processing_service.process_own_batch, [payload]
+        )
+    except IdempotencyKeyConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+    return to_processing_result(saved_event, decision, outcome, channel, reason)
+
+
+@router.post("/batch", response_model=list[EventProcessingResult] | EventAccepted)
+async def ingest_event_batch(
+    payload: list[EventIn],
+    response: Response,
+    db: Session | AsyncSession = Depends(db_dependency),
+):
+    if partitioned_processor is not None:
+        return await _submit_to_partitions(payload, response)
+
+    try:
+        results = await run_in_session(db, event_processing_service.process_own_batch, payload)
+    except IdempotencyKeyConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+    return [to_processing_result(*result) for result in results]
+
+
+async def _submit_to_partitions(
+    payloads: list[EventIn], response: Response
+) -> list[EventProcessingResult] | EventAccepted:
+    try:
+        futures = await run_in_threadpool(lambda: [partitioned_processor.submit(p) for p in payloads])
+    except queue.Full:
+        raise HTTPException(status_code=503, detail="Event queue is full, retry later")
+    except PartitionWorkerExited as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+    if settings.processing_ack == "queued":
+        response.status_code = 202
+        return EventAccepted(status="accepted")
+    try:
+        return list(
+            await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(f) for f in futures)),
+                timeout=settings.processing_result_timeout_seconds,
+            )
+        )
+    except IdempotencyKeyConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except PartitionWorkerExited as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for the partition workers")
+
+
+class _BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse without the disconnect listener: under ASGI < 2.4 that listener reads
+    `receive` and would take the request body messages the response is still consuming.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@router.post("/stream", response_class=_BodyStreamingResponse)
+async def ingest_event_stream(request: Request):
+    """
+    Ingest an application/x-ndjson body, one EventIn per line, while it is being uploaded.
+
+    Events are committed EVENT_STREAM_CHUNK_SIZE lines at a time. One line is written back
+    per non-blank input line, in input order: an EventProcessingResult, or an EventStreamError
+    for a line that could not be parsed, validated or processed.
+    """
+    return _BodyStreamingResponse(_ingest_stream(request), media_type="application/x-ndjson")
+
+
+async def _ingest_stream(request: Request) -> AsyncIterator[str]:
+    parser = NDJSONEventParser(max_line_bytes=settings.event_stream_max_line_bytes)
+    chunk_size = settings.event_stream_chunk_size
+    pending: list[StreamLine] = []
+
+    async for data in request.stream():
+        pending += parser.feed(data)
+        while len(pending) >= chunk_size:
+            chunk, pending = pending[:chunk_size], pending[chunk_size:]
+            yield await _process_stream_chunk(chunk)
+
+    pending += parser.close()
+    if pending:
+        yield await _process_stream_chunk(pending)
+
+
+async def _process_stream_chunk(lines: list[StreamLine]) -> str:
+    results = iter(await _process_events([line.event for line in lines if line.event is not None]))
+    output = []
+    for line in lines:
+        if line.event is None:
+            output.append(EventStreamError(line=line.number, error=line.error))
+            continue
+        result = next(results)
+        if isinstance(result, Exception):
+            result = EventStreamError(line=line.number, error=f"Processing failed: {result}")
+        output.append(result)
+    return "".join(item.model_dump_json() + "\n" for item in output)
+
+
+async def _process_events(events: list[EventIn]) -> list[EventProcessingResult | Exception]:
+    if not events:
+        return []
+    if partitioned_processor is not None:
+        futures = [asyncio.wrap_future(f) for f in await run_in_threadpool(_submit_each, events)]
+        done, not_done = await asyncio.wait(futures, timeout=settings.processing_result_timeout_seconds)
+        for future in not_done:
+            future.cancel()
+        return [
+            (f.exception() or f.result())
+            if f in done
+            else PartitionProcessingError("Timed out waiting for the partition worker")
+            for f in futures
+        ]
+
+    try:
+        return await _commit_events(events)
+    except Exception as exc:
+        if len(events) == 1:
+            logger.exception("Failed to process a streamed event")
+            return [exc]
+        # Retry one by one so a single bad event does not fail the rest of the chunk.
+        return [result for event in events for result in await _process_events([event])]
+
+
+def _submit_each(events: list[EventIn]) -> list[Future]:
+    futures = []
+    for event in events:
+        try:
+            futures.append(partitioned_processor.submit(event))
+        except queue.Full:
+            futures.append(_failed_future(PartitionProcessingError("Event queue is full")))
+        except PartitionProcessingError as exc:
+            futures.append(_failed_future(exc))
+    return futures
+
+
+def _failed_future(exc: Exception) -> Future:
+    failed: Future = Future()
+    failed.set_exception(exc)
+    return failed
+
+
+async def _commit_events(events: list[EventIn]) -> list[EventProcessingResult]:
+    if settings.database_mode == "async":
+        async with create_async_session() as db:
+            return await db.run_sync(_process_and_convert, events)
+    return await run_in_threadpool(_commit_events_sync, events)
+
+
+def _commit_events_sync(events: list[EventIn]) -> list[EventProcessingResult]:
+    with create_session() as db:
+        return _process_and_convert(db, events)
+
+
+def _process_and_convert(db: Session, events: list[EventIn]) -> list[EventProcessingResult]:
+    # Converted before commit, which expires the ORM objects of a sync Session.
+    return [to_processing_result(*result) for result in event_processing_service.process_own_batch(db, events)]
+
 
+def to_processing_result(saved_event, decision, outcome, channel, reason) -> EventProcessingResult:
     return EventProcessingResult(
         event_id=saved_event.id,
         user_id=saved_event.user_id,
@@ -1,18 +1,45 @@
 import os
+from contextlib import asynccontextmanager
 from contextlib import contextmanager
 from datetime import datetime
 from datetime import timezone
 from pathlib import Path
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
 from typing import Iterator
 
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine
 from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import orm_insert_sentinel
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.util.concurrency import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+
+from src.marketing_messaging_service.config.settings import settings
 
 Base = declarative_base()
 
 
+class BulkInsertMixin:
+    """
+    For tables written in batches. A flush matches the ids returned by INSERT ... RETURNING to
+    its objects through a sentinel column; SQLite's autoincrement keys cannot serve as one, so
+    without this column the ORM falls back to one INSERT per row there.
+    """
+
+    _sentinel: Mapped[int] = orm_insert_sentinel()
+
+
 def _get_database_url() -> str:
     # `settings.py` is at: `.../src/marketing_messaging_service/config/settings.py`
     # Repo root is 4 levels up: config -> marketing_messaging_service -> src -> repo
@@ -33,11 +60,44 @@ def _get_database_url() -> str:
 
 DATABASE_URL = _get_database_url()
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,
-    future=True,
-)
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: dict[str, str | int]) -> None:
+    """Run `PRAGMA name=value` for every new DBAPI connection of a SQLite engine."""
+    if not pragmas or not _is_sqlite(str(engine.url)):
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def engine_options(url: str, pool_options: dict[str, int]) -> dict[str, Any]:
+    # SQLite uses SQLAlchemy's default pools (QueuePool per file, SingletonThreadPool in memory).
+    if _is_sqlite(url):
+        return {}
+    return {**pool_options, "pool_pre_ping": True}
+
+
+def create_db_engine(
+    url: str,
+    sqlite_pragmas: dict[str, str | int] | None = None,
+    pool_options: dict[str, int] | None = None,
+) -> Engine:
+    db_engine = create_engine(url, echo=False, future=True, **engine_options(url, pool_options or {}))
+    install_sqlite_pragmas(db_engine, sqlite_pragmas or {})
+    return db_engine
+
+
+engine = create_db_engine(DATABASE_URL, settings.sqlite_pragmas, settings.pool_options)
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -60,5 +120,102 @@ def create_session() -> Iterator[Session]:
         session.close()
 
 
+# Async drivers used when DATABASE_MODE=async.
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def _get_async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def _get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    # Created on first use so the async driver is only imported in async mode.
+    global _async_engine, _async_session_factory
+    if _async_session_factory is None:
+        _async_engine = async_engine = create_async_engine(
+            _get_async_database_url(DATABASE_URL),
+            echo=False,
+            **engine_options(DATABASE_URL, settings.pool_options),
+        )
+        install_sqlite_pragmas(async_engine.sync_engine, settings.sqlite_pragmas)
+        _async_session_factory = async_sessionmaker(
+            bind=async_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_session_factory
+
+
+@asynccontextmanager
+async def create_async_session() -> AsyncIterator[AsyncSession]:
+    session = _get_async_session_factory()()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+def active_engines() -> dict[str, Engine]:
+    """The engines created so far, by mode; the async one only exists once used."""
+    engines = {"sync": engine}
+    if _async_engine is not None:
+        engines["async"] = _async_engine.sync_engine
+    return engines
+
+
+async def run_in_session(db: Session | AsyncSession, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a sync, session-first service call (`fn(db, *args)`) from an async handler.
+
+    With an AsyncSession the call runs through `run_sync`, so every query awaits the
+    async driver. With a Session it runs in the threadpool, like a sync `def` handler.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def call_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Call a blocking, non-database function from a service call.
+
+    Under `run_sync` the service runs on the event loop, so the call is awaited in the
+    threadpool instead. Anywhere else it is a plain call.
+    """
+    if in_greenlet():
+        return await_only(run_in_threadpool(fn, *args, **kwargs))
+    return fn(*args, **kwargs)
+
+
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
+
+
+def recorded_now() -> datetime:
+    # Default of every recorded time (created_at / decided_at): one clock, naive UTC with microseconds,
+    # so rows of different tables written in the same second still sort in write order.
+    return strip_tz(utc_now())
+
+
+def strip_tz(ts: datetime) -> datetime:
+    # SQLite stores DateTime columns without tzinfo, so compare the same way the DB does.
+    return ts.replace(tzinfo=None)
+
+
+def to_naive_utc(ts: datetime | None) -> datetime | None:
+    # For filters on recorded times (created_at / decided_at), which are stored as naive UTC.
+    if ts is None or ts.tzinfo is None:
+        return ts
+    return ts.astimezone(timezone.utc).replace(tzinfo=None)
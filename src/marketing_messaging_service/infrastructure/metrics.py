@@ -0,0 +1,177 @@
+import threading
+from bisect import bisect_left
+from typing import Callable
+
+# Stage latencies range from tens of microseconds (rule evaluation) to seconds (slow commits).
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(self.labelnames, k)} {_format_number(v)}" for k, v in values]
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Per label set: [per-bucket counts (last one is +Inf), sum, count]
+        self._series: dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == "+Inf" else _format_number(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {repr(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class CallbackGauge:
+    """Gauge read at scrape time from `fn`, which returns {label values: value}."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...],
+        fn: Callable[[], dict[LabelValues, float]],
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.fn = fn
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        lines += [f"{self.name}{_format_labels(self.labelnames, k)} {_format_number(v)}" for k, v in self.fn().items()]
+        return lines
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text exposition format (0.0.4)."""
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram | CallbackGauge] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge_callback(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...],
+        fn: Callable[[], dict[LabelValues, float]],
+    ) -> CallbackGauge:
+        return self._register(CallbackGauge(name, help_text, labelnames, fn))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        with self._lock:
+            # Re-registering a name (e.g. a module imported twice) keeps the first instance.
+            return self._metrics.setdefault(metric.name, metric)
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "mms_stage_duration_seconds",
+    "Time spent per ingestion stage (rule_evaluation and suppression per event, rule_evaluation_batch per "
+    "column-wise batch, persist per flush, provider_send per message).",
+    ("stage",),
+)
+DECISIONS = registry.counter(
+    "mms_decisions_total", "Decisions made, by matched rule and outcome.", ("rule", "outcome")
+)
+DUPLICATE_EVENTS = registry.counter(
+    "mms_duplicate_events_total", "Events answered with the stored result of an earlier event with the same key."
+)
+SUPPRESSIONS = registry.counter("mms_suppressions_total", "Sends suppressed, by suppression reason.", ("reason",))
+OUTBOX_DELIVERIES = registry.counter(
+    "mms_outbox_deliveries_total", "Outbox delivery attempts, by result (sent, retry, failed).", ("result",)
+)
+HTTP_REQUESTS = registry.counter(
+    "mms_http_requests_total", "HTTP requests handled, by method, route and status.", ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "mms_http_request_duration_seconds", "HTTP request latency until the response starts.", ("method", "route")
+)
@@ -0,0 +1,82 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    seconds: float = 0.0
+    # Filled only when tracking with record_statements=True.
+    statement_log: list[str] = field(default_factory=list)
+    record_statements: bool = False
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+# Every tracker active in the current context; nested trackers all see the statement.
+_active: ContextVar[tuple[QueryStats, ...]] = ContextVar("query_stats_active", default=())
+
+
+@contextmanager
+def track_queries(record_statements: bool = False) -> Iterator[QueryStats]:
+    """Count SQL statements and DB time for everything executed in this context (request or unit of work)."""
+    stats = QueryStats(record_statements=record_statements)
+    token = _active.set((*_active.get(), stats))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def query_budget(max_statements: int) -> Iterator[QueryStats]:
+    """
+    Fail with QueryBudgetExceeded if the block runs more than `max_statements` statements.
+
+        with query_budget(6):
+            service.process_event(db, payload)
+    """
+    with track_queries(record_statements=True) as stats:
+        yield stats
+
+    if stats.statements > max_statements:
+        statements = "\n".join(f"  {' '.join(s.split())[:200]}" for s in stats.statement_log)
+        raise QueryBudgetExceeded(f"{stats.statements} statements, budget {max_statements}:\n{statements}")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active.get():
+        conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+    trackers = _active.get()
+    if not trackers:
+        return
+
+    started = conn.info.get("query_stats_started")
+    elapsed = time.perf_counter() - started.pop() if started else 0.0
+    for stats in trackers:
+        stats.statements += 1
+        stats.seconds += elapsed
+        if stats.record_statements:
+            stats.statement_log.append(statement)
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_timer(exception_context) -> None:
+    connection = exception_context.connection
+    started = connection.info.get("query_stats_started") if connection is not None else None
+    if started:
+        started.pop()
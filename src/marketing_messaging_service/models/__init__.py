@@ -1,7 +1,9 @@
 from src.marketing_messaging_service.models.decision import Decision
 from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.outbox_message import OutboxMessage
 from src.marketing_messaging_service.models.send_request import SendRequest
 from src.marketing_messaging_service.models.suppression import Suppression
+from src.marketing_messaging_service.models.user_state import UserState
 from src.marketing_messaging_service.models.user_traits import UserTraits
 
 __all__ = [
@@ -9,5 +11,7 @@ __all__ = [
     "UserTraits",
     "SendRequest",
     "Suppression",
-    "Decision"
+    "Decision",
+    "OutboxMessage",
+    "UserState",
 ]
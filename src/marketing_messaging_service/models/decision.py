@@ -2,22 +2,32 @@ from datetime import datetime
 
 from sqlalchemy import DateTime
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import String
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import relationship
 
 from src.marketing_messaging_service.infrastructure.database import Base
+from src.marketing_messaging_service.infrastructure.database import BulkInsertMixin
+from src.marketing_messaging_service.infrastructure.database import recorded_now
 
 
-class Decision(Base):
+class Decision(BulkInsertMixin, Base):
     __tablename__ = "decisions"
+    __table_args__ = (
+        # Keyset pagination of the audit log: newest first, id breaks created_at ties.
+        Index("ix_decisions_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
     user_id: Mapped[str] = mapped_column(String, index=True)
     event_id: Mapped[int] = mapped_column(Integer, ForeignKey("events.id"), index=True)
 
+    event = relationship("Event")
+
     event_type: Mapped[str] = mapped_column(String)
 
     matched_rule: Mapped[str | None] = mapped_column(String, nullable=True)
@@ -29,4 +39,7 @@ class Decision(Base):
     template_name: Mapped[str | None] = mapped_column(String, nullable=True)
     channel: Mapped[str | None] = mapped_column(String, nullable=True)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # Content hash of the rules file the decision was evaluated against.
+    ruleset_version: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=recorded_now)
@@ -2,6 +2,7 @@ from datetime import datetime
 
 from sqlalchemy import JSON
 from sqlalchemy import DateTime
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import String
 from sqlalchemy import func
@@ -10,10 +11,22 @@ from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
 
 from src.marketing_messaging_service.infrastructure.database import Base
+from src.marketing_messaging_service.infrastructure.database import BulkInsertMixin
+from src.marketing_messaging_service.infrastructure.database import recorded_now
 
 
-class Event(Base):
+class Event(BulkInsertMixin, Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Serves prior_event lookups: user_id + event_type + timestamp range.
+        Index("ix_events_user_id_event_type_event_timestamp", "user_id", "event_type", "event_timestamp"),
+        # At most one event per user and key; NULL (no key) may repeat.
+        Index("ux_events_user_id_idempotency_key", "user_id", "idempotency_key", unique=True),
+        # Serves the timeline: newest first, id breaks created_at ties.
+        Index("ix_events_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Serves the rule simulation's keyset pages: per user, oldest first.
+        Index("ix_events_user_id_event_timestamp_id", "user_id", "event_timestamp", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -25,9 +38,13 @@ class Event(Base):
     # Dynamic event payload stored as JSON.
     properties: Mapped[dict | None] = mapped_column(JSON, nullable=True)
 
+    # Client supplied (EventIn.idempotency_key) or derived from the event content.
+    idempotency_key: Mapped[str | None] = mapped_column(String(128), nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
         nullable=False,
+        default=recorded_now,
         server_default=func.now(),
     )
 
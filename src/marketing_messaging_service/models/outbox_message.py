@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlalchemy import ForeignKey
+from sqlalchemy import Index
+from sqlalchemy import Integer
+from sqlalchemy import String
+from sqlalchemy import Text
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import relationship
+
+from src.marketing_messaging_service.infrastructure.database import Base
+from src.marketing_messaging_service.infrastructure.database import BulkInsertMixin
+
+
+class OutboxMessage(BulkInsertMixin, Base):
+    """Provider call waiting to be dispatched, written in the same transaction as its SendRequest."""
+
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        # Serves the dispatcher's "due pending messages" scan.
+        Index("ix_outbox_messages_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    send_request_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("send_requests.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+
+    send_request = relationship("SendRequest")
+
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    template_name: Mapped[str] = mapped_column(String(64), nullable=False)
+    channel: Mapped[str] = mapped_column(String(32), nullable=False)
+    reason: Mapped[str] = mapped_column(Text, nullable=False)
+
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")  # pending | sent | failed
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Earliest time the dispatcher may (re)try; also used as a lease while a worker holds the row.
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -1,19 +1,35 @@
 from datetime import datetime
 
+from sqlalchemy import Boolean
 from sqlalchemy import DateTime
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import String
 from sqlalchemy import Text
 from sqlalchemy import func
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import relationship
 
 from src.marketing_messaging_service.infrastructure.database import Base
+from src.marketing_messaging_service.infrastructure.database import BulkInsertMixin
+from src.marketing_messaging_service.infrastructure.database import recorded_now
 
 
-class SendRequest(Base):
+class SendRequest(BulkInsertMixin, Base):
     __tablename__ = "send_requests"
+    __table_args__ = (
+        # Serves once_ever / once_per_calendar_day suppression lookups.
+        Index(
+            "ix_send_requests_user_id_template_name_event_timestamp",
+            "user_id",
+            "template_name",
+            "event_timestamp",
+        ),
+        # Serves the timeline: newest first, id breaks decided_at ties.
+        Index("ix_send_requests_user_id_decided_at_id", "user_id", "decided_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -26,6 +42,8 @@ class SendRequest(Base):
         nullable=True,
     )
 
+    event = relationship("Event")
+
     # Timestamp of the event that led to this send decision.
     # Nullable for backward compatibility / ad-hoc inserts in tests.
     event_timestamp: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
@@ -35,8 +53,12 @@ class SendRequest(Base):
 
     reason: Mapped[str] = mapped_column(Text, nullable=False)
 
+    # Provider result: None while the message is still queued in the outbox.
+    send_message_success: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+
     decided_at: Mapped[datetime] = mapped_column(
         DateTime,
         nullable=False,
+        default=recorded_now,
         server_default=func.now(),
     )
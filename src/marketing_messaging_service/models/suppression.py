@@ -2,18 +2,26 @@ from datetime import datetime
 
 from sqlalchemy import DateTime
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import String
 from sqlalchemy import Text
 from sqlalchemy import func
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import relationship
 
 from src.marketing_messaging_service.infrastructure.database import Base
+from src.marketing_messaging_service.infrastructure.database import BulkInsertMixin
+from src.marketing_messaging_service.infrastructure.database import recorded_now
 
 
-class Suppression(Base):
+class Suppression(BulkInsertMixin, Base):
     __tablename__ = "suppressions"
+    __table_args__ = (
+        # Serves the timeline: newest first, id breaks decided_at ties.
+        Index("ix_suppressions_user_id_decided_at_id", "user_id", "decided_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -26,11 +34,14 @@ class Suppression(Base):
         nullable=True,
     )
 
+    event = relationship("Event")
+
     template_name: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
     suppression_reason: Mapped[str] = mapped_column(Text, nullable=False)
 
     decided_at: Mapped[datetime] = mapped_column(
         DateTime,
         nullable=False,
+        default=recorded_now,
         server_default=func.now(),
     )
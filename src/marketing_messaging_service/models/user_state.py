@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from src.marketing_messaging_service.infrastructure.database import Base
+
+
+class UserState(Base):
+    """
+    Latest event timestamp per (user, event_type) and latest send per (user, template_name),
+    maintained in the ingest transaction. Derived from events / send_requests; see
+    commands/rebuild_user_state.
+    """
+
+    __tablename__ = "user_state"
+
+    # The primary key also serves "all state of one user" as a prefix range scan.
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)  # event | send
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)  # event_type | template_name
+
+    # Latest event_timestamp. For a send, NULL means only sends without an event_timestamp exist.
+    last_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
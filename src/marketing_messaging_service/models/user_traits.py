@@ -7,9 +7,10 @@ from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
 
 from src.marketing_messaging_service.infrastructure.database import Base
+from src.marketing_messaging_service.infrastructure.database import BulkInsertMixin
 
 
-class UserTraits(Base):
+class UserTraits(BulkInsertMixin, Base):
     __tablename__ = "user_traits"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -1,6 +1,10 @@
+import queue
+import threading
+import time
+from collections import deque
 from pathlib import Path
+from typing import Deque
 from typing import Dict
-from typing import List
 
 from .interfaces import IMessagingProvider
 
@@ -8,8 +12,14 @@ from .interfaces import IMessagingProvider
 class FakeMessagingProvider(IMessagingProvider):
     """
     Simple provider that:
-    - Stores sent messages in memory (for tests)
+    - Keeps the most recent sent messages in memory (for tests), bounded by `max_sent_messages`
     - Appends each message to messages.txt (for debugging / audit)
+
+    With `buffered=True` lines are handed to a background writer thread that appends them
+    in batches, flushing every `flush_max_lines` lines or `flush_interval_seconds`,
+    whichever comes first. Call `close()` to flush the remaining lines on shutdown.
+    At most `max_pending_lines` wait for the writer; `send_message` blocks while the queue
+    is full and raises RuntimeError once the writer has stopped or the provider is closed.
     """
 
     # Minimal template catalog: template_name -> message text.
@@ -23,10 +33,35 @@ class FakeMessagingProvider(IMessagingProvider):
                            "make sure your account is secure.",
     }
 
-    def __init__(self, log_file: str = "messages.txt"):
-        self.sent_messages: List[Dict[str, str]] = []
+    def __init__(
+        self,
+        log_file: str = "messages.txt",
+        buffered: bool = False,
+        flush_max_lines: int = 500,
+        flush_interval_seconds: float = 0.5,
+        max_pending_lines: int = 10_000,
+        max_sent_messages: int | None = 1000,
+        echo: bool = False,
+    ):
+        # max_sent_messages=None keeps every message, 0 keeps none.
+        self.sent_messages: Deque[Dict[str, str]] = deque(maxlen=max_sent_messages)
         self.log_path = Path(log_file)
         self.log_path.touch(exist_ok=True)
+        self.echo = echo
+
+        self.buffered = buffered
+        self.flush_max_lines = flush_max_lines
+        self.flush_interval_seconds = flush_interval_seconds
+        self._lines: queue.Queue[str | None] = queue.Queue(maxsize=max_pending_lines)
+        self._writer: threading.Thread | None = None
+        self._writer_error: BaseException | None = None
+        # Orders every send before or after close(), so no line lands behind the writer's stop marker.
+        self._lock = threading.Lock()
+        self._closed = False
+
+        if buffered:
+            self._writer = threading.Thread(target=self._write_loop, name="fake-provider-writer", daemon=True)
+            self._writer.start()
 
     def _render_text(self, template_name: str) -> str:
         return self._TEMPLATE_TEXT.get(template_name, f"[Missing template text for {template_name}]")
@@ -42,14 +77,93 @@ class FakeMessagingProvider(IMessagingProvider):
             "text": message_text,
         }
 
-        self.sent_messages.append(record)
-
         # Persist to file
         line = (
             f"user_id={user_id} | template={template_name} | channel={channel} "
             f"| text={message_text} | reason={reason}\n"
         )
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"messaging provider is closed, {template_name} for {user_id} not sent")
+            if self._writer is not None:
+                self._enqueue(line)
+            else:
+                with self.log_path.open("a", encoding="utf-8") as f:
+                    f.write(line)
+
+        self.sent_messages.append(record)
+
+        if self.echo:
+            print(f"[FAKE_PROVIDER] Sent message: {record} (logged to {self.log_path})")
+
+    def close(self) -> None:
+        """Flush buffered lines and stop the writer thread; later sends raise RuntimeError."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._writer is None:
+                return
+
+            try:
+                self._enqueue(None)
+            except RuntimeError:
+                pass  # the writer already stopped; sends that reached it got its error
+            self._writer.join()
+            self._writer = None
+
+    def _enqueue(self, line: str | None) -> None:
+        # Waits while the writer catches up, but never on a writer that is gone.
+        while True:
+            if not self._writer.is_alive():
+                raise RuntimeError(f"message log writer stopped: {self._writer_error!r}")
+            try:
+                self._lines.put(line, timeout=self.flush_interval_seconds)
+                return
+            except queue.Full:
+                continue
+
+    def _write_loop(self) -> None:
+        try:
+            self._write_lines()
+        except BaseException as exc:
+            self._writer_error = exc
+            raise
+
+    def _write_lines(self) -> None:
         with self.log_path.open("a", encoding="utf-8") as f:
-            f.write(line)
+            while True:
+                line = self._lines.get()
+                if line is None:
+                    return
+
+                batch = [line]
+                stopping = False
+                deadline = time.monotonic() + self.flush_interval_seconds
+                while len(batch) < self.flush_max_lines:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        line = self._lines.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if line is None:
+                        stopping = True
+                        break
+                    batch.append(line)
+
+                f.writelines(batch)
+                f.flush()
+                if stopping:
+                    return
 
-        print(f"[FAKE_PROVIDER] Sent message: {record} (logged to {self.log_path})")
+
+class NullMessagingProvider(IMessagingProvider):
+    """Drops every message; for backfills of events whose messages were already sent."""
+
+    def __init__(self):
+        self.dropped = 0
+
+    def send_message(self, user_id: str, template_name: str, channel: str, reason: str) -> None:
+        self.dropped += 1
@@ -6,3 +6,7 @@ class IMessagingProvider(ABC):
     @abstractmethod
     def send_message(self, user_id: str, template_name: str, channel: str, reason: str) -> None:
         pass
+
+    def close(self) -> None:
+        """Release resources and flush anything still buffered (called on app shutdown)."""
+        pass
@@ -1,9 +1,13 @@
 from src.marketing_messaging_service.repositories.event_repository import EventRepository
+from src.marketing_messaging_service.repositories.outbox_repository import OutboxRepository
 from src.marketing_messaging_service.repositories.send_request_repository import SendRequestRepository
 from src.marketing_messaging_service.repositories.suppression_repository import SuppressionRepository
+from src.marketing_messaging_service.repositories.user_state_repository import UserStateRepository
 
 __all__ = [
     "EventRepository",
+    "OutboxRepository",
     "SendRequestRepository",
     "SuppressionRepository",
+    "UserStateRepository",
 ]
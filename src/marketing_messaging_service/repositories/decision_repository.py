@@ -1,4 +1,10 @@
+from datetime import datetime
+from typing import Iterator
+
+from sqlalchemy import Select
+from sqlalchemy import func
 from sqlalchemy import select
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 
 from src.marketing_messaging_service.models.decision import Decision
@@ -8,14 +14,75 @@ from src.marketing_messaging_service.repositories.interfaces import IDecisionRep
 class DecisionRepository(IDecisionRepository):
     def add(self, db: Session, decision: Decision) -> Decision:
         db.add(decision)
-        db.flush()
-        db.refresh(decision)
         return decision
 
+    def add_all(self, db: Session, decisions: list[Decision]) -> list[Decision]:
+        db.add_all(decisions)
+        return decisions
+
     def list_by_user(self, db: Session, user_id: str) -> list[Decision]:
+        return list(db.scalars(self._by_user_stmt(user_id)).all())
+
+    def list_page_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        limit: int,
+        before: tuple[datetime, int] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[Decision]:
+        stmt = self._by_user_stmt(user_id, before, since, until).limit(limit)
+        return list(db.scalars(stmt).all())
+
+    def iter_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        before: tuple[datetime, int] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        chunk_size: int = 500,
+    ) -> Iterator[Decision]:
+        # yield_per streams rows from the cursor in chunks instead of buffering the full result.
+        stmt = self._by_user_stmt(user_id, before, since, until).execution_options(yield_per=chunk_size)
+        yield from db.scalars(stmt)
+
+    def version_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        before: tuple[datetime, int] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> tuple[int, int]:
+        """(max id, count) of the decisions `iter_by_user` would return; changes whenever they do."""
+        stmt = self._by_user_stmt(user_id, before, since, until).order_by(None)
+        stmt = stmt.with_only_columns(func.coalesce(func.max(Decision.id), 0), func.count(Decision.id))
+        max_id, count = db.execute(stmt).one()
+        return max_id, count
+
+    def list_by_event_ids(self, db: Session, event_ids: list[int]) -> list[Decision]:
+        stmt = select(Decision).where(Decision.event_id.in_(event_ids))
+        return list(db.scalars(stmt).all())
+
+    def _by_user_stmt(
+        self,
+        user_id: str,
+        before: tuple[datetime, int] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Select:
+        # Newest first on (created_at, id), served by ix_decisions_user_id_created_at_id.
         stmt = (
             select(Decision)
             .where(Decision.user_id == user_id)
-            .order_by(Decision.created_at.desc())
+            .order_by(Decision.created_at.desc(), Decision.id.desc())
         )
-        return list(db.scalars(stmt).all())
+        if before is not None:
+            stmt = stmt.where(tuple_(Decision.created_at, Decision.id) < tuple_(*before))
+        if since is not None:
+            stmt = stmt.where(Decision.created_at >= since)
+        if until is not None:
+            stmt = stmt.where(Decision.created_at < until)
+        return stmt
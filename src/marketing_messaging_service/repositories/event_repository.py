@@ -1,7 +1,10 @@
 from datetime import datetime
+from typing import Iterator
 
 from sqlalchemy import select
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
+from sqlalchemy.orm import selectinload
 
 from src.marketing_messaging_service.models.event import Event
 from src.marketing_messaging_service.repositories.interfaces import IEventRepository
@@ -10,10 +13,12 @@ from src.marketing_messaging_service.repositories.interfaces import IEventReposi
 class EventRepository(IEventRepository):
     def add(self, db: Session, event: Event) -> Event:
         db.add(event)
-        db.flush()
-        db.refresh(event)
         return event
 
+    def add_all(self, db: Session, events: list[Event]) -> list[Event]:
+        db.add_all(events)
+        return events
+
     def get_by_id(self, db: Session, event_id: int) -> Event | None:
         return (
             db.query(Event)
@@ -37,6 +42,44 @@ class EventRepository(IEventRepository):
         )
         return list(db.scalars(stmt).all())
 
+    def iter_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        chunk_size: int = 500,
+    ) -> Iterator[Event]:
+        stmt = (
+            select(Event)
+            .where(Event.user_id == user_id)
+            .order_by(Event.created_at.desc(), Event.id.desc())
+        )
+        if since is not None:
+            stmt = stmt.where(Event.created_at >= since)
+        if until is not None:
+            stmt = stmt.where(Event.created_at < until)
+        yield from db.scalars(stmt.execution_options(yield_per=chunk_size))
+
+    def list_page_all_users(
+        self, db: Session, after: tuple[str, datetime, int] | None = None, limit: int = 1000
+    ) -> list[Event]:
+        # Keyset page served by ix_events_user_id_event_timestamp_id.
+        stmt = (
+            select(Event)
+            .options(selectinload(Event.user_traits))
+            .order_by(Event.user_id, Event.event_timestamp, Event.id)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Event.user_id, Event.event_timestamp, Event.id) > tuple_(*after))
+        return list(db.scalars(stmt).all())
+
+    def list_by_idempotency_keys(self, db: Session, keys: list[tuple[str, str]]) -> list[Event]:
+        # (user_id, idempotency_key) pairs; served by ux_events_user_id_idempotency_key.
+        stmt = select(Event).where(tuple_(Event.user_id, Event.idempotency_key).in_(keys))
+        return list(db.scalars(stmt).all())
+
     def exists_by_user_and_type_in_window(
         self,
         db: Session,
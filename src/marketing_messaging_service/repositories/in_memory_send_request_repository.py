@@ -0,0 +1,53 @@
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from src.marketing_messaging_service.infrastructure.database import strip_tz
+from src.marketing_messaging_service.models.send_request import SendRequest
+from src.marketing_messaging_service.repositories.interfaces import ISendRequestRepository
+
+
+class InMemorySendRequestRepository(ISendRequestRepository):
+    """
+    Send history kept in memory only, for what-if runs (rule simulation) that must not
+    read or write send_requests. `db` is accepted for interface compatibility and unused.
+    """
+
+    def __init__(self):
+        self._sends: dict[tuple[str, str], list[datetime | None]] = defaultdict(list)
+
+    def add(self, db: Session | None, send_request: SendRequest) -> SendRequest:
+        ts = send_request.event_timestamp
+        self._sends[(send_request.user_id, send_request.template_name)].append(
+            strip_tz(ts) if ts is not None else None
+        )
+        return send_request
+
+    def add_all(self, db: Session | None, send_requests: list[SendRequest]) -> list[SendRequest]:
+        for send_request in send_requests:
+            self.add(db, send_request)
+        return send_requests
+
+    def exists_for_user_and_template(self, db: Session | None, user_id: str, template_name: str) -> bool:
+        return bool(self._sends.get((user_id, template_name)))
+
+    def exists_for_user_and_template_in_day_so_far(
+        self,
+        db: Session | None,
+        user_id: str,
+        template_name: str,
+        provided_ts: datetime,
+    ) -> bool:
+        end = strip_tz(provided_ts)
+        start = end.replace(hour=0, minute=0, second=0, microsecond=0)
+        return any(ts is not None and start <= ts <= end for ts in self._sends.get((user_id, template_name), ()))
+
+    def get_send_summary(
+        self, db: Session | None, user_id: str, template_name: str
+    ) -> tuple[bool, datetime | None]:
+        sends = self._sends.get((user_id, template_name), ())
+        return bool(sends), max((ts for ts in sends if ts is not None), default=None)
+
+    def clear(self) -> None:
+        self._sends.clear()
@@ -1,13 +1,19 @@
 from abc import ABC
 from abc import abstractmethod
 from datetime import datetime
+from typing import Iterator
 
 from sqlalchemy.orm import Session
 
 from src.marketing_messaging_service.models import Decision
 from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.outbox_message import OutboxMessage
 from src.marketing_messaging_service.models.send_request import SendRequest
 from src.marketing_messaging_service.models.suppression import Suppression
+from src.marketing_messaging_service.models.user_state import UserState
+
+# `add` / `add_all` only stage rows in the session. The caller flushes once per unit of
+# work, and ids plus server defaults come back through INSERT ... RETURNING.
 
 
 class IEventRepository(ABC):
@@ -15,6 +21,9 @@ class IEventRepository(ABC):
     def add(self, db: Session, event: Event) -> Event:
         raise NotImplementedError
 
+    def add_all(self, db: Session, events: list[Event]) -> list[Event]:
+        raise NotImplementedError
+
     @abstractmethod
     def get_by_id(self, db: Session, event_id: int) -> Event | None:
         raise NotImplementedError
@@ -29,6 +38,29 @@ class IEventRepository(ABC):
     def list_by_user(self, db: Session, user_id: str) -> list[Event]:
         raise NotImplementedError
 
+    def iter_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        chunk_size: int = 500,
+    ) -> Iterator[Event]:
+        """Newest first by recorded time, id breaking ties, streamed in chunks of `chunk_size`."""
+        raise NotImplementedError
+
+    def list_page_all_users(
+        self, db: Session, after: tuple[str, datetime, int] | None = None, limit: int = 1000
+    ) -> list[Event]:
+        """
+        Events with their user_traits, grouped by user_id and oldest event_timestamp first per user:
+        the `limit` that follow the (user_id, event_timestamp, id) key `after`.
+        """
+        raise NotImplementedError
+
+    def list_by_idempotency_keys(self, db: Session, keys: list[tuple[str, str]]) -> list[Event]:
+        raise NotImplementedError
+
     @abstractmethod
     def exists_by_user_and_type_in_window(
         self,
@@ -46,6 +78,9 @@ class ISendRequestRepository(ABC):
     def add(self, db: Session, send_request: SendRequest) -> SendRequest:
         raise NotImplementedError
 
+    def add_all(self, db: Session, send_requests: list[SendRequest]) -> list[SendRequest]:
+        raise NotImplementedError
+
     def exists_for_user_and_template(self, db, user_id: str, template_name: str) -> bool:
         raise NotImplementedError
 
@@ -67,20 +102,134 @@ class ISendRequestRepository(ABC):
         """
         raise NotImplementedError
 
+    def get_send_summary(self, db: Session, user_id: str, template_name: str) -> tuple[bool, datetime | None]:
+        """
+        Returns (any send exists, latest non-null event_timestamp)
+        for the user and template.
+        """
+        raise NotImplementedError
+
     def list_by_user(self, db: Session, user_id: str) -> list[SendRequest]:
         raise NotImplementedError
 
+    def iter_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        chunk_size: int = 500,
+    ) -> Iterator[SendRequest]:
+        raise NotImplementedError
+
 
 class ISuppressionRepository(ABC):
     @abstractmethod
     def add(self, db: Session, suppression: Suppression) -> Suppression:
         raise NotImplementedError
 
+    def add_all(self, db: Session, suppressions: list[Suppression]) -> list[Suppression]:
+        raise NotImplementedError
+
+    def list_by_user(self, db: Session, user_id: str) -> list[Suppression]:
+        raise NotImplementedError
+
+    def iter_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        chunk_size: int = 500,
+    ) -> Iterator[Suppression]:
+        raise NotImplementedError
+
 
 class IDecisionRepository(ABC):
     @abstractmethod
     def add(self, db: Session, event: Decision) -> Decision:
         raise NotImplementedError
 
+    def add_all(self, db: Session, decisions: list[Decision]) -> list[Decision]:
+        raise NotImplementedError
+
     def list_by_user(self, db: Session, user_id: str) -> list[Decision]:
         raise NotImplementedError
+
+    def list_page_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        limit: int,
+        before: tuple[datetime, int] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[Decision]:
+        raise NotImplementedError
+
+    def iter_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        before: tuple[datetime, int] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        chunk_size: int = 500,
+    ) -> Iterator[Decision]:
+        raise NotImplementedError
+
+    def version_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        before: tuple[datetime, int] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> tuple[int, int]:
+        raise NotImplementedError
+
+    def list_by_event_ids(self, db: Session, event_ids: list[int]) -> list[Decision]:
+        raise NotImplementedError
+
+
+class IOutboxRepository(ABC):
+    @abstractmethod
+    def add_all(self, db: Session, messages: list[OutboxMessage]) -> list[OutboxMessage]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim_due(self, db: Session, now: datetime, lease_until: datetime, limit: int) -> list[OutboxMessage]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_sent(self, db: Session, message_id: int, send_request_id: int, sent_at: datetime) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_attempt_failed(
+        self,
+        db: Session,
+        message_id: int,
+        send_request_id: int,
+        error: str,
+        retry_at: datetime | None,
+    ) -> None:
+        raise NotImplementedError
+
+    def count_by_status(self, db: Session) -> dict[str, int]:
+        raise NotImplementedError
+
+
+class IUserStateRepository(ABC):
+    @abstractmethod
+    def list_by_user(self, db: Session, user_id: str) -> list[UserState]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert_latest(self, db: Session, kind: str, latest: dict[tuple[str, str], datetime | None]) -> None:
+        """Raise user_state.last_at of each (user_id, name) of `kind` to at least the given timestamp."""
+        raise NotImplementedError
+
+    def rebuild(self, db: Session) -> dict[str, int]:
+        """Replace every row with the latest timestamps found in events / send_requests; rows written per kind."""
+        raise NotImplementedError
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from src.marketing_messaging_service.models.outbox_message import OutboxMessage
+from src.marketing_messaging_service.models.send_request import SendRequest
+from src.marketing_messaging_service.repositories.interfaces import IOutboxRepository
+
+
+class OutboxRepository(IOutboxRepository):
+    def add_all(self, db: Session, messages: list[OutboxMessage]) -> list[OutboxMessage]:
+        db.add_all(messages)
+        return messages
+
+    def claim_due(self, db: Session, now: datetime, lease_until: datetime, limit: int) -> list[OutboxMessage]:
+        # Pushing next_attempt_at forward acts as a lease: if the worker dies,
+        # the row becomes due again once the lease expires.
+        due_ids = (
+            select(OutboxMessage.id)
+            .where(OutboxMessage.status == "pending", OutboxMessage.next_attempt_at <= now)
+            .order_by(OutboxMessage.next_attempt_at, OutboxMessage.id)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(OutboxMessage)
+            .where(
+                OutboxMessage.id.in_(due_ids),
+                OutboxMessage.status == "pending",
+                OutboxMessage.next_attempt_at <= now,
+            )
+            .values(next_attempt_at=lease_until)
+            .returning(OutboxMessage)
+        )
+        return list(db.scalars(stmt.execution_options(synchronize_session=False)).all())
+
+    def mark_sent(self, db: Session, message_id: int, send_request_id: int, sent_at: datetime) -> None:
+        db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == message_id)
+            .values(status="sent", attempts=OutboxMessage.attempts + 1, sent_at=sent_at, last_error=None)
+        )
+        db.execute(
+            update(SendRequest)
+            .where(SendRequest.id == send_request_id)
+            .values(send_message_success=True)
+        )
+
+    def mark_attempt_failed(
+        self,
+        db: Session,
+        message_id: int,
+        send_request_id: int,
+        error: str,
+        retry_at: datetime | None,
+    ) -> None:
+        """Record a failed attempt; `retry_at=None` means retries are exhausted."""
+        values = {"attempts": OutboxMessage.attempts + 1, "last_error": error}
+        if retry_at is None:
+            values["status"] = "failed"
+        else:
+            values["next_attempt_at"] = retry_at
+
+        db.execute(update(OutboxMessage).where(OutboxMessage.id == message_id).values(**values))
+
+        if retry_at is None:
+            db.execute(
+                update(SendRequest)
+                .where(SendRequest.id == send_request_id)
+                .values(send_message_success=False)
+            )
+
+    def count_by_status(self, db: Session) -> dict[str, int]:
+        stmt = select(OutboxMessage.status, func.count(OutboxMessage.id)).group_by(OutboxMessage.status)
+        return {status: count for status, count in db.execute(stmt).all()}
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from sqlalchemy import Table
+from sqlalchemy import and_
+from sqlalchemy import delete
+from sqlalchemy import exists
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import aliased
+
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.outbox_message import OutboxMessage
+from src.marketing_messaging_service.models.send_request import SendRequest
+
+
+class RetentionRepository:
+    """Bulk reads and deletes for archiving old rows; ids are always selected in chunks by primary key."""
+
+    def expired_event_ids(self, db: Session, cutoff: datetime, after_id: int, limit: int) -> list[int]:
+        # Walks the primary key, so the whole run reads the table once without an extra index.
+        stmt = (
+            select(Event.id)
+            .where(Event.id > after_id, Event.event_timestamp < cutoff, Event.created_at < cutoff)
+            .order_by(Event.id)
+            .limit(limit)
+        )
+        return list(db.scalars(stmt).all())
+
+    def expired_send_ids(self, db: Session, cutoff: datetime, after_id: int, limit: int) -> tuple[list[int], int]:
+        """
+        Ids of sends older than `cutoff` that are not the latest send of their (user, template),
+        have no undelivered outbox message, and the last id looked at (to continue after).
+        """
+        later = aliased(SendRequest)
+        has_later_send = exists().where(
+            later.user_id == SendRequest.user_id,
+            later.template_name == SendRequest.template_name,
+            or_(
+                later.event_timestamp > SendRequest.event_timestamp,
+                and_(later.event_timestamp == SendRequest.event_timestamp, later.id > SendRequest.id),
+                and_(
+                    SendRequest.event_timestamp.is_(None),
+                    or_(later.event_timestamp.is_not(None), later.id > SendRequest.id),
+                ),
+            ),
+        )
+        undelivered = exists().where(
+            OutboxMessage.send_request_id == SendRequest.id,
+            OutboxMessage.status == "pending",
+        )
+
+        scanned = list(
+            db.scalars(select(SendRequest.id).where(SendRequest.id > after_id).order_by(SendRequest.id).limit(limit))
+        )
+        if not scanned:
+            return [], after_id
+
+        stmt = (
+            select(SendRequest.id)
+            .where(
+                SendRequest.id.between(scanned[0], scanned[-1]),
+                SendRequest.decided_at < cutoff,
+                or_(SendRequest.event_timestamp.is_(None), SendRequest.event_timestamp < cutoff),
+                has_later_send,
+                ~undelivered,
+            )
+            .order_by(SendRequest.id)
+        )
+        return list(db.scalars(stmt).all()), scanned[-1]
+
+    def fetch_rows(self, db: Session, table: Table, column: str, values: list[int]) -> list[dict]:
+        stmt = select(table).where(table.c[column].in_(values)).order_by(table.c[table.primary_key.columns.keys()[0]])
+        return [dict(row) for row in db.execute(stmt).mappings()]
+
+    def delete_rows(self, db: Session, table: Table, column: str, values: list[int]) -> int:
+        return db.execute(delete(table).where(table.c[column].in_(values))).rowcount
+
+    def detach_sends(self, db: Session, event_ids: list[int]) -> int:
+        # Kept sends outlive their event, like send_requests.event_id ON DELETE SET NULL.
+        stmt = update(SendRequest).where(SendRequest.event_id.in_(event_ids)).values(event_id=None)
+        return db.execute(stmt).rowcount
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Iterator
 
 from sqlalchemy import func
 from sqlalchemy import select
@@ -11,20 +12,23 @@ from src.marketing_messaging_service.repositories.interfaces import ISendRequest
 class SendRequestRepository(ISendRequestRepository):
     def add(self, db: Session, send_request: SendRequest) -> SendRequest:
         db.add(send_request)
-        db.flush()
-        db.refresh(send_request)
         return send_request
 
+    def add_all(self, db: Session, send_requests: list[SendRequest]) -> list[SendRequest]:
+        db.add_all(send_requests)
+        return send_requests
+
     def exists_for_user_and_template(self, db: Session, user_id: str, template_name: str) -> bool:
-        return (
-            db.query(SendRequest)
-            .filter(
+        # Selecting only the id keeps this an index-only lookup.
+        stmt = (
+            select(SendRequest.id)
+            .where(
                 SendRequest.user_id == user_id,
                 SendRequest.template_name == template_name,
             )
-            .first()
-            is not None
+            .limit(1)
         )
+        return db.execute(stmt).first() is not None
 
     def exists_for_user_and_template_on_date(self, db: Session, user_id: str, template_name: str, date) -> bool:
         ts_col = func.coalesce(SendRequest.event_timestamp, SendRequest.decided_at)
@@ -63,6 +67,14 @@ class SendRequestRepository(ISendRequestRepository):
         )
         return db.execute(stmt).first() is not None
 
+    def get_send_summary(self, db: Session, user_id: str, template_name: str) -> tuple[bool, datetime | None]:
+        stmt = select(func.count(SendRequest.id), func.max(SendRequest.event_timestamp)).where(
+            SendRequest.user_id == user_id,
+            SendRequest.template_name == template_name,
+        )
+        count, last_sent_at = db.execute(stmt).one()
+        return count > 0, last_sent_at
+
     def list_by_user(self, db: Session, user_id: str) -> list[SendRequest]:
         stmt = (
             select(SendRequest)
@@ -70,3 +82,22 @@ class SendRequestRepository(ISendRequestRepository):
             .order_by(SendRequest.decided_at.desc())
         )
         return list(db.scalars(stmt).all())
+
+    def iter_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        chunk_size: int = 500,
+    ) -> Iterator[SendRequest]:
+        stmt = (
+            select(SendRequest)
+            .where(SendRequest.user_id == user_id)
+            .order_by(SendRequest.decided_at.desc(), SendRequest.id.desc())
+        )
+        if since is not None:
+            stmt = stmt.where(SendRequest.decided_at >= since)
+        if until is not None:
+            stmt = stmt.where(SendRequest.decided_at < until)
+        yield from db.scalars(stmt.execution_options(yield_per=chunk_size))
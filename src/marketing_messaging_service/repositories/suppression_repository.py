@@ -1,3 +1,6 @@
+from datetime import datetime
+from typing import Iterator
+
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -8,10 +11,12 @@ from src.marketing_messaging_service.repositories.interfaces import ISuppression
 class SuppressionRepository(ISuppressionRepository):
     def add(self, db: Session, suppression: Suppression) -> Suppression:
         db.add(suppression)
-        db.flush()
-        db.refresh(suppression)
         return suppression
 
+    def add_all(self, db: Session, suppressions: list[Suppression]) -> list[Suppression]:
+        db.add_all(suppressions)
+        return suppressions
+
     def list_by_user(self, db: Session, user_id: str) -> list[Suppression]:
         stmt = (
             select(Suppression)
@@ -19,3 +24,22 @@ class SuppressionRepository(ISuppressionRepository):
             .order_by(Suppression.decided_at.desc())
         )
         return list(db.scalars(stmt).all())
+
+    def iter_by_user(
+        self,
+        db: Session,
+        user_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        chunk_size: int = 500,
+    ) -> Iterator[Suppression]:
+        stmt = (
+            select(Suppression)
+            .where(Suppression.user_id == user_id)
+            .order_by(Suppression.decided_at.desc(), Suppression.id.desc())
+        )
+        if since is not None:
+            stmt = stmt.where(Suppression.decided_at >= since)
+        if until is not None:
+            stmt = stmt.where(Suppression.decided_at < until)
+        yield from db.scalars(stmt.execution_options(yield_per=chunk_size))
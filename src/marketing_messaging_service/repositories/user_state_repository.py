@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from sqlalchemy import case
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import insert
+from sqlalchemy import literal
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session
+
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.send_request import SendRequest
+from src.marketing_messaging_service.models.user_state import UserState
+from src.marketing_messaging_service.repositories.interfaces import IUserStateRepository
+
+
+class UserStateRepository(IUserStateRepository):
+    def list_by_user(self, db: Session, user_id: str) -> list[UserState]:
+        # Prefix of the primary key: one index range, no history scan.
+        return list(db.scalars(select(UserState).where(UserState.user_id == user_id)).all())
+
+    def upsert_latest(self, db: Session, kind: str, latest: dict[tuple[str, str], datetime | None]) -> None:
+        if not latest:
+            return
+
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(UserState).values(
+            [
+                {"user_id": user_id, "kind": kind, "name": name, "last_at": last_at}
+                for (user_id, name), last_at in latest.items()
+            ]
+        )
+        # Keep the later timestamp; a NULL never replaces a known one.
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserState.user_id, UserState.kind, UserState.name],
+            set_={
+                "last_at": case(
+                    (UserState.last_at.is_(None), stmt.excluded.last_at),
+                    (stmt.excluded.last_at > UserState.last_at, stmt.excluded.last_at),
+                    else_=UserState.last_at,
+                )
+            },
+        )
+        db.execute(stmt)
+
+    def rebuild(self, db: Session) -> dict[str, int]:
+        db.execute(delete(UserState))
+        events = db.execute(
+            insert(UserState).from_select(
+                ["user_id", "kind", "name", "last_at"],
+                select(Event.user_id, literal("event"), Event.event_type, func.max(Event.event_timestamp))
+                .group_by(Event.user_id, Event.event_type),
+            )
+        )
+        sends = db.execute(
+            insert(UserState).from_select(
+                ["user_id", "kind", "name", "last_at"],
+                select(
+                    SendRequest.user_id,
+                    literal("send"),
+                    SendRequest.template_name,
+                    func.max(SendRequest.event_timestamp),
+                ).group_by(SendRequest.user_id, SendRequest.template_name),
+            )
+        )
+        return {"event": events.rowcount, "send": sends.rowcount}
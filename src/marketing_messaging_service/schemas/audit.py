@@ -5,7 +5,7 @@ from pydantic import BaseModel
 
 class AuditLogItem(BaseModel):
     timestamp: datetime
-    kind: str  # "decision"
+    kind: str  # "decision"; the timeline also has "event", "send" and "suppression"
 
     event_id: int | None = None
     user_id: str | None = None
@@ -19,8 +19,15 @@ class AuditLogItem(BaseModel):
 
     template_name: str | None = None
     channel: str | None = None
+    ruleset_version: str | None = None
+
+    event_timestamp: datetime | None = None
+    send_message_success: bool | None = None
 
 
 class AuditLog(BaseModel):
     user_id: str
     items: list[AuditLogItem]
+
+    # Pass as `before` to fetch the next (older) page; None on the last page.
+    next_cursor: str | None = None
@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from pydantic import BaseModel
+from pydantic import Field
 
 
 class UserTraitsIn(BaseModel):
@@ -16,6 +17,8 @@ class EventIn(BaseModel):
     event_timestamp: datetime
     properties: dict | None = None
     user_traits: UserTraitsIn | None = None
+    # Retries of the same event carry the same key; a known key returns the original result.
+    idempotency_key: str | None = Field(default=None, min_length=1, max_length=128)
 
 
 class EventProcessingResult(BaseModel):
@@ -32,6 +35,12 @@ class EventProcessingResult(BaseModel):
     reason: str | None = None
 
 
-# Keeping the old schema in case something else still imports it.
+# Written in place of a result by POST /events/stream for a line that was not processed.
+class EventStreamError(BaseModel):
+    line: int
+    error: str
+
+
+# Returned with 202 when PROCESSING_ACK=queued.
 class EventAccepted(BaseModel):
     status: str
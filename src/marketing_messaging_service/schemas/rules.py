@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+
+
+class RulesetInfo(BaseModel):
+    version: str  # short content hash, stamped on every Decision
+    rule_count: int
+    rules_path: str
+
+
+class ConditionStatsInfo(BaseModel):
+    index: int  # position in the rule's YAML conditions
+    condition: str
+    cost_class: int  # 0 invalid, 1 field, 2 prior_event; lower classes are checked first
+    check_order: int  # position in the current check order
+    evaluated: int
+    rejected: int
+    rejection_rate: float  # smoothed: (rejected + 1) / (evaluated + 2)
+
+
+class RuleStatsInfo(BaseModel):
+    rule: str
+    event_type: str
+    adaptive: bool  # false: at most one condition per cost class, the order is fixed and not sampled
+    sampled_checks: int  # one check in 16 is counted
+    conditions: list[ConditionStatsInfo]
+
+
+class RulesetStatsInfo(BaseModel):
+    version: str
+    rules: list[RuleStatsInfo]
@@ -0,0 +1,167 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Callable
+from typing import Hashable
+from typing import Iterable
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+_INVALIDATE_KEY = "audit_cache_users_to_invalidate"
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    etag: str
+    body: bytes
+    expires_at: float
+
+
+@dataclass(slots=True)
+class _UserEntry:
+    generation: int = 0
+    responses: OrderedDict[Hashable, CachedResponse] = field(default_factory=OrderedDict)
+
+
+def etag_for(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def version_etag(user_id: str, variant: Hashable, version: tuple[int, int]) -> str:
+    """ETag for a streamed response, known before its body is: names the database state it is read from."""
+    token = f"{user_id}:{version}:{variant!r}".encode()
+    return f'"v-{hashlib.blake2b(token, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class AuditCache:
+    """
+    Bounded, per-process cache of serialized audit responses, keyed by user_id.
+
+    Each user holds a few responses keyed by query variant (limit, cursor, time range).
+    A user's responses are dropped when a transaction that wrote decisions for them
+    commits. Every invalidation moves the user's generation to a new value of one
+    cache-wide counter, and `put` only stores a response read under the current
+    generation, so a read racing a commit cannot cache stale data. A user without an
+    entry is at the highest generation evicted so far, so an eviction never moves a
+    generation back to a value an in-flight read may hold.
+    """
+
+    def __init__(
+        self,
+        max_users: int = 10_000,
+        ttl_seconds: float = 30.0,
+        max_body_bytes: int = 1_048_576,
+        max_variants_per_user: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.max_body_bytes = max_body_bytes
+        self.max_variants_per_user = max_variants_per_user
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[str, _UserEntry] = OrderedDict()
+        self._counter = 0
+        self._evicted_generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, variant: Hashable) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            cached = entry.responses.get(variant) if entry is not None else None
+            if cached is None or cached.expires_at <= self.clock():
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return cached
+
+    def generation(self, user_id: str) -> int:
+        """Token to pass to `put`; read it before querying the database."""
+        with self._lock:
+            return self._generation(user_id)
+
+    def put(self, user_id: str, variant: Hashable, generation: int, etag: str, body: bytes) -> bool:
+        if len(body) > self.max_body_bytes:
+            return False
+
+        with self._lock:
+            if self._generation(user_id) != generation:
+                return False
+
+            entry = self._entries.get(user_id)
+            if entry is None:
+                entry = self._entries[user_id] = _UserEntry(generation=generation)
+            entry.responses[variant] = CachedResponse(etag, body, self.clock() + self.ttl_seconds)
+            entry.responses.move_to_end(variant)
+            while len(entry.responses) > self.max_variants_per_user:
+                entry.responses.popitem(last=False)
+
+            self._touch(user_id)
+            return True
+
+    def invalidate(self, user_ids: Iterable[str]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                entry = self._entries.get(user_id)
+                if entry is None:
+                    # Kept as an empty entry so an in-flight read started before this cannot store.
+                    entry = self._entries[user_id] = _UserEntry()
+                self._counter += 1
+                entry.generation = self._counter
+                entry.responses.clear()
+                self._touch(user_id)
+
+    def invalidate_on_commit(self, db: Session, user_ids: Iterable[str]) -> None:
+        """Invalidate `user_ids` once `db` commits; nothing happens on rollback."""
+        db.info.setdefault(_INVALIDATE_KEY, []).append((self, set(user_ids)))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "users": len(self._entries),
+                "max_users": self.max_users,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counter += 1
+            self._evicted_generation = self._counter
+            self._entries.clear()
+
+    def _generation(self, user_id: str) -> int:
+        entry = self._entries.get(user_id)
+        return entry.generation if entry is not None else self._evicted_generation
+
+    def _touch(self, user_id: str) -> None:
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            _, evicted = self._entries.popitem(last=False)
+            self._evicted_generation = max(self._evicted_generation, evicted.generation)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    for cache, user_ids in session.info.pop(_INVALIDATE_KEY, ()):
+        cache.invalidate(user_ids)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_INVALIDATE_KEY, None)
@@ -1,34 +1,124 @@
+import base64
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Callable
+from typing import Iterator
+
 from sqlalchemy.orm import Session
 
+from src.marketing_messaging_service.infrastructure.database import create_session
+from src.marketing_messaging_service.infrastructure.database import to_naive_utc
+from src.marketing_messaging_service.models.decision import Decision
 from src.marketing_messaging_service.repositories.decision_repository import DecisionRepository
 from src.marketing_messaging_service.schemas.audit import AuditLog
 from src.marketing_messaging_service.schemas.audit import AuditLogItem
 
+AuditCursor = tuple[datetime, int]  # (created_at, id) of the last item already returned
+
+
+def encode_cursor(cursor: AuditCursor) -> str:
+    created_at, decision_id = cursor
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{decision_id}".encode()).decode()
+
+
+def decode_cursor(value: str) -> AuditCursor:
+    """Raises ValueError for anything that was not produced by `encode_cursor`."""
+    try:
+        created_at, decision_id = base64.urlsafe_b64decode(value.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(decision_id)
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"Invalid audit cursor: {value!r}") from exc
+
+
+def decision_item(d: Decision) -> AuditLogItem:
+    return AuditLogItem(
+        timestamp=d.created_at,
+        kind="decision",
+        event_id=d.event_id,
+        user_id=d.user_id,
+        event_type=d.event_type,
+        matched_rule=d.matched_rule,
+        action_type=d.action_type,
+        outcome=d.outcome,
+        reason=d.reason,
+        template_name=d.template_name,
+        channel=d.channel,
+        ruleset_version=d.ruleset_version,
+    )
+
 
 class AuditService:
-    def __init__(self, decision_repository: DecisionRepository):
+    def __init__(
+        self,
+        decision_repository: DecisionRepository,
+        session_factory: Callable[[], AbstractContextManager[Session]] = create_session,
+        export_chunk_size: int = 500,
+    ):
         self.decision_repository = decision_repository
+        self.session_factory = session_factory
+        self.export_chunk_size = export_chunk_size
+
+    def get_audit_log(
+        self,
+        db: Session,
+        user_id: str,
+        limit: int | None = None,
+        before: AuditCursor | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> AuditLog:
+        """
+        Decisions for `user_id`, newest first. With `limit`, returns one keyset page
+        and a `next_cursor` for the following one; without it, the full history.
+        """
+        since, until = to_naive_utc(since), to_naive_utc(until)
 
-    def get_audit_log(self, db: Session, user_id: str) -> AuditLog:
-        decisions = self.decision_repository.list_by_user(db, user_id)
-
-        items: list[AuditLogItem] = []
-        for d in decisions:
-            items.append(
-                AuditLogItem(
-                    timestamp=d.created_at,
-                    kind="decision",
-                    event_id=d.event_id,
-                    user_id=d.user_id,
-                    event_type=d.event_type,
-                    matched_rule=d.matched_rule,
-                    action_type=d.action_type,
-                    outcome=d.outcome,
-                    reason=d.reason,
-                    template_name=d.template_name,
-                    channel=d.channel,
-                )
+        if limit is None:
+            decisions = self.decision_repository.iter_by_user(
+                db, user_id, before=before, since=since, until=until, chunk_size=self.export_chunk_size
             )
+            return AuditLog(user_id=user_id, items=[decision_item(d) for d in decisions])
+
+        # One extra row tells whether another page exists.
+        decisions = self.decision_repository.list_page_by_user(
+            db, user_id, limit=limit + 1, before=before, since=since, until=until
+        )
+        next_cursor = None
+        if len(decisions) > limit:
+            decisions = decisions[:limit]
+            next_cursor = encode_cursor((decisions[-1].created_at, decisions[-1].id))
 
-        items.sort(key=lambda x: x.timestamp, reverse=True)
-        return AuditLog(user_id=user_id, items=items)
+        return AuditLog(user_id=user_id, items=[decision_item(d) for d in decisions], next_cursor=next_cursor)
+
+    def get_log_version(
+        self,
+        db: Session,
+        user_id: str,
+        before: AuditCursor | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> tuple[int, int]:
+        """Identifies the full history `iter_audit_items` streams, as stored in the database."""
+        return self.decision_repository.version_by_user(
+            db, user_id, before=before, since=to_naive_utc(since), until=to_naive_utc(until)
+        )
+
+    def iter_audit_items(
+        self,
+        user_id: str,
+        before: AuditCursor | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Iterator[AuditLogItem]:
+        """Stream the full history from a server-side cursor in a session owned by the generator."""
+        with self.session_factory() as db:
+            decisions = self.decision_repository.iter_by_user(
+                db,
+                user_id,
+                before=before,
+                since=to_naive_utc(since),
+                until=to_naive_utc(until),
+                chunk_size=self.export_chunk_size,
+            )
+            for d in decisions:
+                yield decision_item(d)
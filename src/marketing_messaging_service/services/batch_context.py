@@ -0,0 +1,57 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any
+
+from src.marketing_messaging_service.infrastructure.database import strip_tz
+from src.marketing_messaging_service.models.event import Event
+
+
+class BatchContext:
+    """
+    In-memory view of the events and sends produced by the current batch
+    that are not flushed to the database yet.
+
+    Rule and suppression checks consult it next to the repositories, so
+    events in a batch are evaluated exactly as if they were ingested one by one.
+    It also holds the user_state snapshots read during the batch, which cannot
+    change before the batch is flushed.
+    """
+
+    def __init__(self):
+        self._events: dict[tuple[str, str], list[datetime]] = defaultdict(list)
+        self._sends: dict[tuple[str, str], list[datetime | None]] = defaultdict(list)
+        self._user_states: dict[str, Any] = {}
+
+    def add_event(self, event: Event) -> None:
+        self._events[(event.user_id, event.event_type)].append(strip_tz(event.event_timestamp))
+
+    def add_send(self, user_id: str, template_name: str, event_timestamp: datetime | None) -> None:
+        ts = strip_tz(event_timestamp) if event_timestamp is not None else None
+        self._sends[(user_id, template_name)].append(ts)
+
+    def has_event_in_window(
+        self,
+        user_id: str,
+        event_type: str,
+        window_start: datetime,
+        window_end: datetime,
+    ) -> bool:
+        start, end = strip_tz(window_start), strip_tz(window_end)
+        return any(start <= ts <= end for ts in self._events.get((user_id, event_type), ()))
+
+    def has_send(self, user_id: str, template_name: str) -> bool:
+        return bool(self._sends.get((user_id, template_name)))
+
+    def has_send_in_day_so_far(self, user_id: str, template_name: str, provided_ts: datetime) -> bool:
+        end = strip_tz(provided_ts)
+        start = end.replace(hour=0, minute=0, second=0, microsecond=0)
+        return any(
+            ts is not None and start <= ts <= end
+            for ts in self._sends.get((user_id, template_name), ())
+        )
+
+    def cached_user_state(self, user_id: str) -> Any:
+        return self._user_states.get(user_id)
+
+    def cache_user_state(self, user_id: str, snapshot: Any) -> None:
+        self._user_states[user_id] = snapshot
@@ -1,5 +1,13 @@
+import time
+
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from src.marketing_messaging_service.infrastructure.database import call_blocking
+from src.marketing_messaging_service.infrastructure.metrics import DECISIONS
+from src.marketing_messaging_service.infrastructure.metrics import DUPLICATE_EVENTS
+from src.marketing_messaging_service.infrastructure.metrics import STAGE_SECONDS
+from src.marketing_messaging_service.infrastructure.metrics import SUPPRESSIONS
 from src.marketing_messaging_service.models import SendRequest
 from src.marketing_messaging_service.models import Suppression
 from src.marketing_messaging_service.models.decision import Decision
@@ -11,8 +19,17 @@ from src.marketing_messaging_service.repositories.interfaces import IEventReposi
 from src.marketing_messaging_service.repositories.interfaces import ISendRequestRepository
 from src.marketing_messaging_service.repositories.interfaces import ISuppressionRepository
 from src.marketing_messaging_service.schemas.event import EventIn
+from src.marketing_messaging_service.services.audit_cache import AuditCache
+from src.marketing_messaging_service.services.batch_context import BatchContext
+from src.marketing_messaging_service.services.idempotency import IdempotencyKeyConflict
+from src.marketing_messaging_service.services.idempotency import IdempotencyKeys
+from src.marketing_messaging_service.services.idempotency import IdempotencyKeyTaken
+from src.marketing_messaging_service.services.idempotency import ScopedKey
+from src.marketing_messaging_service.services.idempotency import same_event
+from src.marketing_messaging_service.services.outbox_dispatcher import OutboxDispatcher
 from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
 from src.marketing_messaging_service.services.suppression_service import SuppressionService
+from src.marketing_messaging_service.services.user_state import UserStateService
 
 
 class EventProcessingService:
@@ -25,6 +42,10 @@ class EventProcessingService:
         suppression_service: SuppressionService,
         messaging_provider: IMessagingProvider,
         decision_repository: IDecisionRepository,
+        outbox_dispatcher: OutboxDispatcher | None = None,
+        audit_cache: AuditCache | None = None,
+        idempotency_keys: IdempotencyKeys | None = None,
+        user_state_service: UserStateService | None = None,
     ):
         self.event_repository = event_repository
         self.send_request_repository = send_request_repository
@@ -33,13 +54,234 @@ class EventProcessingService:
         self.suppression_service = suppression_service
         self.decision_repository = decision_repository
         self.messaging_provider = messaging_provider
+        self.outbox_dispatcher = outbox_dispatcher
+        self.audit_cache = audit_cache
+        self.idempotency_keys = idempotency_keys
+        self.user_state_service = user_state_service
 
     def process_event(self, db: Session, payload: EventIn):
+        return self.process_batch(db, [payload])[0]
+
+    def process_batch(self, db: Session, payloads: list[EventIn]):
+        """
+        Process a list of events in one transaction.
+
+        Events are evaluated in list order against a BatchContext, so suppression
+        and prior-event checks behave as if the events were ingested one by one.
+        All rows are then written with a single flush; ids and server defaults come back through
+        one multi-row INSERT ... RETURNING per table (see BulkInsertMixin).
+
+        An event whose idempotency key was already processed for its user (earlier, or by an
+        earlier event of the same list) is not evaluated again: its result is the stored event
+        and decision of the first one. Reusing a key for a different event raises
+        IdempotencyKeyConflict. A key stored by another process after it was taken as new
+        raises IdempotencyKeyTaken: the caller's transaction is then unusable and has to be
+        rolled back and rerun, which finds the stored key (see process_own_batch).
+        """
+        if self.idempotency_keys is None:
+            return self._process_new(db, payloads, [None] * len(payloads))
+
+        keys = [self.idempotency_keys.key_for(payload) for payload in payloads]
+        if not any(keys):
+            return self._process_new(db, payloads, [None] * len(payloads))
+        try:
+            return self._process_deduplicated(db, payloads, keys)
+        except IntegrityError as exc:
+            # ux_events_user_id_idempotency_key rejected a key taken as new: it was stored by
+            # another process, or before this one started. Remembered keys are looked up on the rerun.
+            self.idempotency_keys.remember([key for key in keys if key is not None])
+            raise IdempotencyKeyTaken("An idempotency key of the batch was stored concurrently") from exc
+
+    def process_own_batch(self, db: Session, payloads: list[EventIn]):
+        """
+        process_batch for a caller whose transaction holds nothing else: after IdempotencyKeyTaken
+        the transaction is rolled back and the batch processed once more.
+        """
+        try:
+            return self.process_batch(db, payloads)
+        except IdempotencyKeyTaken:
+            db.rollback()
+            return self.process_batch(db, payloads)
+
+    def _process_deduplicated(self, db: Session, payloads: list[EventIn], keys: list[ScopedKey | None]):
+        processed = self.idempotency_keys.find_processed(db, list(dict.fromkeys(key for key in keys if key)))
+
+        new_positions: list[int] = []
+        first_positions: dict[ScopedKey, int] = {}
+        for position, key in enumerate(keys):
+            if key is None:
+                new_positions.append(position)
+                continue
+
+            if key in first_positions:
+                original = payloads[first_positions[key]]
+            elif key in processed:
+                original = processed[key][0]
+            else:
+                original = None
+            if original is not None and not same_event(original, payloads[position]):
+                raise IdempotencyKeyConflict(f"idempotency_key {key[1]!r} was already used for another event")
+
+            if original is None or (key not in first_positions and processed[key][1] is None):
+                if original is not None:
+                    # Stored without a decision (e.g. deleted by hand): processed again, and the key
+                    # moves to the new event. The flush updates the old row before inserting.
+                    original.idempotency_key = None
+                first_positions[key] = position
+                new_positions.append(position)
+
+        new_results = self._process_new(
+            db,
+            [payloads[position] for position in new_positions],
+            [keys[position] and keys[position][1] for position in new_positions],
+        )
+        results_by_position = dict(zip(new_positions, new_results))
+
+        results = []
+        for position, key in enumerate(keys):
+            result = results_by_position.get(position)
+            if result is None:
+                if key in first_positions:
+                    result = results_by_position[first_positions[key]]
+                else:
+                    result = self._stored_result(*processed[key])
+                DUPLICATE_EVENTS.inc()
+            results.append(result)
+
+        self.idempotency_keys.remember([key for key in keys if key is not None])
+        return results
+
+    def _stored_result(self, event: Event, decision: Decision):
+        # Same shape as a fresh result; the Decision row carries matched_rule, action_type and template_name.
+        channel = "internal" if decision.outcome == "alert" else decision.channel
+        return event, decision, decision.outcome, channel, decision.reason
+
+    def _process_new(self, db: Session, payloads: list[EventIn], keys: list[str | None]):
+        if not payloads:
+            return []
+
+        batch = BatchContext()
+        events = [self._build_event(payload, key) for payload, key in zip(payloads, keys)]
+
+        # Adds each event to the batch before deciding it; rule decisions do not depend on sends.
+        decisions = self.rule_evaluation_service.evaluate_batch(db=db, events=events, batch=batch)
+
+        evaluations = []
+        for event, decision in zip(events, decisions):
+            started = time.perf_counter()
+            outcome, suppression_reason = self.suppression_service.evaluate(
+                db=db,
+                event=event,
+                decision=decision,
+                batch=batch,
+            )
+            STAGE_SECONDS.observe(time.perf_counter() - started, "suppression")
+            if outcome in ("allow", "alert"):
+                batch.add_send(event.user_id, decision.template_name, event.event_timestamp)
+
+            evaluations.append((decision, outcome, suppression_reason))
+
+        send_requests: list[SendRequest] = []
+        suppressions: list[Suppression] = []
+        decision_rows: list[Decision] = []
+        results = []
+
+        for event, (decision, outcome, suppression_reason) in zip(events, evaluations):
+            channel = "internal" if outcome == "alert" else decision.delivery_method
+            reason = suppression_reason if outcome == "suppress" else decision.reason
+
+            if outcome in ("allow", "alert"):
+                send_requests.append(
+                    SendRequest(
+                        user_id=event.user_id,
+                        event=event,
+                        event_timestamp=event.event_timestamp,
+                        template_name=decision.template_name,
+                        channel=channel,
+                        reason=f"rule:{decision.matched_rule}",
+                        send_message_success=self._initial_send_status(),
+                    )
+                )
+            elif outcome == "suppress":
+                suppressions.append(
+                    Suppression(
+                        user_id=event.user_id,
+                        template_name=decision.template_name,
+                        suppression_reason=suppression_reason,
+                        event=event,
+                    )
+                )
+
+            decision_rows.append(
+                Decision(
+                    user_id=event.user_id,
+                    event=event,
+                    event_type=event.event_type,
+                    matched_rule=decision.matched_rule,
+                    action_type=decision.action_type,
+                    outcome=outcome,
+                    reason=reason,  # e.g. "matched rule X" / "suppressed by once_ever"
+                    template_name=decision.template_name,
+                    channel=decision.delivery_method if decision.delivery_method else None,
+                    ruleset_version=decision.ruleset_version,
+                )
+            )
+            results.append((event, decision, outcome, channel, reason))
+
+        self.event_repository.add_all(db, events)
+        self.send_request_repository.add_all(db, send_requests)
+        self.suppression_repository.add_all(db, suppressions)
+        self.decision_repository.add_all(db, decision_rows)
+        if self.outbox_dispatcher is not None and send_requests:
+            # Delivered by the dispatcher after this transaction commits.
+            self.outbox_dispatcher.enqueue(db, send_requests)
+
+        started = time.perf_counter()
+        db.flush()
+        if self.user_state_service is not None:
+            self.user_state_service.record(db, events, send_requests)
+        STAGE_SECONDS.observe(time.perf_counter() - started, "persist")
+
+        if self.audit_cache is not None:
+            self.audit_cache.invalidate_on_commit(db, (d.user_id for d in decision_rows))
+
+        for send_request in send_requests:
+            self.suppression_service.record_send(
+                db, send_request.user_id, send_request.template_name, send_request.event_timestamp
+            )
+
+        if self.outbox_dispatcher is None:
+            for send_request in send_requests:
+                started = time.perf_counter()
+                # In async mode this runs on the event loop: the provider call goes to the threadpool.
+                call_blocking(
+                    self.messaging_provider.send_message,
+                    user_id=send_request.user_id,
+                    template_name=send_request.template_name,
+                    channel=send_request.channel,
+                    reason=send_request.reason,
+                )
+                STAGE_SECONDS.observe(time.perf_counter() - started, "provider_send")
+
+        for _, decision, outcome, _, reason in results:
+            DECISIONS.inc(decision.matched_rule or "none", outcome)
+            if outcome == "suppress":
+                SUPPRESSIONS.inc(reason)
+
+        return results
+
+    def _initial_send_status(self) -> bool | None:
+        # Inline sends either succeed or raise and roll back the whole transaction,
+        # so a committed row always means success. Outbox sends are resolved later.
+        return None if self.outbox_dispatcher is not None else True
+
+    def _build_event(self, payload: EventIn, idempotency_key: str | None = None) -> Event:
         event = Event(
             user_id=payload.user_id,
             event_type=payload.event_type,
             event_timestamp=payload.event_timestamp,
             properties=payload.properties,
+            idempotency_key=idempotency_key,
         )
 
         if payload.user_traits is not None:
@@ -50,80 +292,4 @@ class EventProcessingService:
                 risk_segment=payload.user_traits.risk_segment,
             )
 
-        saved_event = self.event_repository.add(db, event)
-
-        decision = self.rule_evaluation_service.evaluate(
-            db=db,
-            event=saved_event,
-            user_traits=saved_event.user_traits,
-        )
-
-        outcome, suppression_reason = self.suppression_service.evaluate(
-            db=db,
-            event=saved_event,
-            decision=decision,
-        )
-
-        if outcome == "allow":
-            send_request = SendRequest(
-                user_id=saved_event.user_id,
-                event_id=saved_event.id,
-                event_timestamp=saved_event.event_timestamp,
-                template_name=decision.template_name,
-                channel=decision.delivery_method,
-                reason=f"rule:{decision.matched_rule}",
-            )
-            self.send_request_repository.add(db, send_request)
-            # TODO: add new bool field to send request "send_message_success"
-            self.messaging_provider.send_message(
-                user_id=saved_event.user_id,
-                template_name=decision.template_name,
-                channel=decision.delivery_method,
-                reason=f"rule:{decision.matched_rule}",
-            )
-
-        elif outcome == "alert":
-            send_request = SendRequest(
-                user_id=saved_event.user_id,
-                event_id=saved_event.id,
-                event_timestamp=saved_event.event_timestamp,
-                template_name=decision.template_name,
-                channel="internal",
-                reason=f"rule:{decision.matched_rule}",
-            )
-            self.send_request_repository.add(db, send_request)
-            # TODO: add new bool field to send request "send_message_success"
-            self.messaging_provider.send_message(
-                user_id=saved_event.user_id,
-                template_name=decision.template_name,
-                channel="internal",
-                reason=f"rule:{decision.matched_rule}",
-            )
-
-        elif outcome == "suppress":
-            suppression = Suppression(
-                user_id=saved_event.user_id,
-                template_name=decision.template_name,
-                suppression_reason=suppression_reason,
-                event_id=saved_event.id,
-            )
-            self.suppression_repository.add(db, suppression)  # TODO: move to supression servce
-
-        channel = "internal" if outcome == "alert" else decision.delivery_method
-        reason = suppression_reason if outcome == "suppress" else decision.reason
-
-        decision_row = Decision(
-            user_id=saved_event.user_id,
-            event_id=saved_event.id,
-            event_type=saved_event.event_type,
-            matched_rule=decision.matched_rule,
-            action_type=decision.action_type,
-            outcome=outcome,
-            reason=reason,  # e.g. "matched rule X" / "suppressed by once_ever"
-            template_name=decision.template_name,
-            channel=decision.delivery_method if decision.delivery_method else None,
-        )
-
-        self.decision_repository.add(db, decision_row)
-
-        return saved_event, decision, outcome, channel, reason
+        return event
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+
+from pydantic import ValidationError
+
+from src.marketing_messaging_service.schemas.event import EventIn
+
+
+@dataclass(slots=True)
+class StreamLine:
+    number: int  # 1-based line number in the input
+    event: EventIn | None = None
+    error: str | None = None
+
+
+class NDJSONEventParser:
+    """
+    Incremental NDJSON parser: `feed` arbitrary byte chunks, get back the complete lines
+    validated into EventIn, or the error for lines that are not.
+
+    Only the current partial line is buffered. A line longer than `max_line_bytes` is
+    reported once and skipped up to the next newline, so memory stays bounded whatever
+    the input. Blank lines are counted but produce nothing.
+    """
+
+    def __init__(self, max_line_bytes: int = 1_048_576):
+        self.max_line_bytes = max_line_bytes
+        self._buffer = bytearray()
+        self._line_number = 0
+        self._skipping = False
+
+    def feed(self, data: bytes) -> list[StreamLine]:
+        lines = []
+        start = 0
+        while (newline := data.find(b"\n", start)) != -1:
+            if self._skipping:
+                # Already reported and counted when it outgrew the buffer.
+                self._skipping = False
+            else:
+                self._buffer += data[start:newline]
+                self._line_number += 1
+                if len(self._buffer) > self.max_line_bytes:
+                    lines.append(self._too_long())
+                else:
+                    self._append_parsed(lines)
+            self._buffer.clear()
+            start = newline + 1
+
+        if not self._skipping:
+            self._buffer += data[start:]
+            if len(self._buffer) > self.max_line_bytes:
+                self._line_number += 1
+                lines.append(self._too_long())
+                self._buffer.clear()
+                self._skipping = True
+        return lines
+
+    def close(self) -> list[StreamLine]:
+        """Parse a last line without a trailing newline."""
+        lines = []
+        if self._buffer and not self._skipping:
+            self._line_number += 1
+            self._append_parsed(lines)
+        self._buffer.clear()
+        self._skipping = False
+        return lines
+
+    def _too_long(self) -> StreamLine:
+        return StreamLine(self._line_number, error=f"Line exceeds {self.max_line_bytes} bytes")
+
+    def _append_parsed(self, lines: list[StreamLine]) -> None:
+        if not self._buffer.strip():
+            return
+        try:
+            lines.append(StreamLine(self._line_number, event=EventIn.model_validate_json(bytes(self._buffer))))
+        except ValidationError as exc:
+            lines.append(StreamLine(self._line_number, error=format_validation_error(exc)))
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+        for error in exc.errors(include_url=False)
+    )
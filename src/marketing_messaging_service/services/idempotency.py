@@ -0,0 +1,163 @@
+import hashlib
+import json
+import math
+import threading
+
+from sqlalchemy.orm import Session
+
+from src.marketing_messaging_service.infrastructure.database import to_naive_utc
+from src.marketing_messaging_service.models.decision import Decision
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.repositories.interfaces import IDecisionRepository
+from src.marketing_messaging_service.repositories.interfaces import IEventRepository
+from src.marketing_messaging_service.schemas.event import EventIn
+
+# (user_id, idempotency key): keys are only unique per user.
+ScopedKey = tuple[str, str]
+
+
+class IdempotencyKeyConflict(ValueError):
+    """An idempotency key was reused for an event with different content."""
+
+
+class IdempotencyKeyTaken(Exception):
+    """A key taken as new was stored by another process meanwhile; the transaction has to be rerun."""
+
+
+class RecentKeyFilter:
+    """
+    Bloom filter over the idempotency keys this process has written recently.
+
+    `might_contain` never answers False for a remembered key, so False means "definitely
+    new here" and needs no database lookup. Two generations of `capacity` keys each are
+    kept; when the current one fills up the older one is dropped, which bounds memory
+    and forgets the oldest keys first. At the default 1% false-positive rate a
+    generation of 1M keys takes about 1.2 MB.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, false_positive_rate: float = 0.01):
+        self.capacity = capacity
+        # Optimal sizing: m = -n ln p / (ln 2)^2 bits, k = m / n ln 2 hashes.
+        self._bits = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._bits / capacity * math.log(2)))
+        self._current = bytearray((self._bits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def might_contain(self, key: str) -> bool:
+        positions = self._positions(key)
+        current, previous = self._current, self._previous
+        return _all_set(current, positions) or _all_set(previous, positions)
+
+    def add(self, key: str) -> None:
+        positions = self._positions(key)
+        with self._lock:
+            if self._count >= self.capacity:
+                self._previous, self._current = self._current, bytearray(len(self._current))
+                self._count = 0
+            for position in positions:
+                self._current[position >> 3] |= 1 << (position & 7)
+            self._count += 1
+
+    def _positions(self, key: str) -> list[int]:
+        # Double hashing: k positions from the two halves of one 128-bit digest.
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self._bits for i in range(self._hashes)]
+
+
+def _all_set(bits: bytearray, positions: list[int]) -> bool:
+    return all(bits[position >> 3] & (1 << (position & 7)) for position in positions)
+
+
+def event_fingerprint(payload: EventIn) -> str:
+    """Key derived from the event content, for upstreams that retry without sending a key."""
+    content = json.dumps(
+        [payload.user_id, payload.event_type, payload.event_timestamp.isoformat(), payload.properties],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return "sha256:" + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def same_event(event: Event | EventIn, payload: EventIn) -> bool:
+    """Whether `payload` is the same event as `event`, stored or not (user traits aside)."""
+    return (
+        event.event_type == payload.event_type
+        and to_naive_utc(event.event_timestamp) == to_naive_utc(payload.event_timestamp)
+        and (event.properties or None) == (payload.properties or None)
+    )
+
+
+class IdempotencyKeys:
+    """
+    Finds events that were already processed under the same idempotency key.
+
+    Keys come from `EventIn.idempotency_key`, or from `event_fingerprint` when
+    `fingerprint_events` is set, and are scoped to the event's user. The unique index on
+    events (user_id, idempotency_key) is the source of truth; the RecentKeyFilter only
+    spares the lookup for keys that are certainly new.
+    """
+
+    def __init__(
+        self,
+        event_repository: IEventRepository,
+        decision_repository: IDecisionRepository,
+        fingerprint_events: bool = False,
+        recent_keys: RecentKeyFilter | None = None,
+    ):
+        self.event_repository = event_repository
+        self.decision_repository = decision_repository
+        self.fingerprint_events = fingerprint_events
+        self.recent_keys = recent_keys
+        self.lookups = 0
+        self.lookups_skipped = 0
+
+    def key_for(self, payload: EventIn) -> ScopedKey | None:
+        if payload.idempotency_key is not None:
+            return payload.user_id, payload.idempotency_key
+        if self.fingerprint_events:
+            return payload.user_id, event_fingerprint(payload)
+        return None
+
+    def find_processed(self, db: Session, keys: list[ScopedKey]) -> dict[ScopedKey, tuple[Event, Decision | None]]:
+        """
+        The stored event and decision per key that was already processed.
+
+        Keys the filter has certainly not seen are taken as new without touching the
+        database. The decision is None for an event that is stored without one.
+        """
+        if self.recent_keys is not None:
+            candidates = [key for key in keys if self.recent_keys.might_contain(_filter_key(key))]
+            self.lookups_skipped += len(keys) - len(candidates)
+        else:
+            candidates = keys
+        if not candidates:
+            return {}
+
+        self.lookups += len(candidates)
+        events = self.event_repository.list_by_idempotency_keys(db, candidates)
+        if not events:
+            return {}
+        decisions = {
+            decision.event_id: decision
+            for decision in self.decision_repository.list_by_event_ids(db, [event.id for event in events])
+        }
+        # Events are written together with their decision, but a decision may have been removed since.
+        return {(event.user_id, event.idempotency_key): (event, decisions.get(event.id)) for event in events}
+
+    def remember(self, keys: list[ScopedKey]) -> None:
+        if self.recent_keys is not None:
+            for key in keys:
+                self.recent_keys.add(_filter_key(key))
+
+    def stats(self) -> dict[str, int]:
+        return {"lookups": self.lookups, "lookups_skipped": self.lookups_skipped}
+
+
+def _filter_key(key: ScopedKey) -> str:
+    user_id, idempotency_key = key
+    return f"{user_id}\x00{idempotency_key}"
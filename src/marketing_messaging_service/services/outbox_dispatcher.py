@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from contextlib import AbstractContextManager
+from datetime import timedelta
+from typing import Callable
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from src.marketing_messaging_service.infrastructure.database import create_session
+from src.marketing_messaging_service.infrastructure.database import utc_now
+from src.marketing_messaging_service.infrastructure.metrics import OUTBOX_DELIVERIES
+from src.marketing_messaging_service.infrastructure.metrics import STAGE_SECONDS
+from src.marketing_messaging_service.models.outbox_message import OutboxMessage
+from src.marketing_messaging_service.models.send_request import SendRequest
+from src.marketing_messaging_service.providers.interfaces import IMessagingProvider
+from src.marketing_messaging_service.repositories.interfaces import IOutboxRepository
+
+logger = logging.getLogger(__name__)
+
+_WAKE_KEY = "outbox_dispatchers_to_wake"
+
+
+class OutboxDispatcher:
+    """
+    Delivers outbox messages to the messaging provider outside the ingest transaction.
+
+    `enqueue` writes one OutboxMessage per SendRequest in the caller's transaction and
+    wakes the dispatcher once that transaction commits. A background thread claims due
+    messages and hands them to a worker pool; failed sends are retried with exponential
+    backoff until `max_attempts`, after which the message is marked failed.
+    """
+
+    def __init__(
+        self,
+        outbox_repository: IOutboxRepository,
+        messaging_provider: IMessagingProvider,
+        session_factory: Callable[[], AbstractContextManager[Session]] = create_session,
+        workers: int = 4,
+        max_attempts: int = 5,
+        retry_backoff_seconds: float = 2.0,
+        poll_interval_seconds: float = 1.0,
+        batch_size: int = 100,
+        lease_seconds: float = 60.0,
+    ):
+        self.outbox_repository = outbox_repository
+        self.messaging_provider = messaging_provider
+        self.session_factory = session_factory
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def enqueue(self, db: Session, send_requests: list[SendRequest]) -> None:
+        """Queue provider calls for `send_requests`, flushed together with them in the same transaction."""
+        messages = [
+            OutboxMessage(
+                send_request=send_request,
+                user_id=send_request.user_id,
+                template_name=send_request.template_name,
+                channel=send_request.channel,
+                reason=send_request.reason,
+            )
+            for send_request in send_requests
+        ]
+        self.outbox_repository.add_all(db, messages)
+        db.info.setdefault(_WAKE_KEY, set()).add(self)
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="outbox-worker")
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 10.0) -> None:
+        """Stop polling, let in-flight deliveries finish and release the worker pool."""
+        if self._thread is None:
+            return
+
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout=timeout)
+        self._executor.shutdown(wait=True)
+        self._thread = None
+        self._executor = None
+
+    def drain_once(self) -> int:
+        """Claim and deliver one batch of due messages; returns how many were claimed."""
+        now = utc_now()
+        with self.session_factory() as db:
+            claimed = self.outbox_repository.claim_due(
+                db,
+                now=now,
+                lease_until=now + timedelta(seconds=self.lease_seconds),
+                limit=self.batch_size,
+            )
+            # Snapshot the values the workers need before the session commits and expires them.
+            jobs = [
+                (m.id, m.send_request_id, m.user_id, m.template_name, m.channel, m.reason, m.attempts)
+                for m in claimed
+            ]
+
+        if not jobs:
+            return 0
+
+        if self._executor is None:
+            for job in jobs:
+                self._deliver(*job)
+        else:
+            wait([self._executor.submit(self._deliver, *job) for job in jobs])
+
+        return len(jobs)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.poll_interval_seconds)
+            self._wake.clear()
+
+            try:
+                while not self._stopping.is_set() and self.drain_once() >= self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Outbox dispatch cycle failed")
+
+    def _deliver(
+        self,
+        message_id: int,
+        send_request_id: int,
+        user_id: str,
+        template_name: str,
+        channel: str,
+        reason: str,
+        attempts: int,
+    ) -> None:
+        started = time.perf_counter()
+        error: Exception | None = None
+        try:
+            self.messaging_provider.send_message(
+                user_id=user_id,
+                template_name=template_name,
+                channel=channel,
+                reason=reason,
+            )
+        except Exception as exc:
+            error = exc
+        STAGE_SECONDS.observe(time.perf_counter() - started, "provider_send")
+
+        if error is not None:
+            attempt_number = attempts + 1
+            retry_at = None
+            if attempt_number < self.max_attempts:
+                backoff = self.retry_backoff_seconds * 2 ** (attempt_number - 1)
+                retry_at = utc_now() + timedelta(seconds=backoff)
+
+            OUTBOX_DELIVERIES.inc("retry" if retry_at is not None else "failed")
+            logger.warning(
+                "Outbox message %s failed (attempt %s/%s): %s", message_id, attempt_number, self.max_attempts, error
+            )
+            with self.session_factory() as db:
+                self.outbox_repository.mark_attempt_failed(db, message_id, send_request_id, repr(error), retry_at)
+            return
+
+        OUTBOX_DELIVERIES.inc("sent")
+        with self.session_factory() as db:
+            self.outbox_repository.mark_sent(db, message_id, send_request_id, utc_now())
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _wake_dispatchers(session: Session) -> None:
+    for dispatcher in session.info.pop(_WAKE_KEY, ()):
+        dispatcher.notify()
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_wakeups(session: Session) -> None:
+    session.info.pop(_WAKE_KEY, None)
@@ -0,0 +1,302 @@
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from typing import Callable
+
+from src.marketing_messaging_service.infrastructure.database import create_session
+from src.marketing_messaging_service.schemas.event import EventIn
+from src.marketing_messaging_service.schemas.event import EventProcessingResult
+from src.marketing_messaging_service.services.idempotency import IdempotencyKeyConflict
+
+logger = logging.getLogger(__name__)
+
+# Inbox messages: ("event", request_id, payload dict), ("reload",), or None to stop.
+# Result messages: (request_id, ok, EventProcessingResult dict or error text), or None to stop the collector.
+# The parent also puts (_WORKER_EXITED, partition) there once it sees a worker has died.
+_WORKER_EXITED = "worker-exited"
+
+
+class PartitionProcessingError(RuntimeError):
+    pass
+
+
+class PartitionWorkerExited(PartitionProcessingError):
+    """The event's partition worker is gone, so the event was not (or may not have been) processed."""
+
+
+def partition_for(user_id: str, partitions: int) -> int:
+    """Stable across processes and restarts, unlike hash()."""
+    return zlib.crc32(user_id.encode("utf-8")) % partitions
+
+
+class PartitionedEventProcessor:
+    """
+    Processes events in N worker processes, partitioned by user_id.
+
+    All events of a user go to the same worker through its bounded inbox, and each
+    worker handles its inbox in order, so per-user ordering holds while different
+    users are processed in parallel. Every worker builds its own services, sessions,
+    suppression ledger and ruleset (see `_worker_main`) and commits the events it
+    drained from its inbox together, in one transaction.
+
+    `submit` returns a Future resolved with the EventProcessingResult once the
+    worker has committed; callers that only need an acknowledgement can drop it.
+    `on_result(user_id)` runs in the parent after each committed event.
+
+    A worker that dies (OOM kill, segfault) is noticed by the result collector within
+    `liveness_interval_seconds`: the futures of its partition fail with
+    PartitionProcessingError, and so does every later `submit` to that partition.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int = 1_000,
+        batch_size: int = 100,
+        enqueue_timeout_seconds: float = 5.0,
+        on_result: Callable[[str], None] | None = None,
+        liveness_interval_seconds: float = 1.0,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self.on_result = on_result
+        self.liveness_interval_seconds = liveness_interval_seconds
+
+        # spawn: the API process runs threads (outbox, provider writer) that must not be forked.
+        self._context = multiprocessing.get_context("spawn")
+        self._inboxes: list = []
+        self._results = None
+        self._processes: list = []
+        self._collector: threading.Thread | None = None
+        self._pending: dict[int, tuple[str, int, Future]] = {}  # request_id -> (user_id, partition, future)
+        self._dead: set[int] = set()  # exits seen by the collector
+        self._failed_partitions: set[int] = set()  # exits whose pending futures were failed
+        self._stopping = False
+        self._pending_lock = threading.Lock()
+        self._request_ids = itertools.count()
+
+    def start(self) -> None:
+        if self._processes:
+            return
+
+        self._results = self._context.Queue()
+        self._inboxes = [self._context.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        self._processes = [
+            self._context.Process(
+                target=_worker_main,
+                args=(index, inbox, self._results, self.batch_size),
+                name=f"event-partition-{index}",
+                daemon=True,
+            )
+            for index, inbox in enumerate(self._inboxes)
+        ]
+        for process in self._processes:
+            process.start()
+
+        self._collector = threading.Thread(target=self._collect, name="event-partition-results", daemon=True)
+        self._collector.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Let every worker finish its inbox, then stop it."""
+        if not self._processes:
+            return
+
+        self._stopping = True
+        for inbox in self._inboxes:
+            inbox.put(None, timeout=timeout)
+        for process in self._processes:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                logger.warning("Partition worker %s did not stop in time, terminating", process.name)
+                process.terminate()
+
+        self._results.put(None)
+        self._collector.join(timeout=timeout)
+
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for _, _, future in pending.values():
+            future.set_exception(PartitionProcessingError("Partition worker stopped before processing the event"))
+
+        self._processes = []
+        self._inboxes = []
+        self._collector = None
+        self._dead = set()
+        self._failed_partitions = set()
+        self._stopping = False
+
+    def submit(self, payload: EventIn) -> Future:
+        """
+        Queue `payload` on its user's partition.
+
+        Blocks while the partition's inbox is full and raises queue.Full after
+        `enqueue_timeout_seconds`, so producers are slowed down instead of
+        buffering without bound. Raises PartitionWorkerExited if the
+        partition's worker has died.
+        """
+        partition = partition_for(payload.user_id, self.workers)
+        process = self._processes[partition]
+        if not process.is_alive():
+            raise PartitionWorkerExited(f"Partition worker {process.name} is not running")
+
+        request_id = next(self._request_ids)
+        future: Future = Future()
+        # Running futures can't be cancelled, so a caller that gives up waiting can't leave the
+        # collector resolving a cancelled future.
+        future.set_running_or_notify_cancel()
+        with self._pending_lock:
+            self._pending[request_id] = (payload.user_id, partition, future)
+
+        inbox = self._inboxes[partition]
+        try:
+            inbox.put(("event", request_id, payload.model_dump()), timeout=self.enqueue_timeout_seconds)
+        except queue.Full:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            raise
+        return future
+
+    def reload_rules(self) -> None:
+        """Ask every worker to reload rules.yaml after the events already queued."""
+        for inbox in self._inboxes:
+            inbox.put(("reload",), timeout=self.enqueue_timeout_seconds)
+
+    def queue_depths(self) -> list[int]:
+        # qsize() is approximate and unavailable on macOS.
+        depths = []
+        for inbox in self._inboxes:
+            try:
+                depths.append(inbox.qsize())
+            except NotImplementedError:
+                depths.append(-1)
+        return depths
+
+    def _collect(self) -> None:
+        next_check = time.monotonic() + self.liveness_interval_seconds
+        while True:
+            if time.monotonic() >= next_check:
+                # Also while results keep arriving: a busy queue must not hide a dead worker.
+                self._check_workers()
+                next_check = time.monotonic() + self.liveness_interval_seconds
+            try:
+                message = self._results.get(timeout=self.liveness_interval_seconds)
+            except queue.Empty:
+                continue
+            if message is None:
+                return
+
+            if message[0] == _WORKER_EXITED:
+                # Queued behind every result the worker sent before it died, so whatever is
+                # still pending for its partition is lost.
+                self._failed_partitions.add(message[1])
+                self._fail_pending(message[1])
+                continue
+
+            request_id, ok, value = message
+            with self._pending_lock:
+                user_id, _, future = self._pending.pop(request_id, (None, None, None))
+            if future is None:
+                continue
+
+            if not ok:
+                logger.error("Event for user %s failed in its partition worker: %s", user_id, value)
+                future.set_exception(value if isinstance(value, Exception) else PartitionProcessingError(value))
+                continue
+
+            if self.on_result is not None:
+                try:
+                    self.on_result(user_id)
+                except Exception:
+                    logger.exception("on_result callback failed")
+            future.set_result(EventProcessingResult(**value))
+
+    def _check_workers(self) -> None:
+        if self._stopping:
+            return
+        for index, process in enumerate(self._processes):
+            if process.exitcode is None or index in self._dead:
+                continue
+            self._dead.add(index)
+            logger.error("Partition worker %s exited with code %s", process.name, process.exitcode)
+            self._results.put((_WORKER_EXITED, index))
+        # A submit that passed its liveness check just before the worker died.
+        for index in self._failed_partitions:
+            self._fail_pending(index)
+
+    def _fail_pending(self, partition: int) -> None:
+        with self._pending_lock:
+            lost = [request_id for request_id, (_, p, _) in self._pending.items() if p == partition]
+            futures = [self._pending.pop(request_id)[2] for request_id in lost]
+        process = self._processes[partition]
+        for future in futures:
+            future.set_exception(
+                PartitionWorkerExited(f"Partition worker {process.name} exited with code {process.exitcode}")
+            )
+
+
+def _worker_main(index: int, inbox, results, batch_size: int) -> None:
+    # Imported here so each spawned worker wires its own engine, services and caches from settings.
+    from src.marketing_messaging_service.config.settings import settings
+    from src.marketing_messaging_service.controllers import event_controller as wiring
+
+    if settings.rules_hot_reload:
+        wiring.rule_evaluation_service.start_watching(settings.rules_reload_interval_seconds)
+
+    try:
+        stopping = False
+        while not stopping:
+            message = inbox.get()
+            batch = []
+            while message and message[0] == "event":
+                batch.append(message)
+                if len(batch) >= batch_size:
+                    message = ()
+                    break
+                try:
+                    message = inbox.get_nowait()
+                except queue.Empty:
+                    message = ()
+
+            if batch:
+                _process(wiring, batch, results)
+
+            # A control message ends the batch, so it applies after the events queued before it.
+            if message is None:
+                stopping = True
+            elif message and message[0] == "reload":
+                try:
+                    wiring.rule_evaluation_service.reload_rules()
+                except Exception:
+                    logger.exception("Partition worker %s kept its ruleset, reload failed", index)
+    finally:
+        wiring.rule_evaluation_service.stop_watching()
+        wiring.messaging_provider.close()
+
+
+def _process(wiring, batch: list[tuple], results) -> None:
+    try:
+        with create_session() as db:
+            outcomes = wiring.event_processing_service.process_own_batch(db, [EventIn(**m[2]) for m in batch])
+            # Converted before commit, which expires the ORM objects.
+            converted = [wiring.to_processing_result(*outcome).model_dump() for outcome in outcomes]
+    except Exception as exc:
+        if len(batch) > 1:
+            # Retry one by one so a single bad event does not fail the others.
+            for message in batch:
+                _process(wiring, [message], results)
+            return
+        logger.exception("Partition worker failed to process an event")
+        # A reused idempotency key is the client's mistake: passed on as is so the API can answer 409.
+        error = exc if isinstance(exc, IdempotencyKeyConflict) else f"{type(exc).__name__}: {exc}"
+        results.put((batch[0][1], False, error))
+        return
+
+    for message, result in zip(batch, converted):
+        results.put((message[1], True, result))
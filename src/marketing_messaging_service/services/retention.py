@@ -0,0 +1,162 @@
+import gzip
+import json
+import time
+from collections import Counter
+from contextlib import AbstractContextManager
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from typing import IO
+from typing import Callable
+
+from sqlalchemy import Engine
+from sqlalchemy import Table
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.marketing_messaging_service.infrastructure.database import create_session
+from src.marketing_messaging_service.models.decision import Decision
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.outbox_message import OutboxMessage
+from src.marketing_messaging_service.models.send_request import SendRequest
+from src.marketing_messaging_service.models.suppression import Suppression
+from src.marketing_messaging_service.models.user_traits import UserTraits
+from src.marketing_messaging_service.repositories.retention_repository import RetentionRepository
+from src.marketing_messaging_service.services.rule_compiler import CompiledRuleset
+
+# Rows archived together with their event, deleted before it.
+_EVENT_CHILDREN: tuple[Table, ...] = (UserTraits.__table__, Decision.__table__, Suppression.__table__)
+
+
+def retention_horizon(ruleset: CompiledRuleset, grace: timedelta, minimum: timedelta) -> timedelta:
+    """
+    How far back from now rows are still needed to decide new events.
+
+    The longest prior_event window of the enabled rules, at least one day when a rule is
+    once_per_calendar_day, plus `grace` for events that arrive late; never below `minimum`.
+    """
+    lookback = timedelta(0)
+    for compiled_rules in ruleset.rules_by_event_type.values():
+        for compiled_rule in compiled_rules:
+            for condition in compiled_rule.conditions:
+                if condition.kind == "prior_event":
+                    lookback = max(lookback, condition.window)
+            if compiled_rule.rule.suppression.get("mode") == "once_per_calendar_day":
+                lookback = max(lookback, timedelta(days=1))
+    return max(minimum, lookback + grace)
+
+
+class ArchiveWriter:
+    """Appends rows as NDJSON to one gzip file per table under `directory`."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._files: dict[str, IO[str]] = {}
+
+    def write(self, table: Table, rows: list[dict]) -> None:
+        if not rows:
+            return
+        f = self._files.get(table.name)
+        if f is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            f = self._files[table.name] = gzip.open(self.directory / f"{table.name}.ndjson.gz", "at", encoding="utf-8")
+        for row in rows:
+            f.write(json.dumps(row, default=str) + "\n")
+        # Rows are deleted right after this returns: they must be on disk first.
+        f.flush()
+
+    def close(self) -> None:
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def size_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.directory.glob("*.ndjson.gz"))
+
+
+class RetentionService:
+    """
+    Moves rows older than a cutoff into an ArchiveWriter and deletes them, one chunk per
+    transaction, so writers only ever wait for a single chunk.
+
+    1. send_requests (with their outbox messages), except the latest send of every
+       (user, template), which once_ever and once_per_calendar_day still need, and sends
+       whose outbox message is not delivered yet.
+    2. events, with their user_traits, decisions and suppressions. Kept sends of an
+       archived event get event_id NULL.
+
+    A chunk is written to the archive before its transaction commits, so a crash can only
+    archive a chunk twice, never lose it. user_state is left as is: it only keeps latest
+    timestamps.
+    """
+
+    def __init__(
+        self,
+        retention_repository: RetentionRepository,
+        session_factory: Callable[[], AbstractContextManager[Session]] = create_session,
+        chunk_size: int = 1000,
+        pause_seconds: float = 0.0,
+    ):
+        self.retention_repository = retention_repository
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.pause_seconds = pause_seconds
+
+    def archive(self, cutoff: datetime, archive: ArchiveWriter) -> dict[str, int]:
+        """Archive everything older than `cutoff` (naive UTC); returns rows moved per table."""
+        rows: Counter = Counter()
+        self._archive_sends(cutoff, archive, rows)
+        self._archive_events(cutoff, archive, rows)
+        return dict(rows)
+
+    def _archive_sends(self, cutoff: datetime, archive: ArchiveWriter, rows: Counter) -> None:
+        after_id = 0
+        while True:
+            with self.session_factory() as db:
+                ids, last_scanned = self.retention_repository.expired_send_ids(db, cutoff, after_id, self.chunk_size)
+                if last_scanned == after_id:
+                    return
+                if ids:
+                    self._move(db, OutboxMessage.__table__, "send_request_id", ids, archive, rows)
+                    self._move(db, SendRequest.__table__, "id", ids, archive, rows)
+            after_id = last_scanned
+            self._pause()
+
+    def _archive_events(self, cutoff: datetime, archive: ArchiveWriter, rows: Counter) -> None:
+        after_id = 0
+        while True:
+            with self.session_factory() as db:
+                ids = self.retention_repository.expired_event_ids(db, cutoff, after_id, self.chunk_size)
+                if not ids:
+                    return
+                for table in _EVENT_CHILDREN:
+                    self._move(db, table, "event_id", ids, archive, rows)
+                rows["send_requests_detached"] += self.retention_repository.detach_sends(db, ids)
+                self._move(db, Event.__table__, "id", ids, archive, rows)
+            after_id = ids[-1]
+            self._pause()
+
+    def _move(self, db: Session, table: Table, column: str, ids: list[int], archive: ArchiveWriter, rows: Counter):
+        archive.write(table, self.retention_repository.fetch_rows(db, table, column, ids))
+        rows[table.name] += self.retention_repository.delete_rows(db, table, column, ids)
+
+    def _pause(self) -> None:
+        if self.pause_seconds:
+            time.sleep(self.pause_seconds)
+
+
+def sqlite_space(engine: Engine) -> dict[str, int] | None:
+    """Database size and the part of it on the freelist (reusable, returned to the OS only by VACUUM)."""
+    if engine.dialect.name != "sqlite":
+        return None
+    with engine.connect() as conn:
+        page_size = conn.execute(text("PRAGMA page_size")).scalar()
+        page_count = conn.execute(text("PRAGMA page_count")).scalar()
+        freelist_count = conn.execute(text("PRAGMA freelist_count")).scalar()
+    return {"database_bytes": page_size * page_count, "free_bytes": page_size * freelist_count}
+
+
+def vacuum(engine: Engine) -> None:
+    """Rewrite the SQLite file without its free pages. Holds an exclusive lock for the whole rewrite."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
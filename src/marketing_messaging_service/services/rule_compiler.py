@@ -0,0 +1,199 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import timedelta
+from typing import Any
+
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.user_traits import UserTraits
+from src.marketing_messaging_service.services.enums import Operator
+from src.marketing_messaging_service.services.rule_models import Rule
+
+FieldAccessor = Callable[[Event, UserTraits | None], Any]
+FieldCheck = Callable[[Event, UserTraits | None], bool]
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledCondition:
+    kind: str  # "field" | "prior_event" | "invalid"
+
+    # field conditions; field / accessor / operator / value are kept for batch (column-wise) evaluation
+    check: FieldCheck | None = None
+    field: str | None = None
+    accessor: FieldAccessor | None = None
+    operator: str | None = None
+    value: Any = None
+
+    # prior_event conditions
+    event_type: str | None = None
+    window: timedelta | None = None
+
+
+# Conditions are checked cheapest class first; an invalid condition always fails, so it costs nothing.
+COST_CLASSES = {"invalid": 0, "field": 1, "prior_event": 2}
+
+
+class ConditionStats:
+    """
+    Sampled selectivity of one rule's conditions, and the order they are checked in.
+
+    Order: by cost class (in-memory field checks before prior_event lookups), then within
+    a class by rejection rate, highest first, so the condition most likely to end the
+    check runs earliest; YAML position breaks ties. Only one check in `sample_every` is
+    counted, which keeps the other checks as cheap as a plain loop. Rates are smoothed
+    ((rejected + 1) / (evaluated + 2)) so a condition without samples sits in the middle,
+    and the order is re-sorted every `reorder_every` samples. A rule with at most one
+    condition per cost class has nothing to re-sort and is never sampled. Counters are
+    updated without a lock: concurrent checks may lose an increment, which only blurs the rates.
+    """
+
+    __slots__ = (
+        "cost_classes",
+        "adaptive",
+        "evaluated",
+        "rejected",
+        "samples",
+        "order",
+        "ordered",
+        "sample_every",
+        "reorder_every",
+        "until_sample",
+        "_conditions",
+        "_until_reorder",
+    )
+
+    def __init__(self, conditions: tuple[CompiledCondition, ...], sample_every: int = 16, reorder_every: int = 64):
+        self._conditions = conditions
+        self.cost_classes = tuple(COST_CLASSES.get(condition.kind, 0) for condition in conditions)
+        self.adaptive = len(set(self.cost_classes)) < len(self.cost_classes)
+        self.evaluated = [0] * len(conditions)
+        self.rejected = [0] * len(conditions)
+        self.samples = 0
+        self.sample_every = sample_every
+        self.reorder_every = reorder_every
+        self.until_sample = 1  # the first check is counted
+        self._until_reorder = reorder_every
+        self._reorder()
+
+    def rejection_rate(self, index: int) -> float:
+        return (self.rejected[index] + 1) / (self.evaluated[index] + 2)
+
+    def sampled(self) -> None:
+        """Count one sampled check of the rule, re-sorting the order every `reorder_every` samples."""
+        self.samples += 1
+        self.until_sample = self.sample_every
+        self._until_reorder -= 1
+        if self._until_reorder <= 0:
+            self._until_reorder = self.reorder_every
+            self._reorder()
+
+    def _reorder(self) -> None:
+        order = tuple(
+            sorted(
+                range(len(self.cost_classes)),
+                key=lambda index: (self.cost_classes[index], -self.rejection_rate(index), index),
+            )
+        )
+        self.order = order  # indices into the rule's conditions
+        self.ordered = tuple(self._conditions[index] for index in order)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRule:
+    rule: Rule
+    conditions: tuple[CompiledCondition, ...]
+    # Mutable, per ruleset: a reload starts from fresh statistics.
+    stats: ConditionStats = field(default=None, compare=False)
+
+    def __post_init__(self):
+        if self.stats is None:
+            object.__setattr__(self, "stats", ConditionStats(self.conditions))
+
+    @property
+    def has_prior_event(self) -> bool:
+        return any(condition.kind == "prior_event" for condition in self.conditions)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRuleset:
+    """An immutable, fully compiled rules file; swapped as a whole on reload."""
+
+    version: str  # short content hash of the rules file
+    rules_by_event_type: dict[str, list[CompiledRule]]
+    rule_count: int
+
+
+def compile_rules(rules: list[Rule]) -> dict[str, list[CompiledRule]]:
+    """
+    Index enabled rules by trigger event type, keeping YAML order inside each list,
+    and turn every condition into a prebuilt callable.
+    """
+    index: dict[str, list[CompiledRule]] = {}
+
+    for rule in rules:
+        if not rule.enabled:
+            continue
+
+        compiled = CompiledRule(
+            rule=rule,
+            conditions=tuple(_compile_condition(c) for c in rule.conditions.get("all", [])),
+        )
+        index.setdefault(rule.trigger.get("event_type"), []).append(compiled)
+
+    return index
+
+
+def _compile_condition(condition: dict) -> CompiledCondition:
+    if "field" in condition:
+        accessor = _compile_accessor(condition["field"])
+        return CompiledCondition(
+            kind="field",
+            check=_compile_operator(condition["operator"], accessor, condition.get("value")),
+            field=condition["field"],
+            accessor=accessor,
+            operator=condition["operator"],
+            value=condition.get("value"),
+        )
+
+    if "prior_event" in condition:
+        prior = condition["prior_event"]
+        return CompiledCondition(
+            kind="prior_event",
+            event_type=prior["event_type"],
+            window=timedelta(hours=prior["hours"]),
+        )
+
+    return CompiledCondition(kind="invalid")
+
+
+def _compile_accessor(field_path: str) -> FieldAccessor:
+    """Resolve the field path once, instead of re-parsing it for every event."""
+    if field_path.startswith("event."):
+        field_name = field_path.replace("event.", "")
+        return lambda event, user_traits: getattr(event, field_name, None)
+
+    if field_path.startswith("user_traits."):
+        field_name = field_path.replace("user_traits.", "")
+        return lambda event, user_traits: (
+            getattr(user_traits, field_name, None) if user_traits is not None else None
+        )
+
+    if field_path.startswith("properties."):
+        property_key = field_path.replace("properties.", "")
+        return lambda event, user_traits: (event.properties or {}).get(property_key)
+
+    return lambda event, user_traits: None
+
+
+def _compile_operator(operator: str, accessor: FieldAccessor, expected_value: Any) -> FieldCheck:
+    if operator == Operator.EQUALS.value:
+        return lambda event, user_traits: accessor(event, user_traits) == expected_value
+
+    if operator == Operator.GTE.value:
+        def _gte(event: Event, user_traits: UserTraits | None) -> bool:
+            actual_value = accessor(event, user_traits)
+            return actual_value is not None and actual_value >= expected_value
+
+        return _gte
+
+    return lambda event, user_traits: False  # Unknown operator
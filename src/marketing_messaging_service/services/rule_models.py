@@ -21,3 +21,4 @@ class RuleDecision(BaseModel):
     suppression_mode: str | None = None
     matched_rule: str | None = None
     reason: str
+    ruleset_version: str | None = None
@@ -0,0 +1,154 @@
+from collections import Counter
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from src.marketing_messaging_service.infrastructure.database import create_session
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.send_request import SendRequest
+from src.marketing_messaging_service.repositories import SuppressionRepository
+from src.marketing_messaging_service.repositories.in_memory_send_request_repository import InMemorySendRequestRepository
+from src.marketing_messaging_service.repositories.interfaces import IEventRepository
+from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
+from src.marketing_messaging_service.services.suppression_service import SuppressionService
+
+NO_RULE = "(no rule)"
+
+
+@dataclass
+class RuleCounts:
+    matched: int = 0
+    allowed: int = 0
+    alerted: int = 0
+    suppressed: dict[str, int] = field(default_factory=dict)  # by suppression reason
+
+
+@dataclass
+class SimulationRun:
+    ruleset_version: str
+    rules: dict[str, RuleCounts] = field(default_factory=dict)  # NO_RULE counts unmatched events
+
+
+@dataclass
+class SimulationReport:
+    events: int
+    users: int
+    candidate: SimulationRun
+    active: SimulationRun
+    changed: int  # events whose (rule, outcome) differs between the two rulesets
+    # ("rule/outcome" under the active ruleset, "rule/outcome" under the candidate) -> events
+    transitions: Counter = field(default_factory=Counter)
+
+
+class _Replay:
+    """One ruleset replayed with its own in-memory send history."""
+
+    def __init__(self, rule_evaluation_service: RuleEvaluationService):
+        self.rule_evaluation_service = rule_evaluation_service
+        self.sends = InMemorySendRequestRepository()
+        self.suppression_service = SuppressionService(
+            send_request_repository=self.sends,
+            suppression_repository=SuppressionRepository(),
+        )
+        self.run = SimulationRun(ruleset_version=rule_evaluation_service.get_ruleset().version)
+
+    def evaluate(self, db: Session, event: Event) -> str:
+        decision = self.rule_evaluation_service.evaluate(db=db, event=event, user_traits=event.user_traits)
+        outcome, reason = self.suppression_service.evaluate(db=db, event=event, decision=decision)
+
+        rule = decision.matched_rule or NO_RULE
+        counts = self.run.rules.get(rule)
+        if counts is None:
+            counts = self.run.rules[rule] = RuleCounts()
+        counts.matched += 1
+        if outcome == "allow":
+            counts.allowed += 1
+        elif outcome == "alert":
+            counts.alerted += 1
+        elif outcome == "suppress":
+            counts.suppressed[reason] = counts.suppressed.get(reason, 0) + 1
+
+        if outcome in ("allow", "alert"):
+            self.sends.add(
+                None,
+                SendRequest(
+                    user_id=event.user_id,
+                    template_name=decision.template_name,
+                    event_timestamp=event.event_timestamp,
+                ),
+            )
+        return f"{rule}/{outcome}"
+
+
+class RuleSimulationService:
+    """
+    Dry run of a candidate ruleset over the stored events, next to the active one.
+
+    Events are read user by user, oldest first, and each ruleset decides them with
+    its own in-memory send history, as if it had been active from the first event on.
+    Nothing is written: suppression checks never read send_requests, and only the
+    prior_event lookups query the stored events. Send histories are dropped when the
+    stream moves to the next user, so memory does not grow with the number of events.
+
+    Events come in keyset pages of `chunk_size`, each read and decided in its own short
+    session, so no read transaction (and on SQLite no SHARED lock) spans the whole table.
+    """
+
+    def __init__(
+        self,
+        event_repository: IEventRepository,
+        candidate: RuleEvaluationService,
+        active: RuleEvaluationService,
+        chunk_size: int = 1000,
+        session_factory: Callable[[], AbstractContextManager[Session]] = create_session,
+    ):
+        self.event_repository = event_repository
+        self.candidate = candidate
+        self.active = active
+        self.chunk_size = chunk_size
+        self.session_factory = session_factory
+
+    def simulate(self) -> SimulationReport:
+        candidate = _Replay(self.candidate)
+        active = _Replay(self.active)
+        transitions: Counter = Counter()
+        events = users = changed = 0
+        current_user = None
+        last_key = None
+
+        while True:
+            with self.session_factory() as db:
+                try:
+                    page = self.event_repository.list_page_all_users(db, after=last_key, limit=self.chunk_size)
+                    for event in page:
+                        if event.user_id != current_user:
+                            current_user = event.user_id
+                            users += 1
+                            candidate.sends.clear()
+                            active.sends.clear()
+
+                        before = active.evaluate(db, event)
+                        after = candidate.evaluate(db, event)
+                        events += 1
+                        if before != after:
+                            changed += 1
+                            transitions[(before, after)] += 1
+                    if page:
+                        last_key = (page[-1].user_id, page[-1].event_timestamp, page[-1].id)
+                finally:
+                    db.rollback()
+
+            if len(page) < self.chunk_size:
+                break
+
+        return SimulationReport(
+            events=events,
+            users=users,
+            candidate=candidate.run,
+            active=active.run,
+            changed=changed,
+            transitions=transitions,
+        )
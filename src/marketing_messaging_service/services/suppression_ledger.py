@@ -0,0 +1,166 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from src.marketing_messaging_service.infrastructure.database import strip_tz
+from src.marketing_messaging_service.repositories.interfaces import ISendRequestRepository
+from src.marketing_messaging_service.services.user_state import UserStateService
+
+_PENDING_KEY = "suppression_ledger_pending"
+
+
+@dataclass(slots=True)
+class LedgerEntry:
+    ever_sent: bool
+    last_sent_at: datetime | None  # latest non-null send event_timestamp (naive)
+
+
+class SuppressionLedger:
+    """
+    Bounded LRU of per (user_id, template_name) send history, used to answer
+    once_ever / once_per_calendar_day without querying send_requests.
+
+    - Entries are loaded lazily on a miss, from user_state when available.
+    - Sends recorded during a transaction are applied when the session commits
+      and dropped on rollback, so the ledger never reflects uncommitted rows.
+    - Every applied send gets a version, cached or not. A miss notes the version
+      before reading the DB; a send committed while it read is merged into the
+      loaded entry instead of being lost to it.
+    - The ledger is per process; sends written by other processes (partition
+      workers, backfill) are only seen once the entry is evicted and reloaded,
+      which is why it is off by default.
+    """
+
+    def __init__(
+        self,
+        send_request_repository: ISendRequestRepository,
+        max_entries: int = 100_000,
+        user_state_service: UserStateService | None = None,
+    ):
+        self.send_request_repository = send_request_repository
+        self.user_state_service = user_state_service
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[tuple[str, str], LedgerEntry] = OrderedDict()
+        # Version and event_timestamp of the latest applied send per key, bounded like the entries;
+        # a fill that started before `_forgotten_version` cannot tell whether it missed a send.
+        self._sends: OrderedDict[tuple[str, str], tuple[int, datetime | None]] = OrderedDict()
+        self._version = 0
+        self._forgotten_version = 0
+        self._lock = threading.Lock()
+
+    def has_send(self, db: Session, user_id: str, template_name: str) -> bool:
+        return self._get(db, user_id, template_name).ever_sent
+
+    def has_send_in_day_so_far(self, db: Session, user_id: str, template_name: str, provided_ts: datetime) -> bool:
+        entry = self._get(db, user_id, template_name)
+        end = strip_tz(provided_ts)
+        start = end.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        if entry.last_sent_at is None:
+            return False
+        if entry.last_sent_at <= end:
+            return entry.last_sent_at >= start
+
+        # Out-of-order event: the latest send is after provided_ts, so only the DB can tell.
+        return self.send_request_repository.exists_for_user_and_template_in_day_so_far(
+            db=db,
+            user_id=user_id,
+            template_name=template_name,
+            provided_ts=provided_ts,
+        )
+
+    def record_send(self, db: Session, user_id: str, template_name: str, event_timestamp: datetime | None) -> None:
+        """Write-through of a send; applied to the ledger when `db` commits."""
+        db.info.setdefault(_PENDING_KEY, []).append((self, user_id, template_name, event_timestamp))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._forgotten_version = self._version
+            self._sends.clear()
+
+    def _get(self, db: Session, user_id: str, template_name: str) -> LedgerEntry:
+        key = (user_id, template_name)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            started = self._version
+
+        if self.user_state_service is not None:
+            sends = self.user_state_service.get(db, user_id).last_sent_at
+            ever_sent, last_sent_at = template_name in sends, sends.get(template_name)
+        else:
+            ever_sent, last_sent_at = self.send_request_repository.get_send_summary(db, user_id, template_name)
+        entry = LedgerEntry(
+            ever_sent=ever_sent,
+            last_sent_at=strip_tz(last_sent_at) if last_sent_at is not None else None,
+        )
+
+        with self._lock:
+            send = self._sends.get(key)
+            if send is not None and send[0] > started:
+                # Committed while the DB was read, which may not have seen it.
+                _merge_send(entry, send[1])
+            elif send is None and self._forgotten_version > started:
+                return entry  # a send may have been applied and forgotten since: answer, don't cache
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def _apply_send(self, user_id: str, template_name: str, event_timestamp: datetime | None) -> None:
+        key = (user_id, template_name)
+        ts = strip_tz(event_timestamp) if event_timestamp is not None else None
+        with self._lock:
+            self._version += 1
+            previous = self._sends.pop(key, None)
+            if previous is not None and previous[1] is not None and (ts is None or previous[1] > ts):
+                ts = previous[1]
+            self._sends[key] = (self._version, ts)
+            while len(self._sends) > self.max_entries:
+                _, (version, _) = self._sends.popitem(last=False)
+                self._forgotten_version = version
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                _merge_send(entry, ts)
+
+
+def _merge_send(entry: LedgerEntry, sent_at: datetime | None) -> None:
+    entry.ever_sent = True
+    if sent_at is not None and (entry.last_sent_at is None or sent_at > entry.last_sent_at):
+        entry.last_sent_at = sent_at
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _apply_pending_sends(session: Session) -> None:
+    for ledger, user_id, template_name, event_timestamp in session.info.pop(_PENDING_KEY, ()):
+        ledger._apply_send(user_id, template_name, event_timestamp)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending_sends(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -1,9 +1,14 @@
+from datetime import datetime
+
 from sqlalchemy.orm import Session
 
 from src.marketing_messaging_service.models import Event
 from src.marketing_messaging_service.repositories.interfaces import ISendRequestRepository
 from src.marketing_messaging_service.repositories.interfaces import ISuppressionRepository
+from src.marketing_messaging_service.services.batch_context import BatchContext
 from src.marketing_messaging_service.services.rule_models import RuleDecision
+from src.marketing_messaging_service.services.suppression_ledger import SuppressionLedger
+from src.marketing_messaging_service.services.user_state import UserStateService
 
 
 class SuppressionService:
@@ -11,11 +16,15 @@ class SuppressionService:
         self,
         send_request_repository: ISendRequestRepository,
         suppression_repository: ISuppressionRepository,
+        suppression_ledger: SuppressionLedger | None = None,
+        user_state_service: UserStateService | None = None,
     ):
         self.send_request_repository = send_request_repository
         self.suppression_repository = suppression_repository
+        self.suppression_ledger = suppression_ledger
+        self.user_state_service = user_state_service
 
-    def evaluate(self, db: Session, event: Event, decision: RuleDecision):
+    def evaluate(self, db: Session, event: Event, decision: RuleDecision, batch: BatchContext | None = None):
         """
         Returns:
         - ("allow", None)
@@ -37,24 +46,48 @@ class SuppressionService:
             return "allow", None
 
         if mode == "once_ever":
-            exists = self.send_request_repository.exists_for_user_and_template(
-                db=db,
-                user_id=user_id,
-                template_name=decision.template_name,
-            )
-            if exists:
+            if batch is not None and batch.has_send(user_id, decision.template_name):
                 return "suppress", "once_ever"
-            return "allow", None
 
-        if mode == "once_per_calendar_day":
-            exists_in_window = (
-                self.send_request_repository.exists_for_user_and_template_in_day_so_far(
+            if self.suppression_ledger is not None:
+                exists = self.suppression_ledger.has_send(db, user_id, decision.template_name)
+            elif self.user_state_service is not None:
+                exists = self.user_state_service.has_send(db, user_id, decision.template_name, batch)
+            else:
+                exists = self.send_request_repository.exists_for_user_and_template(
                     db=db,
                     user_id=user_id,
                     template_name=decision.template_name,
-                    provided_ts=event.event_timestamp,
                 )
-            )
+            if exists:
+                return "suppress", "once_ever"
+            return "allow", None
+
+        if mode == "once_per_calendar_day":
+            if batch is not None and batch.has_send_in_day_so_far(
+                user_id, decision.template_name, event.event_timestamp
+            ):
+                return "suppress", "once_per_calendar_day"
+
+            exists_in_window = None
+            if self.suppression_ledger is not None:
+                exists_in_window = self.suppression_ledger.has_send_in_day_so_far(
+                    db, user_id, decision.template_name, event.event_timestamp
+                )
+            elif self.user_state_service is not None:
+                # None: the latest send is after this event, only send_requests can tell.
+                exists_in_window = self.user_state_service.has_send_in_day_so_far(
+                    db, user_id, decision.template_name, event.event_timestamp, batch
+                )
+            if exists_in_window is None:
+                exists_in_window = (
+                    self.send_request_repository.exists_for_user_and_template_in_day_so_far(
+                        db=db,
+                        user_id=user_id,
+                        template_name=decision.template_name,
+                        provided_ts=event.event_timestamp,
+                    )
+                )
 
             if exists_in_window:
                 return "suppress", "once_per_calendar_day"
@@ -62,3 +95,8 @@ class SuppressionService:
 
         # Unknown suppression mode → fail open
         return "allow", None
+
+    def record_send(self, db: Session, user_id: str, template_name: str, event_timestamp: datetime | None) -> None:
+        """Keep the suppression ledger in step with a send request written in `db`."""
+        if self.suppression_ledger is not None:
+            self.suppression_ledger.record_send(db, user_id, template_name, event_timestamp)
@@ -0,0 +1,99 @@
+import heapq
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Callable
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from src.marketing_messaging_service.infrastructure.database import create_session
+from src.marketing_messaging_service.infrastructure.database import to_naive_utc
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.send_request import SendRequest
+from src.marketing_messaging_service.models.suppression import Suppression
+from src.marketing_messaging_service.repositories.interfaces import IDecisionRepository
+from src.marketing_messaging_service.repositories.interfaces import IEventRepository
+from src.marketing_messaging_service.repositories.interfaces import ISendRequestRepository
+from src.marketing_messaging_service.repositories.interfaces import ISuppressionRepository
+from src.marketing_messaging_service.schemas.audit import AuditLogItem
+from src.marketing_messaging_service.services.audit_service import decision_item
+
+
+class TimelineService:
+    """
+    Per-user history of events, send requests, suppressions and decisions, newest first.
+
+    Each table is read through its own streaming query, already ordered by recorded time
+    (all four take it from `recorded_now`, one clock), and the four streams are merged
+    lazily, so memory stays flat however long the history is.
+    """
+
+    def __init__(
+        self,
+        event_repository: IEventRepository,
+        send_request_repository: ISendRequestRepository,
+        suppression_repository: ISuppressionRepository,
+        decision_repository: IDecisionRepository,
+        session_factory: Callable[[], AbstractContextManager[Session]] = create_session,
+        chunk_size: int = 500,
+    ):
+        self.event_repository = event_repository
+        self.send_request_repository = send_request_repository
+        self.suppression_repository = suppression_repository
+        self.decision_repository = decision_repository
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+
+    def iter_timeline(
+        self,
+        user_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Iterator[AuditLogItem]:
+        since, until = to_naive_utc(since), to_naive_utc(until)
+        window = {"since": since, "until": until, "chunk_size": self.chunk_size}
+
+        with self.session_factory() as db:
+            # Latest-written kind first: heapq.merge yields equal timestamps in stream order.
+            streams = [
+                (decision_item(d) for d in self.decision_repository.iter_by_user(db, user_id, **window)),
+                (self._suppression_item(s) for s in self.suppression_repository.iter_by_user(db, user_id, **window)),
+                (self._send_item(s) for s in self.send_request_repository.iter_by_user(db, user_id, **window)),
+                (self._event_item(e) for e in self.event_repository.iter_by_user(db, user_id, **window)),
+            ]
+            # Every stream is sorted newest first, so a k-way merge keeps the whole timeline sorted.
+            yield from heapq.merge(*streams, key=lambda item: item.timestamp, reverse=True)
+
+    def _event_item(self, e: Event) -> AuditLogItem:
+        return AuditLogItem(
+            timestamp=e.created_at,
+            kind="event",
+            event_id=e.id,
+            user_id=e.user_id,
+            event_type=e.event_type,
+            event_timestamp=e.event_timestamp,
+        )
+
+    def _send_item(self, s: SendRequest) -> AuditLogItem:
+        return AuditLogItem(
+            timestamp=s.decided_at,
+            kind="send",
+            event_id=s.event_id,
+            user_id=s.user_id,
+            reason=s.reason,
+            template_name=s.template_name,
+            channel=s.channel,
+            event_timestamp=s.event_timestamp,
+            send_message_success=s.send_message_success,
+        )
+
+    def _suppression_item(self, s: Suppression) -> AuditLogItem:
+        return AuditLogItem(
+            timestamp=s.decided_at,
+            kind="suppression",
+            event_id=s.event_id,
+            user_id=s.user_id,
+            outcome="suppress",
+            reason=s.suppression_reason,
+            template_name=s.template_name,
+        )
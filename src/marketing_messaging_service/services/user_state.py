@@ -0,0 +1,106 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from src.marketing_messaging_service.infrastructure.database import strip_tz
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.send_request import SendRequest
+from src.marketing_messaging_service.repositories.interfaces import IUserStateRepository
+from src.marketing_messaging_service.services.batch_context import BatchContext
+
+
+@dataclass(slots=True)
+class UserStateSnapshot:
+    last_event_at: dict[str, datetime] = field(default_factory=dict)  # by event_type
+    last_sent_at: dict[str, datetime | None] = field(default_factory=dict)  # by template_name; present = ever sent
+
+
+class UserStateService:
+    """
+    Answers prior_event and suppression probes from the user_state table.
+
+    A user's rows are read with one primary-key range lookup and kept in the BatchContext
+    for the rest of the batch; the table only changes when the batch is flushed. A latest
+    timestamp answers a window ending at or after it exactly. For a window that ends before
+    it (an event older than the user's latest one) the probes return None and the caller
+    asks the history tables.
+    """
+
+    def __init__(self, user_state_repository: IUserStateRepository):
+        self.user_state_repository = user_state_repository
+
+    def get(self, db: Session, user_id: str, batch: BatchContext | None = None) -> UserStateSnapshot:
+        if batch is not None:
+            snapshot = batch.cached_user_state(user_id)
+            if snapshot is not None:
+                return snapshot
+
+        snapshot = UserStateSnapshot()
+        for row in self.user_state_repository.list_by_user(db, user_id):
+            last_at = strip_tz(row.last_at) if row.last_at is not None else None
+            if row.kind == "event":
+                snapshot.last_event_at[row.name] = last_at
+            else:
+                snapshot.last_sent_at[row.name] = last_at
+
+        if batch is not None:
+            batch.cache_user_state(user_id, snapshot)
+        return snapshot
+
+    def has_event_in_window(
+        self,
+        db: Session,
+        user_id: str,
+        event_type: str,
+        window_start: datetime,
+        window_end: datetime,
+        batch: BatchContext | None = None,
+    ) -> bool | None:
+        last_event_at = self.get(db, user_id, batch).last_event_at.get(event_type)
+        if last_event_at is None:
+            return False
+        if last_event_at <= strip_tz(window_end):
+            return last_event_at >= strip_tz(window_start)
+        return None
+
+    def has_send(self, db: Session, user_id: str, template_name: str, batch: BatchContext | None = None) -> bool:
+        return template_name in self.get(db, user_id, batch).last_sent_at
+
+    def has_send_in_day_so_far(
+        self,
+        db: Session,
+        user_id: str,
+        template_name: str,
+        provided_ts: datetime,
+        batch: BatchContext | None = None,
+    ) -> bool | None:
+        last_sent_at = self.get(db, user_id, batch).last_sent_at.get(template_name)
+        end = strip_tz(provided_ts)
+        if last_sent_at is None:
+            return False
+        if last_sent_at <= end:
+            return last_sent_at >= end.replace(hour=0, minute=0, second=0, microsecond=0)
+        return None
+
+    def record(self, db: Session, events: Iterable[Event], send_requests: Iterable[SendRequest]) -> None:
+        """Upsert the latest timestamps of rows written in `db`, in the same transaction."""
+        self.user_state_repository.upsert_latest(
+            db, "event", _latest((e.user_id, e.event_type, e.event_timestamp) for e in events)
+        )
+        self.user_state_repository.upsert_latest(
+            db, "send", _latest((s.user_id, s.template_name, s.event_timestamp) for s in send_requests)
+        )
+
+
+def _latest(rows: Iterable[tuple[str, str, datetime | None]]) -> dict[tuple[str, str], datetime | None]:
+    latest: dict[tuple[str, str], datetime | None] = {}
+    for user_id, name, ts in rows:
+        key = (user_id, name)
+        ts = strip_tz(ts) if ts is not None else None
+        current = latest.get(key)
+        if key not in latest or (ts is not None and (current is None or ts > current)):
+            latest[key] = ts
+    return latest
@@ -0,0 +1,138 @@
+from collections import defaultdict
+from typing import Any
+
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.services.enums import Operator
+from src.marketing_messaging_service.services.rule_compiler import CompiledCondition
+from src.marketing_messaging_service.services.rule_compiler import CompiledRule
+
+try:
+    import numpy as np
+except ImportError:  # optional: batch evaluation falls back to the per-event path
+    np = None
+
+# Expected values numpy compares as one scalar; lists or dicts would be broadcast instead.
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def match_field_conditions(
+    rules_by_event_type: dict[str, list[CompiledRule]],
+    events: list[Event],
+    min_rules: int = 1,
+) -> list[tuple[CompiledRule, ...] | None] | None:
+    """
+    For every event, the rules of its event type whose field conditions all pass, in
+    YAML order, cut after the first rule without prior_event conditions (that one always
+    matches once reached). The caller resolves prior_event conditions on these candidates.
+
+    Event types with fewer than `min_rules` rules are left to the per-event path, which
+    stops at the first match and is faster for short rule lists: their entries are None.
+
+    Each referenced field is read once per event into an object array and each condition
+    becomes a mask over it; object arrays compare with Python's own == / >=, so masks
+    equal the scalar checks. Returns None when NumPy is missing or a comparison raises
+    (e.g. `gte` on a string), so the caller can use the per-event path and its exact
+    behaviour instead, and when no event type of the list has `min_rules` rules.
+    """
+    if np is None or all(len(rules) < min_rules for rules in rules_by_event_type.values()):
+        return None
+
+    positions_by_type: dict[str, list[int]] = defaultdict(list)
+    for position, event in enumerate(events):
+        positions_by_type[event.event_type].append(position)
+
+    candidates: list[tuple[CompiledRule, ...] | None] = [None] * len(events)
+    vectorized = False
+    for event_type, positions in positions_by_type.items():
+        rules = rules_by_event_type.get(event_type)
+        if not rules:
+            for position in positions:
+                candidates[position] = ()
+            continue
+        if len(rules) < min_rules:
+            continue
+
+        typed_events = [events[p] for p in positions]
+        try:
+            masks = _rule_masks(rules, typed_events)
+        except TypeError:
+            return None
+
+        for position, rule_candidates in zip(positions, _first_candidates(rules, masks)):
+            candidates[position] = rule_candidates
+        vectorized = True
+
+    return candidates if vectorized else None
+
+
+def _rule_masks(rules: list[CompiledRule], events: list[Event]):
+    """(rules x events) bool matrix: all field conditions of the rule pass for the event."""
+    count = len(events)
+    columns: dict[str, Any] = {}  # one value column per field path
+    masks = np.ones((len(rules), count), dtype=bool)
+
+    for row, compiled_rule in enumerate(rules):
+        for condition in compiled_rule.conditions:
+            if condition.kind == "prior_event":
+                continue
+            if condition.kind != "field":
+                masks[row] = False
+                break
+
+            column = columns.get(condition.field)
+            if column is None:
+                accessor = condition.accessor
+                column = columns[condition.field] = np.fromiter(
+                    (accessor(event, event.user_traits) for event in events), dtype=object, count=count
+                )
+            masks[row] &= _condition_mask(condition, column)
+
+    return masks
+
+
+def _condition_mask(condition: CompiledCondition, column):
+    expected = condition.value
+    if condition.operator == Operator.EQUALS.value:
+        if isinstance(expected, _SCALAR_TYPES):
+            return np.asarray(column == expected, dtype=bool)
+        return np.fromiter((value == expected for value in column), dtype=bool, count=len(column))
+
+    if condition.operator == Operator.GTE.value:
+        if not isinstance(expected, _SCALAR_TYPES):
+            return np.fromiter(
+                (value is not None and value >= expected for value in column), dtype=bool, count=len(column)
+            )
+        mask = np.zeros(len(column), dtype=bool)
+        present = ~np.asarray(np.equal(column, None), dtype=bool)
+        if present.any():
+            mask[present] = np.asarray(column[present] >= expected, dtype=bool)
+        return mask
+
+    return np.zeros(len(column), dtype=bool)  # Unknown operator
+
+
+def _first_candidates(rules: list[CompiledRule], masks) -> list[tuple[CompiledRule, ...]]:
+    pure = np.array([not rule.has_prior_event for rule in rules], dtype=bool)
+    first = masks.argmax(axis=0)
+    any_match = masks.any(axis=0)
+    simple = any_match & pure[first]
+
+    result: list[tuple[CompiledRule, ...]] = []
+    rows = zip(first.tolist(), any_match.tolist(), simple.tolist())
+    for column, (first_row, matched, is_simple) in enumerate(rows):
+        if not matched:
+            result.append(())
+        elif is_simple:
+            result.append((rules[first_row],))
+        else:
+            chain = []
+            for row in np.flatnonzero(masks[first_row:, column]).tolist():
+                chain.append(rules[first_row + row])
+                if pure[first_row + row]:
+                    break
+            result.append(tuple(chain))
+    return result
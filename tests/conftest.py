@@ -0,0 +1,88 @@
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.marketing_messaging_service import models  # noqa: F401  (registers tables)
+from src.marketing_messaging_service.infrastructure.database import Base
+from src.marketing_messaging_service.infrastructure.query_stats import query_budget as _query_budget
+from src.marketing_messaging_service.providers.fake_providers import FakeMessagingProvider
+from src.marketing_messaging_service.repositories import EventRepository
+from src.marketing_messaging_service.repositories import OutboxRepository
+from src.marketing_messaging_service.repositories import SendRequestRepository
+from src.marketing_messaging_service.repositories import SuppressionRepository
+from src.marketing_messaging_service.repositories.decision_repository import DecisionRepository
+from src.marketing_messaging_service.schemas.event import EventIn
+from src.marketing_messaging_service.services.audit_service import AuditService
+from src.marketing_messaging_service.services.event_processing_service import EventProcessingService
+from src.marketing_messaging_service.services.outbox_dispatcher import OutboxDispatcher
+from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
+from src.marketing_messaging_service.services.suppression_service import SuppressionService
+
+T0 = datetime(2025, 10, 31, 10, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a fresh SQLite file with every table created."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def event_processing_service(tmp_path) -> EventProcessingService:
+    """Wired like the API with the outbox on and the other optional features off, against config/rules.yaml."""
+    event_repository = EventRepository()
+    send_request_repository = SendRequestRepository()
+    suppression_repository = SuppressionRepository()
+    provider = FakeMessagingProvider(log_file=str(tmp_path / "messages.txt"))
+    return EventProcessingService(
+        event_repository=event_repository,
+        send_request_repository=send_request_repository,
+        suppression_repository=suppression_repository,
+        rule_evaluation_service=RuleEvaluationService(event_repository=event_repository),
+        suppression_service=SuppressionService(
+            send_request_repository=send_request_repository,
+            suppression_repository=suppression_repository,
+        ),
+        messaging_provider=provider,
+        decision_repository=DecisionRepository(),
+        outbox_dispatcher=OutboxDispatcher(outbox_repository=OutboxRepository(), messaging_provider=provider),
+    )
+
+
+@pytest.fixture
+def audit_service() -> AuditService:
+    return AuditService(decision_repository=DecisionRepository())
+
+
+@pytest.fixture
+def signup() -> EventIn:
+    return EventIn(
+        user_id="u1",
+        event_type="signup_completed",
+        event_timestamp=T0,
+        user_traits={"marketing_opt_in": True},
+    )
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Cap the SQL statements a block may run; going over fails the test with every statement listed.
+
+        def test_x(db, query_budget):
+            with query_budget(6):
+                service.process_event(db, payload)
+    """
+    return _query_budget
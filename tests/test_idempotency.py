@@ -0,0 +1,101 @@
+import threading
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.repositories import EventRepository
+from src.marketing_messaging_service.repositories.decision_repository import DecisionRepository
+from src.marketing_messaging_service.schemas.event import EventIn
+from src.marketing_messaging_service.services.idempotency import IdempotencyKeyConflict
+from src.marketing_messaging_service.services.idempotency import IdempotencyKeys
+from src.marketing_messaging_service.services.idempotency import IdempotencyKeyTaken
+from src.marketing_messaging_service.services.idempotency import RecentKeyFilter
+
+T0 = datetime(2025, 10, 31, 10, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def keyed_service(event_processing_service):
+    event_processing_service.idempotency_keys = IdempotencyKeys(
+        event_repository=EventRepository(),
+        decision_repository=DecisionRepository(),
+        recent_keys=RecentKeyFilter(capacity=1_000),
+    )
+    return event_processing_service
+
+
+def _keyed(key: str) -> EventIn:
+    return EventIn(user_id="u1", event_type="signup_completed", event_timestamp=T0,
+                   user_traits={"marketing_opt_in": True}, idempotency_key=key)
+
+
+def test_keyed_write_waits_for_another_writer(session_factory, keyed_service):
+    locked, release = threading.Event(), threading.Event()
+
+    def other_writer():
+        with session_factory() as other:
+            other.add(Event(user_id="other", event_type="page_view", event_timestamp=T0))
+            other.flush()  # holds SQLite's write lock until the commit
+            locked.set()
+            release.wait(timeout=5)
+            other.commit()
+
+    thread = threading.Thread(target=other_writer)
+    thread.start()
+    try:
+        assert locked.wait(timeout=5)
+        threading.Timer(0.3, release.set).start()
+        with session_factory() as db:
+            event, _, outcome, _, _ = keyed_service.process_event(db, _keyed("k1"))
+            db.commit()
+    finally:
+        release.set()
+        thread.join()
+
+    assert outcome == "allow"
+    with session_factory() as db:
+        assert db.query(Event).count() == 2
+
+
+def test_key_stored_by_another_process_is_answered_from_the_store(db, keyed_service):
+    [(first, _, _, _, _)] = keyed_service.process_own_batch(db, [_keyed("k1")])
+    db.commit()
+    # A restarted process: its filter has not seen k1, so the unique index catches it.
+    keyed_service.idempotency_keys.recent_keys = RecentKeyFilter(capacity=1_000)
+
+    [(again, _, outcome, _, _)] = keyed_service.process_own_batch(db, [_keyed("k1")])
+    db.commit()
+
+    assert again.id == first.id
+    assert outcome == "allow"
+    assert db.query(Event).count() == 1
+
+
+def test_key_race_fails_a_shared_transaction(db, keyed_service):
+    keyed_service.process_event(db, _keyed("k1"))
+    db.commit()
+    keyed_service.idempotency_keys.recent_keys = RecentKeyFilter(capacity=1_000)
+
+    with pytest.raises(IdempotencyKeyTaken):
+        keyed_service.process_event(db, _keyed("k1"))
+
+
+def test_reusing_a_key_for_another_event_conflicts(db, keyed_service):
+    keyed_service.process_event(db, _keyed("k1"))
+    db.commit()
+
+    with pytest.raises(IdempotencyKeyConflict):
+        keyed_service.process_event(db, _keyed("k1").model_copy(update={"event_type": "link_bank_success"}))
+    with pytest.raises(IdempotencyKeyConflict):
+        keyed_service.process_batch(db, [_keyed("k2"), _keyed("k2").model_copy(update={"properties": {"a": 1}})])
+
+
+def test_keys_are_scoped_per_user(db, keyed_service):
+    first, _, _, _, _ = keyed_service.process_event(db, _keyed("k1"))
+    other, _, outcome, _, _ = keyed_service.process_event(db, _keyed("k1").model_copy(update={"user_id": "u2"}))
+    db.commit()
+
+    assert other.id != first.id
+    assert outcome == "allow"
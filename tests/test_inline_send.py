@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.marketing_messaging_service.infrastructure.database import Base
+from src.marketing_messaging_service.providers.fake_providers import FakeMessagingProvider
+
+
+class ThreadRecordingProvider(FakeMessagingProvider):
+    def __init__(self, log_file: str):
+        super().__init__(log_file=log_file)
+        self.threads: list[int] = []
+
+    def send_message(self, **kwargs) -> None:
+        self.threads.append(threading.get_ident())
+        super().send_message(**kwargs)
+
+
+def test_inline_send_under_run_sync_leaves_the_event_loop(tmp_path, event_processing_service, signup):
+    provider = ThreadRecordingProvider(log_file=str(tmp_path / "inline.txt"))
+    event_processing_service.messaging_provider = provider
+    event_processing_service.outbox_dispatcher = None
+
+    async def ingest() -> int:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as db:
+            [(_, _, outcome, _, _)] = await db.run_sync(event_processing_service.process_batch, [signup])
+            await db.commit()
+        await engine.dispose()
+        assert outcome == "allow"
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(ingest())
+    provider.close()
+
+    assert len(provider.threads) == 1
+    assert provider.threads[0] != loop_thread
+    assert "WELCOME_EMAIL" in (tmp_path / "inline.txt").read_text()
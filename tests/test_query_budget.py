@@ -0,0 +1,30 @@
+import pytest
+
+from src.marketing_messaging_service.infrastructure.query_stats import QueryBudgetExceeded
+
+
+def test_process_event_stays_within_budget(db, event_processing_service, signup, query_budget):
+    with query_budget(6) as stats:
+        event_processing_service.process_event(db, signup)
+    db.commit()
+
+    assert stats.statements > 0
+
+
+def test_get_audit_log_stays_within_budget(db, event_processing_service, audit_service, signup, query_budget):
+    event_processing_service.process_event(db, signup)
+    db.commit()
+
+    with query_budget(1):
+        audit_log = audit_service.get_audit_log(db, user_id="u1")
+    with query_budget(1):
+        page = audit_service.get_audit_log(db, user_id="u1", limit=1)
+
+    assert len(audit_log.items) == 1
+    assert len(page.items) == 1
+
+
+def test_budget_overrun_fails_and_lists_statements(db, event_processing_service, signup, query_budget):
+    with pytest.raises(QueryBudgetExceeded, match="INSERT INTO events"):
+        with query_budget(1):
+            event_processing_service.process_event(db, signup)
@@ -0,0 +1,149 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy import select
+
+from src.marketing_messaging_service.infrastructure.database import recorded_now
+from src.marketing_messaging_service.models.decision import Decision
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.outbox_message import OutboxMessage
+from src.marketing_messaging_service.models.send_request import SendRequest
+from src.marketing_messaging_service.models.suppression import Suppression
+from src.marketing_messaging_service.models.user_traits import UserTraits
+from src.marketing_messaging_service.repositories.retention_repository import RetentionRepository
+from src.marketing_messaging_service.schemas.event import EventIn
+from src.marketing_messaging_service.services.retention import ArchiveWriter
+from src.marketing_messaging_service.services.retention import RetentionService
+
+T0 = datetime(2025, 10, 31, 10, 0)
+
+
+@pytest.fixture
+def archive(session_factory, tmp_path):
+    """Archive everything recorded so far, in chunks of two rows; returns rows moved per table."""
+    # session_factory.begin commits each chunk, like create_session does for the command.
+    service = RetentionService(RetentionRepository(), session_factory=session_factory.begin, chunk_size=2)
+
+    def run() -> dict[str, int]:
+        writer = ArchiveWriter(tmp_path / "archive")
+        try:
+            return service.archive(recorded_now() + timedelta(seconds=1), writer)
+        finally:
+            writer.close()
+
+    return run
+
+
+def _send(db, user_id: str, template_name: str, event_timestamp: datetime, status: str = "sent") -> SendRequest:
+    event = Event(user_id=user_id, event_type="signup_completed", event_timestamp=event_timestamp)
+    send = SendRequest(
+        user_id=user_id,
+        event=event,
+        event_timestamp=event_timestamp,
+        template_name=template_name,
+        channel="email",
+        reason="test",
+        send_message_success=True if status == "sent" else None,
+    )
+    db.add(OutboxMessage(send_request=send, user_id=user_id, template_name=template_name, channel="email",
+                         reason="test", status=status))
+    return send
+
+
+def _count(db, model) -> int:
+    return db.scalar(select(func.count()).select_from(model))
+
+
+def _event(user_id: str, event_type: str, event_timestamp: datetime, **fields) -> EventIn:
+    return EventIn(user_id=user_id, event_type=event_type, event_timestamp=event_timestamp.replace(tzinfo=timezone.utc),
+                   **fields)
+
+
+def test_latest_send_per_user_and_template_survives(db, archive):
+    for day in range(3):
+        _send(db, "u1", "WELCOME_EMAIL", T0 + timedelta(days=day))
+    latest = _send(db, "u2", "WELCOME_EMAIL", T0)
+    db.commit()
+
+    rows = archive()
+
+    assert rows["send_requests"] == 2
+    kept = db.execute(select(SendRequest.user_id, SendRequest.event_timestamp).order_by(SendRequest.id)).all()
+    assert kept == [("u1", T0 + timedelta(days=2)), ("u2", latest.event_timestamp)]
+    assert db.scalar(select(func.count()).where(SendRequest.event_id.is_not(None))) == 0
+
+
+def test_suppression_still_holds_after_archiving(db, archive, event_processing_service):
+    signup = _event("u1", "signup_completed", T0, user_traits={"marketing_opt_in": True})
+    failed = {"properties": {"failure_reason": "INSUFFICIENT_FUNDS"}}
+    for payload in (
+        signup,
+        _event("u1", "payment_failed", T0 - timedelta(days=1), **failed),
+        _event("u1", "payment_failed", T0, **failed),
+    ):
+        event_processing_service.process_event(db, payload)
+    db.execute(OutboxMessage.__table__.update().values(status="sent"))
+    db.commit()
+
+    archive()
+    assert _count(db, Event) == 0
+
+    later = T0 + timedelta(hours=2)
+    outcomes = [
+        event_processing_service.process_event(db, payload)[2]
+        for payload in (
+            _event("u1", "signup_completed", later, user_traits={"marketing_opt_in": True}),
+            _event("u1", "payment_failed", later, **failed),
+        )
+    ]
+    assert outcomes == ["suppress", "suppress"]
+
+
+def test_undelivered_sends_are_kept(db, archive):
+    for day, status in enumerate(("pending", "failed", "sent", "sent")):
+        _send(db, "u1", "WELCOME_EMAIL", T0 + timedelta(days=day), status=status)
+    db.commit()
+
+    rows = archive()
+
+    assert rows["send_requests"] == rows["outbox_messages"] == 2
+    statuses = db.scalars(select(OutboxMessage.status).order_by(OutboxMessage.id)).all()
+    assert statuses == ["pending", "sent"]
+    assert _count(db, SendRequest) == 2
+
+
+def test_child_rows_are_archived_with_their_events(db, archive, event_processing_service):
+    for user_id in ("u1", "u2", "u3"):
+        for _ in range(2):
+            event_processing_service.process_event(
+                db, _event(user_id, "signup_completed", T0, user_traits={"marketing_opt_in": True})
+            )
+    db.commit()
+    assert _count(db, Suppression) == 3
+
+    rows = archive()
+
+    assert rows["events"] == rows["user_traits"] == rows["decisions"] == 6
+    assert rows["suppressions"] == 3
+    for model in (Event, UserTraits, Decision, Suppression):
+        assert _count(db, model) == 0
+    # The pending welcome emails outlive their events.
+    assert db.scalars(select(SendRequest.event_id)).all() == [None, None, None]
+
+
+def test_rerun_is_a_no_op(db, archive, event_processing_service, tmp_path):
+    for day in range(3):
+        _send(db, "u1", "WELCOME_EMAIL", T0 + timedelta(days=day))
+    event_processing_service.process_event(
+        db, _event("u2", "signup_completed", T0, user_traits={"marketing_opt_in": True})
+    )
+    db.commit()
+
+    assert archive()
+    archived = (tmp_path / "archive" / "events.ndjson.gz").read_bytes()
+
+    assert archive() == {}
+    assert (tmp_path / "archive" / "events.ndjson.gz").read_bytes() == archived
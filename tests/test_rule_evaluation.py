@@ -0,0 +1,211 @@
+import random
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from itertools import product
+
+import pytest
+
+from src.marketing_messaging_service.models.event import Event
+from src.marketing_messaging_service.models.user_traits import UserTraits
+from src.marketing_messaging_service.repositories import EventRepository
+from src.marketing_messaging_service.services.batch_context import BatchContext
+from src.marketing_messaging_service.services.rule_compiler import CompiledRuleset
+from src.marketing_messaging_service.services.rule_compiler import compile_rules
+from src.marketing_messaging_service.services.rule_evaluation_service import RuleEvaluationService
+from src.marketing_messaging_service.services.rule_models import Rule
+from src.marketing_messaging_service.services.vectorized_rules import match_field_conditions
+
+T0 = datetime(2025, 10, 31, 10, 0, tzinfo=timezone.utc)
+
+# (name, conditions) of the rules triggered by payment_failed, in YAML order.
+RULES = [
+    ("retry_us", [
+        {"field": "user_traits.country", "operator": "equals", "value": "US"},
+        {"field": "properties.attempt_number", "operator": "gte", "value": 3},
+    ]),
+    ("no_reason_after_signup", [
+        {"field": "properties.failure_reason", "operator": "equals", "value": None},
+        {"prior_event": {"event_type": "signup_completed", "hours": 24}},
+    ]),
+    ("flagged_user", [
+        {"field": "event.user_id", "operator": "equals", "value": "u2"},
+        {"field": "properties.flagged", "operator": "equals", "value": True},
+    ]),
+    ("insufficient_funds", [
+        {"field": "properties.failure_reason", "operator": "equals", "value": "INSUFFICIENT_FUNDS"},
+    ]),
+]
+
+
+def _ruleset(named_conditions=RULES) -> CompiledRuleset:
+    # Compiled without validation: rules.yaml only accepts properties. / user_traits. fields, but
+    # both paths also read event.* attributes.
+    rules = [
+        Rule(
+            name=name,
+            trigger={"event_type": "payment_failed"},
+            conditions={"all": conditions},
+            action={"type": "send", "template_name": name.upper(), "delivery_method": "email"},
+            suppression={"mode": "none"},
+        )
+        for name, conditions in named_conditions
+    ]
+    return CompiledRuleset(version="test", rules_by_event_type=compile_rules(rules), rule_count=len(rules))
+
+
+@pytest.fixture
+def service() -> RuleEvaluationService:
+    """Takes the column path for any batch, whatever its size and rule count."""
+    service = RuleEvaluationService(event_repository=EventRepository(), vectorize_min_batch=1, vectorize_min_rules=1)
+    service._ruleset = _ruleset()
+    return service
+
+
+def _events(attempts=(None, 1, 3, 5, 2.5, True)) -> list[Event]:
+    """Every mix of missing keys, None and values of several types, with a signup every few events."""
+    events = []
+    properties = [None, {}]
+    for attempt, reason, flagged in product(attempts, (None, "INSUFFICIENT_FUNDS", "OTHER"), (None, True, 1)):
+        properties.append({"attempt_number": attempt, "failure_reason": reason, "flagged": flagged})
+    for i, (props, country, user_id) in enumerate(product(properties, (None, "US", "DE", "missing"), ("u1", "u2"))):
+        timestamp = T0 + timedelta(hours=i)
+        if i % 7 == 0:
+            events.append(Event(user_id=user_id, event_type="signup_completed", event_timestamp=timestamp))
+        event = Event(user_id=user_id, event_type="payment_failed", event_timestamp=timestamp, properties=props)
+        event.user_traits = None if country == "missing" else UserTraits(country=country)
+        events.append(event)
+    return events
+
+
+def _one_by_one(service, db, events):
+    batch = BatchContext()
+    decisions = []
+    for event in events:
+        batch.add_event(event)
+        decisions.append(service.evaluate(db, event, event.user_traits, batch))
+    return decisions
+
+
+def test_column_path_decides_like_the_per_event_path(db, service):
+    events = _events()
+    assert match_field_conditions(service.get_ruleset().rules_by_event_type, events) is not None
+
+    decisions = service.evaluate_batch(db, events, BatchContext())
+
+    assert decisions == _one_by_one(service, db, events)
+    assert {decision.matched_rule for decision in decisions} == {name for name, _ in RULES} | {None}
+
+
+def test_mixed_types_fall_back_to_the_per_event_path(db, service):
+    # "3" >= 3 raises TypeError column-wise; per event, country rejects those rows first.
+    events = _events()
+    for event in events:
+        if event.properties and event.user_traits is not None and event.user_traits.country == "DE":
+            event.properties = {**event.properties, "attempt_number": "3"}
+    assert match_field_conditions(service.get_ruleset().rules_by_event_type, events) is None
+
+    assert service.evaluate_batch(db, events, BatchContext()) == _one_by_one(service, db, events)
+
+
+def test_type_error_that_decides_is_raised_by_both_paths(db, service):
+    events = _events(attempts=("3",))
+
+    with pytest.raises(TypeError):
+        _one_by_one(service, db, events)
+    with pytest.raises(TypeError):
+        service.evaluate_batch(db, events, BatchContext())
+
+
+def test_short_rule_lists_stay_on_the_per_event_path():
+    payment_rules = _ruleset().rules_by_event_type["payment_failed"]
+    rules_by_event_type = {"payment_failed": payment_rules, "signup_completed": payment_rules[:1]}
+    events = _events()
+
+    assert match_field_conditions(rules_by_event_type, events, min_rules=len(RULES) + 1) is None
+    candidates = match_field_conditions(rules_by_event_type, events, min_rules=len(RULES))
+    assert [rules is None for rules in candidates] == [event.event_type == "signup_completed" for event in events]
+
+
+# YAML order puts the condition that rejects least first, so sampling moves the others ahead of it.
+SELECTIVE_RULES = [
+    ("us_retry", [
+        {"field": "properties.failure_reason", "operator": "equals", "value": "CARD_DECLINED"},
+        {"field": "user_traits.country", "operator": "equals", "value": "US"},
+        {"field": "properties.attempt_number", "operator": "gte", "value": 3},
+    ]),
+    ("late_retry", [
+        {"field": "properties.failure_reason", "operator": "equals", "value": "CARD_DECLINED"},
+        {"field": "properties.attempt_number", "operator": "gte", "value": 4},
+    ]),
+    ("declined", [
+        {"field": "properties.failure_reason", "operator": "equals", "value": "CARD_DECLINED"},
+    ]),
+]
+
+
+def _in_yaml_order(ruleset: CompiledRuleset, event: Event) -> str | None:
+    # What the rules file says, checked as written: all() stops at the first failing condition.
+    for compiled_rule in ruleset.rules_by_event_type.get(event.event_type, ()):
+        if all(condition.check(event, event.user_traits) for condition in compiled_rule.conditions):
+            return compiled_rule.rule.name
+    return None
+
+
+def _payment_failed(rng: random.Random, attempt_number) -> Event:
+    event = Event(
+        user_id="u1",
+        event_type="payment_failed",
+        event_timestamp=T0,
+        properties={"failure_reason": rng.choice(["CARD_DECLINED"] * 9 + ["OTHER"]), "attempt_number": attempt_number},
+    )
+    event.user_traits = UserTraits(country=rng.choice(["US", "DE", "FR", "GB"]))
+    return event
+
+
+@pytest.fixture
+def selective_service() -> RuleEvaluationService:
+    service = RuleEvaluationService(event_repository=EventRepository())
+    service._ruleset = _ruleset(SELECTIVE_RULES)
+    return service
+
+
+def test_reordering_never_changes_the_decision(db, selective_service):
+    rng = random.Random(7)
+    ruleset = selective_service.get_ruleset()
+
+    for _ in range(5_000):
+        event = _payment_failed(rng, rng.randint(0, 5))
+        decision = selective_service.evaluate(db, event, event.user_traits)
+        assert decision.matched_rule == _in_yaml_order(ruleset, event)
+        assert decision.template_name == (decision.matched_rule.upper() if decision.matched_rule else None)
+
+    us_retry, late_retry, _ = ruleset.rules_by_event_type["payment_failed"]
+    assert us_retry.stats.order[0] != 0 and late_retry.stats.order == (1, 0)
+
+
+def test_type_error_of_a_reordered_condition_follows_yaml_order(db, selective_service):
+    rng = random.Random(7)
+    for _ in range(2_000):
+        event = _payment_failed(rng, rng.randint(0, 5))
+        selective_service.evaluate(db, event, event.user_traits)
+    late_retry = selective_service.get_ruleset().rules_by_event_type["payment_failed"][1]
+    assert late_retry.stats.ordered[0].field == "properties.attempt_number"
+
+    # "3" >= 4 raises, but in YAML order failure_reason rejects the event first: no error.
+    rejected = _payment_failed(rng, "3")
+    rejected.properties["failure_reason"] = "OTHER"
+    assert selective_service.evaluate(db, rejected, rejected.user_traits).matched_rule is None
+
+    # A condition that does not raise still decides from the reordered position.
+    declined = _payment_failed(rng, 1)
+    declined.properties["failure_reason"] = "CARD_DECLINED"
+    assert selective_service.evaluate(db, declined, declined.user_traits).matched_rule == "declined"
+
+    # Reached in YAML order, the comparison decides and its TypeError is not swallowed.
+    raising = _payment_failed(rng, "3")
+    raising.properties["failure_reason"] = "CARD_DECLINED"
+    with pytest.raises(TypeError):
+        _in_yaml_order(selective_service.get_ruleset(), raising)
+    with pytest.raises(TypeError):
+        selective_service.evaluate(db, raising, raising.user_traits)
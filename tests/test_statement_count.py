@@ -0,0 +1,50 @@
+from collections import Counter
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+
+from src.marketing_messaging_service.schemas.event import EventIn
+
+T0 = datetime(2025, 10, 31, 10, 0, tzinfo=timezone.utc)
+
+
+def _signup(user_id: str) -> EventIn:
+    return EventIn(user_id=user_id, event_type="signup_completed", event_timestamp=T0,
+                   user_traits={"marketing_opt_in": True})
+
+
+# (event, statements). A matched send is 5 INSERTs (events, user_traits, send_requests,
+# outbox_messages, decisions) plus the suppression lookup; no flush is followed by a refresh.
+SCENARIOS = [
+    (_signup("u1"), 6),
+    (_signup("u1"), 5),  # suppressed once_ever: suppressions instead of send_requests + outbox_messages
+    (EventIn(user_id="u1", event_type="link_bank_success", event_timestamp=T0 + timedelta(hours=2)), 6),
+    (EventIn(user_id="u2", event_type="page_view", event_timestamp=T0), 2),  # events, decisions
+]
+
+
+def test_process_event_statement_count(db, event_processing_service, query_budget):
+    for payload, expected in SCENARIOS:
+        with query_budget(expected) as stats:
+            event_processing_service.process_event(db, payload)
+        db.commit()
+
+        assert stats.statements == expected, stats.statement_log
+
+
+@pytest.mark.parametrize("size", [1, 10, 100])
+def test_process_batch_inserts_once_per_table(db, event_processing_service, query_budget, size):
+    payloads = [_signup(f"user-{i}") for i in range(size)]
+
+    # One flush for the batch: a multi-row INSERT per table, plus the once_ever lookup per event.
+    with query_budget(size + 5) as stats:
+        results = event_processing_service.process_batch(db, payloads)
+    db.commit()
+
+    inserts = Counter(statement.split()[2] for statement in stats.statement_log if statement.startswith("INSERT"))
+    assert inserts == {"events": 1, "user_traits": 1, "send_requests": 1, "outbox_messages": 1, "decisions": 1}
+    assert stats.statements == size + 5
+    assert [outcome for _, _, outcome, _, _ in results] == ["allow"] * size
+    assert len({event.id for event, _, _, _, _ in results}) == size